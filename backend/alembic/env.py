@@ -0,0 +1,67 @@
+"""
+Alembic迁移环境
+数据库连接来自应用配置；应用内调用时（app.db.migrations）直接复用传入的连接
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.config import settings
+from app.db.session import Base, engine
+import app.models  # noqa: F401  注册所有模型到Base.metadata
+from app.models.message_search import MESSAGE_SEARCH_FTS_TABLE
+
+config = context.config
+target_metadata = Base.metadata
+
+# 命令行调用时使用alembic.ini中的日志配置，应用内调用时保留应用的日志配置
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """自动生成时忽略迁移中手工创建的FTS5虚拟表及其影子表"""
+    return not (type_ == "table" and name.startswith(MESSAGE_SEARCH_FTS_TABLE))
+
+
+def run_migrations_offline() -> None:
+    """生成SQL脚本而不连接数据库（alembic upgrade head --sql）"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        render_as_batch=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """连接数据库执行迁移"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    with engine.connect() as connection:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    # SQLite不支持大部分ALTER TABLE，使用batch模式重建表
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
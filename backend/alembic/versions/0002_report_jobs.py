@@ -0,0 +1,51 @@
+"""报告任务表 report_jobs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:01
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 由 create_all 创建的数据库可能已经有这张表
+    if sa.inspect(op.get_bind()).has_table("report_jobs"):
+        return
+
+    op.create_table(
+        "report_jobs",
+        sa.Column("job_id", sa.String(length=50), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("agent_type", sa.String(length=50), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("worker_id", sa.String(length=100), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_report_jobs_id", "report_jobs", ["id"], unique=False)
+    op.create_index("ix_report_jobs_job_id", "report_jobs", ["job_id"], unique=True)
+    op.create_index("ix_report_jobs_status_created_at", "report_jobs", ["status", "created_at"], unique=False)
+    op.create_index("ix_report_jobs_user_id", "report_jobs", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table("report_jobs")
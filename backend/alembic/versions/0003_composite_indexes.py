@@ -0,0 +1,45 @@
+"""热点查询的复合索引
+
+- messages (conversation_id, created_at, id)：按对话读取历史（键集分页）无需额外排序
+- conversations (user_id, updated_at DESC)：用户对话列表按更新时间倒序，同时覆盖按用户计数
+
+两个复合索引的前缀覆盖了原有的单列索引，删除单列索引以减少写入开销
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:02
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_messages_conversation_id_created_at_id",
+        "messages",
+        ["conversation_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_conversations_user_id_updated_at",
+        "conversations",
+        ["user_id", sa.text("updated_at DESC")],
+        unique=False,
+    )
+    op.drop_index("ix_messages_conversation_id", table_name="messages")
+    op.drop_index("ix_conversations_user_id", table_name="conversations")
+
+
+def downgrade() -> None:
+    op.create_index("ix_conversations_user_id", "conversations", ["user_id"], unique=False)
+    op.create_index("ix_messages_conversation_id", "messages", ["conversation_id"], unique=False)
+    op.drop_index("ix_conversations_user_id_updated_at", table_name="conversations")
+    op.drop_index("ix_messages_conversation_id_created_at_id", table_name="messages")
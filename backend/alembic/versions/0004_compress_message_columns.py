@@ -0,0 +1,103 @@
+"""消息内容和JSON列改为压缩存储
+
+messages.content / function_call / tool_calls / metadata 改为二进制列（app.db.types.CompressedText / CompressedJSON），
+并按主键分批回填：超过 DB_COMPRESSION_MIN_SIZE_BYTES 的值压缩，其余值转为UTF-8字节
+
+SQLite回收空间需要在迁移后手动执行 VACUUM
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:03
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import compress_text, decompress_text, is_compressed
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 列名 -> 迁移前的类型
+COLUMNS = {
+    "content": sa.Text(),
+    "function_call": sa.JSON(),
+    "tool_calls": sa.JSON(),
+    "metadata": sa.JSON(),
+}
+BATCH_SIZE = 1000
+
+
+def _rewrite(convert) -> None:
+    """按主键分批读取原始值（不经过列类型转换），用convert转换后批量写回"""
+    bind = op.get_bind()
+    messages = sa.table("messages", sa.column("id"), *(sa.column(name) for name in COLUMNS))
+    statement = (
+        sa.update(messages)
+        .where(messages.c.id == sa.bindparam("_id"))
+        .values({name: sa.bindparam(f"_{name}") for name in COLUMNS})
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(messages).where(messages.c.id > last_id).order_by(messages.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        updates = []
+        for row in rows:
+            values = {f"_{name}": convert(getattr(row, name)) for name in COLUMNS}
+            if any(values[f"_{name}"] != getattr(row, name) for name in COLUMNS):
+                updates.append({"_id": row.id, **values})
+        if updates:
+            bind.execute(statement, updates)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("messages") as batch_op:
+        for name, old_type in COLUMNS.items():
+            batch_op.alter_column(
+                name,
+                existing_type=old_type,
+                type_=sa.LargeBinary(),
+                existing_nullable=True,
+                postgresql_using=f"convert_to({name}::text, 'UTF8')",
+            )
+
+    def _compress(value):
+        if value is None or is_compressed(value):
+            return value
+        return compress_text(decompress_text(value))
+
+    _rewrite(_compress)
+
+
+def downgrade() -> None:
+    is_sqlite = op.get_bind().dialect.name == "sqlite"
+
+    def _decompress(value):
+        text = decompress_text(value)
+        if text is None:
+            return None
+        # SQLite按值保存存储类型，需要写回文本；其他数据库先写回UTF-8字节再转换列类型
+        return text if is_sqlite else text.encode("utf-8")
+
+    _rewrite(_decompress)
+
+    with op.batch_alter_table("messages") as batch_op:
+        for name, old_type in COLUMNS.items():
+            cast = "" if isinstance(old_type, sa.Text) else "::json"
+            batch_op.alter_column(
+                name,
+                existing_type=sa.LargeBinary(),
+                type_=old_type,
+                existing_nullable=True,
+                postgresql_using=f"convert_from({name}, 'UTF8'){cast}",
+            )
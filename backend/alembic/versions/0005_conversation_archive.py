@@ -0,0 +1,32 @@
+"""冷对话归档：conversations 增加归档位置列
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:04
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.add_column(sa.Column("archived_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("archive_segment", sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column("archive_offset", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("archive_length", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.drop_column("archive_length")
+        batch_op.drop_column("archive_offset")
+        batch_op.drop_column("archive_segment")
+        batch_op.drop_column("archived_at")
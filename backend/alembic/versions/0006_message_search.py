@@ -0,0 +1,105 @@
+"""消息全文索引：message_search 表和 SQLite FTS5 虚拟表
+
+message_search 保存预分词后的消息文本（app.core.search_tokenizer），SQLite上作为FTS5外部内容表，
+由触发器同步到 message_search_fts；其他数据库只创建 message_search 表（暂不支持搜索）
+
+已有的user/assistant消息按主键分批回填；迁移前已归档的对话不在热表中，需要恢复后才会被索引
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:05
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.search_tokenizer import tokenize
+from app.db.types import decompress_text
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_TABLE = "message_search_fts"
+BATCH_SIZE = 1000
+
+
+def _backfill() -> None:
+    """按消息主键分批读取原始内容（不经过列类型转换），分词后写入 message_search"""
+    bind = op.get_bind()
+    messages = sa.table("messages", sa.column("id"), sa.column("conversation_id"), sa.column("role"), sa.column("content"))
+    conversations = sa.table("conversations", sa.column("id"), sa.column("user_id"))
+    message_search = sa.table("message_search", sa.column("conversation_id"), sa.column("user_id"), sa.column("tokens"))
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(messages.c.id, messages.c.conversation_id, messages.c.role, messages.c.content, conversations.c.user_id)
+            .join(conversations, conversations.c.id == messages.c.conversation_id)
+            .where(messages.c.id > last_id)
+            .order_by(messages.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        inserts = []
+        for row in rows:
+            tokens = tokenize(decompress_text(row.content)) if row.role in ("user", "assistant") else ""
+            if tokens:
+                inserts.append({"conversation_id": row.conversation_id, "user_id": row.user_id, "tokens": tokens})
+        if inserts:
+            bind.execute(sa.insert(message_search), inserts)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.create_table(
+        "message_search",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("conversation_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("tokens", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["conversation_id"], ["conversations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_message_search_conversation_id"), "message_search", ["conversation_id"], unique=False)
+
+    _backfill()
+
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    # 分词已在写入前完成，FTS5只需按空白切分；user_id列用于在MATCH中按用户过滤
+    op.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"user_id, tokens, content='message_search', content_rowid='id', tokenize='unicode61')"
+    )
+    op.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    op.execute(
+        f"CREATE TRIGGER message_search_ai AFTER INSERT ON message_search BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, user_id, tokens) VALUES (new.id, new.user_id, new.tokens); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER message_search_ad AFTER DELETE ON message_search BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_id, tokens) VALUES ('delete', old.id, old.user_id, old.tokens); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER message_search_au AFTER UPDATE ON message_search BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_id, tokens) VALUES ('delete', old.id, old.user_id, old.tokens); "
+        f"INSERT INTO {FTS_TABLE}(rowid, user_id, tokens) VALUES (new.id, new.user_id, new.tokens); END"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS message_search_au")
+        op.execute("DROP TRIGGER IF EXISTS message_search_ad")
+        op.execute("DROP TRIGGER IF EXISTS message_search_ai")
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    op.drop_index(op.f("ix_message_search_conversation_id"), table_name="message_search")
+    op.drop_table("message_search")
@@ -26,11 +26,14 @@ class ConversationSummary(BaseModel):
     title: str
     date: str
     summary: str
+    message_count: int = 0
+    updated_at: Optional[str] = None
 
 
 class ConversationsResponse(BaseModel):
     """会话列表响应模型"""
     conversations: List[ConversationSummary]
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有更多数据时为空")
 
 
 class Message(BaseModel):
@@ -3,9 +3,9 @@
 
 import json
 import os
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from typing import Generator
+from typing import Generator, Optional
 import sys
 import os
 # 添加backend目录到路径
@@ -20,6 +20,8 @@ from api.models import (
     ErrorResponse
 )
 from services.agent_service import agent_service
+from app.core.conversation_journal import read_conversation_items
+from app.core.conversation_catalog import get_conversation_catalog
 
 
 router = APIRouter(prefix="/api", tags=["chat"])
@@ -101,84 +103,40 @@ async def chat(request: ChatRequest):
 
 
 @router.get("/conversations", response_model=ConversationsResponse)
-async def get_conversations():
+async def get_conversations(
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="分页游标，上一页返回的next_cursor")
+):
     """
-    获取所有会话列表
+    获取会话列表（按创建时间倒序分页，从会话目录索引读取，不打开会话正文）
     
+    Args:
+        limit: 每页数量
+        before: 分页游标
+        
     Returns:
         会话列表
     """
     try:
-        conversations = []
         # files目录在backend目录下
         files_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files")
+        rows = get_conversation_catalog(files_dir).list(limit=limit, before=before)
         
-        if not os.path.exists(files_dir):
-            return ConversationsResponse(conversations=[])
-        
-        # 遍历files目录下的所有会话文件夹
-        for conversation_id in os.listdir(files_dir):
-            conversation_path = os.path.join(files_dir, conversation_id)
-            
-            if not os.path.isdir(conversation_path):
-                continue
-            
-            # 读取conversation.json获取会话信息
-            json_path = os.path.join(conversation_path, "conversation.json")
-            if not os.path.exists(json_path):
-                continue
-            
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    messages = json.load(f)
-                
-                # 提取第一条用户消息作为标题
-                title = "新会话"
-                summary = ""
-                # 从会话ID提取日期（格式：YYYYMMDD-HHMMSS+随机数）
-                date = conversation_id.split("-")[0] if "-" in conversation_id else ""
-                # 提取完整的时间戳用于排序（格式：YYYYMMDD-HHMMSS）
-                timestamp_str = "-".join(conversation_id.split("-")[:2]) if "-" in conversation_id else conversation_id
-                
-                for msg in messages:
-                    if msg.get("role") == "user" and "content" in msg:
-                        title = msg["content"][:30] + ("..." if len(msg["content"]) > 30 else "")
-                        break
-                
-                # 提取最后一条助手消息作为摘要
-                for msg in reversed(messages):
-                    if msg.get("role") == "assistant" and "content" in msg:
-                        summary = msg["content"][:100] + ("..." if len(msg["content"]) > 100 else "")
-                        break
-                
-                conversations.append({
-                    "id": conversation_id,
-                    "title": title,
-                    "date": date,
-                    "summary": summary,
-                    "timestamp": timestamp_str  # 用于排序的时间戳
-                })
-                
-            except Exception as e:
-                # 跳过无法解析的会话
-                continue
-        
-        # 按时间戳倒序排列（最新的在最前面）
-        # 会话ID格式：YYYYMMDD-HHMMSS+随机数，按完整ID倒序排序即可
-        conversations.sort(key=lambda x: x["id"], reverse=True)
-        
-        # 转换为ConversationSummary模型
+        # 会话ID格式：YYYYMMDD-HHMMSS+随机数，日期取第一段
         conversation_summaries = [
             ConversationSummary(
-                id=conv["id"],
-                title=conv["title"],
-                date=conv["date"],
-                summary=conv["summary"]
+                id=row["id"],
+                title=row["title"] or "新会话",
+                date=row["id"].split("-")[0] if "-" in row["id"] else "",
+                summary=row["summary"],
+                message_count=row["message_count"],
+                updated_at=row["updated_at"]
             )
-            for conv in conversations
+            for row in rows
         ]
+        next_cursor = rows[-1]["id"] if len(rows) == limit else None
         
-        return ConversationsResponse(conversations=conversation_summaries)
+        return ConversationsResponse(conversations=conversation_summaries, next_cursor=next_cursor)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取会话列表失败: {str(e)}")
@@ -197,14 +155,11 @@ async def get_conversation(conversation_id: str):
     """
     try:
         files_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files")
-        json_path = os.path.join(files_dir, conversation_id, "conversation.json")
+        messages_data = read_conversation_items(os.path.join(files_dir, conversation_id))
         
-        if not os.path.exists(json_path):
+        if not messages_data:
             raise HTTPException(status_code=404, detail="会话不存在")
         
-        with open(json_path, "r", encoding="utf-8") as f:
-            messages_data = json.load(f)
-        
         # 转换为Message模型
         messages = []
         for msg in messages_data:
@@ -1,9 +1,22 @@
 """
 智能体包
+导出的类和实例按需加载，导入 app.agents.stock_agent 时不会连带导入管理器和配置
 """
-from app.agents.base import BaseAgent
-from app.agents.stock_agent import StockAnalysisAgent
-from app.agents.manager import AgentManager, agent_manager
+_EXPORTS = {
+    "BaseAgent": "app.agents.base",
+    "StockAnalysisAgent": "app.agents.stock_agent",
+    "AgentManager": "app.agents.manager",
+    "agent_manager": "app.agents.manager",
+}
+
+
+def __getattr__(name: str):
+    """首次访问时才导入对应模块"""
+    if name in _EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "BaseAgent",
@@ -134,7 +134,7 @@ class AgentManager:
             是否移除成功
         """
         if user_id in self._agents and conversation_id in self._agents[user_id]:
-            del self._agents[user_id][conversation_id]
+            self._close_agent(self._agents[user_id].pop(conversation_id))
             del self._last_access[user_id][conversation_id]
 
             # 如果用户没有智能体了，删除用户条目
@@ -147,6 +147,17 @@ class AgentManager:
 
         return False
 
+    @staticmethod
+    def _close_agent(agent: BaseAgent) -> None:
+        """释放智能体持有的资源（例如会话日志中尚未落盘的内容）"""
+        close = getattr(agent, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"关闭智能体失败: {str(e)}")
+
     def _cleanup_user_agents(self, user_id: str) -> int:
         """
         清理用户的过期智能体
@@ -232,7 +243,8 @@ class AgentManager:
         count = self.get_user_agent_count(user_id)
 
         if user_id in self._agents:
-            del self._agents[user_id]
+            for agent in self._agents.pop(user_id).values():
+                self._close_agent(agent)
             del self._last_access[user_id]
             logger.info(f"清空用户智能体: user_id={user_id}, count={count}")
 
@@ -241,6 +253,9 @@ class AgentManager:
     def clear_all(self) -> None:
         """清空所有智能体"""
         total = self.get_total_agent_count()
+        for agents in self._agents.values():
+            for agent in agents.values():
+                self._close_agent(agent)
         self._agents.clear()
         self._last_access.clear()
         logger.info(f"清空所有智能体: total={total}")
@@ -0,0 +1,161 @@
+"""
+模型路由
+根据用户消息的复杂度在完整模型（AI_MODEL）和轻量模型（AI_FLASH_MODEL）之间选择
+
+路由顺序：
+1. 规则：出现股票代码或分析类关键词 -> 完整模型；寒暄、致谢、简短追问 -> 轻量模型
+2. 可选的轻量模型分类（MODEL_ROUTING_LLM_CLASSIFIER，仅用于规则无法判断的消息）
+3. 默认使用完整模型
+"""
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.core.answer_cache import SYMBOL_PATTERN
+
+logger = logging.getLogger(__name__)
+
+TIER_FULL = "full"
+TIER_FLASH = "flash"
+
+# 纯数字股票代码（如 600519、000001）
+_BARE_CODE_PATTERN = re.compile(r"(?<!\d)\d{6}(?!\d)")
+
+# 需要工具或深度推理的关键词
+ANALYSIS_KEYWORDS = (
+    "分析", "报告", "财务", "财报", "估值", "利润", "营收", "收入", "现金流", "负债", "资产",
+    "股东", "持仓", "机构", "行业", "对比", "比较", "指标", "市盈率", "市净率", "roe",
+    "毛利", "净利", "增长", "业绩", "走势", "行情", "买入", "卖出", "投资", "风险", "预测",
+    "主营", "业务", "分红", "股价", "代码",
+)
+
+# 寒暄与简短交互
+SMALL_TALK_PATTERN = re.compile(
+    r"^(你好|您好|嗨|哈喽|hi|hello|hey|在吗|在么|早上好|下午好|晚上好|早安|晚安|"
+    r"谢谢|多谢|感谢|谢了|thanks|thank you|好的|好|嗯|嗯嗯|ok|okay|收到|明白|懂了|"
+    r"再见|拜拜|bye|你是谁|你叫什么|你能做什么|你会什么|你是什么模型)"
+    r"[\s!！。.,，~～?？啊呀呢吧哈]*$",
+    re.IGNORECASE
+)
+
+# 对上一轮回答的简短追问
+FOLLOW_UP_PATTERN = re.compile(
+    r"(什么意思|解释一下|再说一遍|简单说|总结一下|概括一下|继续|还有吗|为什么|怎么理解|举个例子|换句话说)"
+)
+
+CLASSIFIER_PROMPT = (
+    "判断用户消息是否需要查询股票数据或进行专业的股票分析。"
+    "需要则只回答 COMPLEX，寒暄、闲聊或简单追问则只回答 SIMPLE。"
+)
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """路由结果"""
+    model: str
+    tier: str
+    reason: str
+
+
+class ModelRouter:
+    """模型路由器"""
+
+    def route(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, Any]]] = None,
+        client: Any = None
+    ) -> RoutingDecision:
+        """
+        为消息选择模型
+
+        Args:
+            message: 用户消息
+            history: 当前对话记录（用于判断是否为追问）
+            client: OpenAI客户端（启用轻量模型分类时使用）
+
+        Returns:
+            路由结果
+        """
+        decision = self._route(message, history or [], client)
+        logger.info(
+            f"模型路由: tier={decision.tier}, model={decision.model}, "
+            f"reason={decision.reason}, message_length={len(message)}"
+        )
+        return decision
+
+    def _route(self, message: str, history: List[Dict[str, Any]], client: Any) -> RoutingDecision:
+        """路由实现"""
+        if not settings.MODEL_ROUTING_ENABLED:
+            return self._full("routing_disabled")
+
+        text = message.strip()
+        lowered = text.lower()
+
+        if SYMBOL_PATTERN.search(text) or _BARE_CODE_PATTERN.search(text):
+            return self._full("stock_symbol")
+
+        if any(keyword in lowered for keyword in ANALYSIS_KEYWORDS):
+            return self._full("analysis_keyword")
+
+        if SMALL_TALK_PATTERN.match(text):
+            return self._flash("small_talk")
+
+        has_previous_answer = any(msg.get("role") == "assistant" for msg in history)
+        if (
+            has_previous_answer
+            and len(text) <= settings.MODEL_ROUTING_FLASH_MAX_CHARS
+            and FOLLOW_UP_PATTERN.search(text)
+        ):
+            return self._flash("follow_up")
+
+        if settings.MODEL_ROUTING_LLM_CLASSIFIER and client is not None:
+            return self._classify(text, client)
+
+        return self._full("default")
+
+    def _classify(self, message: str, client: Any) -> RoutingDecision:
+        """
+        使用轻量模型分类（失败时回退到完整模型）
+
+        Args:
+            message: 用户消息
+            client: OpenAI客户端
+
+        Returns:
+            路由结果
+        """
+        try:
+            response = client.chat.completions.create(
+                model=settings.AI_FLASH_MODEL,
+                messages=[
+                    {"role": "system", "content": CLASSIFIER_PROMPT},
+                    {"role": "user", "content": message},
+                ],
+                max_tokens=4,
+                temperature=0,
+                timeout=settings.MODEL_ROUTING_CLASSIFIER_TIMEOUT,
+                extra_body={"thinking": {"type": "disabled"}},
+            )
+            label = (response.choices[0].message.content or "").strip().upper()
+        except Exception as e:
+            logger.warning(f"模型路由分类失败，使用完整模型: {str(e)}")
+            return self._full("classifier_error")
+
+        if label.startswith("SIMPLE"):
+            return self._flash("classifier")
+        return self._full("classifier")
+
+    @staticmethod
+    def _full(reason: str) -> RoutingDecision:
+        return RoutingDecision(model=settings.AI_MODEL, tier=TIER_FULL, reason=reason)
+
+    @staticmethod
+    def _flash(reason: str) -> RoutingDecision:
+        return RoutingDecision(model=settings.AI_FLASH_MODEL, tier=TIER_FLASH, reason=reason)
+
+
+# 创建全局路由器实例
+model_router = ModelRouter()
@@ -2,50 +2,26 @@
 import os
 import json
 import random
-import openai
-import arxiv
 
-import pysnowball as ball
-from openai import OpenAI
 from textwrap import dedent
 from datetime import datetime
-from dotenv import load_dotenv
 
-from write_code_tools import *
+# 工具注册表、模型路由、配置等依赖pydantic，在首次使用时才导入，保持模块本身的冷启动导入轻量
+from app.core import ids
 
 from typing import Generator, Dict, Any, Optional, List, AsyncGenerator
 import asyncio
 
-INFO_TEMPLATE = dedent(
-    """
-    cash_flow:
-    {cash_flow}
-    ---
-
-    income:
-    {income}
-    ----
-
-    business:
-    {business}
-    ----
-
-    top_holders:
-    {top_holders}
-    ---
+# 论文/代码复现工具及其重量级依赖（arxiv、PyPDF2）按需加载
+_LAZY_RESEARCH_ATTRIBUTES = ("ArxivPaperTool", "modular_coding", "get_doubao_answer")
 
-    main_indicator:
-    {main_indicator}
-    ---
 
-    org_holding_change:
-    {org_holding_change}
-    ---
-
-    industry_compare:
-    {industry_compare}
-    """
-).strip()
+def __getattr__(name: str):
+    """兼容旧的导入路径，首次访问时才导入 research_tools"""
+    if name in _LAZY_RESEARCH_ATTRIBUTES:
+        from app.agents import research_tools
+        return getattr(research_tools, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 STOCK_AGENT_PROMPT = dedent(
@@ -60,90 +36,24 @@ STOCK_AGENT_PROMPT = dedent(
     """
 ).strip()
 
-load_dotenv()
-xq_a_token = os.getenv("xq_a_token")
-ball.set_token(f"xq_a_token={xq_a_token}")
-
-model = "doubao-seed-1-6-251015"
-DOUBAO_API_KEY = os.getenv("DOUBAO_API_KEY")
-
-client = OpenAI(
-    base_url="https://ark.cn-beijing.volces.com/api/v3",
-    api_key=DOUBAO_API_KEY,
-)
-
-def get_doubao_answer(
-    query: str,
-    system_prompt: str = None,
-    stream: bool = True,
-    thinking: bool = "disabled",
-):
-    messages = []
-    if system_prompt is None:
-        system_prompt = "你必须严格遵守我的要求。"
-
-    system_message = {"role": "system", "content": system_prompt}
-    user_message = {"role": "user", "content": query}
-    messages.append(system_message)
-    messages.append(user_message)
-
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        stream=stream,
-        extra_body={"thinking": {"type": thinking}}
-    )
-    responses = []
-    answer = ""
-    for chunk in response:
-        responses.append(chunk)
-        if chunk.choices[0].delta.content:
-            char = chunk.choices[0].delta.content
-            answer += char
-            print(char, end="", flush=True)
-    return answer
 
 def get_stock_info(symbol: str):
-    cash_flow = ball.cash_flow(symbol)["data"]["list"]
-    income = ball.income(symbol=symbol,is_annals=1,count=1)["data"]["list"]
-    # 主营业务构成
-    business = ball.business(symbol=symbol,count=1)["data"]["list"]
-    # 十大股东
-    top_holders = ball.top_holders(symbol=symbol,circula=0)["data"]["items"]
-    # 主要指标
-    main_indicator = ball.main_indicator(symbol)["data"]
-    # 机构持仓
-    org_holding_change = ball.org_holding_change(symbol)["data"]["items"]
-    # 行业对比
-    industry_compare = ball.industry_compare(symbol)["data"]
-    info = INFO_TEMPLATE.format(
-        cash_flow=cash_flow,
-        income=income,
-        business=business,
-        top_holders=top_holders,
-        main_indicator=main_indicator,
-        org_holding_change=org_holding_change,
-        industry_compare=industry_compare
-    )
-
-    return info
+    """
+    获取股票信息（兼容旧接口，实际通过工具注册表中的 get_stock_info 工具并发获取）
+    """
+    from app.agents.tools import tool_registry
+
+    return tool_registry.get_tool("get_stock_info").execute(symbol=symbol)
 
 def generate_conversation_id() -> str:
     """
-    生成基于时间戳和随机数的会话ID
-    格式: yyyymmdd-hhmmss+随机字符串（5位随机数字）
-    
+    生成会话ID（与聊天接口使用同一规则）
+    格式: yyyymmdd-hhmmss-毫秒+随机串，见 app.core.ids
+
     Returns:
-        str: 格式化的会话ID，例如 "20240115-14305212345"
+        str: 格式化的会话ID，例如 "20240115-143052-2071K8ZQ3M4XW9TN6PB"
     """
-    now = datetime.now()
-    # 格式化时间部分: yyyymmdd-hhmmss
-    time_part = now.strftime("%Y%m%d-%H%M%S")
-    # 生成5位随机数字
-    random_part = random.randint(10000, 99999)
-    # 组合成完整ID
-    conversation_id = f"{time_part}{random_part}"
-    return conversation_id
+    return ids.generate_conversation_id()
 
 
 def generate_guest_user_id() -> str:
@@ -166,89 +76,6 @@ def generate_guest_user_id() -> str:
 
 # -------------------- 工具定义 --------------------
 
-class ArxivPaperTool:
-    """arXiv 论文搜索工具"""
-    
-    @staticmethod
-    def execute(**kwargs) -> str:
-        """
-        获取 arxiv 最新的 n 篇与关键词相关的论文。
-        
-        Args:
-            query: 搜索关键词（必须是英文）
-            num_papers: 最大搜索结果数
-            
-        Returns:
-            格式化的论文信息字符串
-            
-        Raises:
-            ValueError: 当 query 为空或 num_papers 无效时
-        """
-        query = kwargs["query"]
-        num_papers = kwargs["num_papers"]
-
-        if not query:
-            raise ValueError("query 不能为空")
-        if num_papers <= 0:
-            raise ValueError("num_papers 必须为正整数")
-
-        search = arxiv.Search(
-            query=query,
-            max_results=num_papers,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-            sort_order=arxiv.SortOrder.Descending,
-        )
-
-        client = arxiv.Client()
-        papers = []
-
-        for result in client.results(search):
-            author_names = [
-                author.name if hasattr(author, "name") else str(author) 
-                for author in result.authors
-            ]
-            submitted_at = (
-                result.published.strftime("%Y-%m-%d") 
-                if result.published else "未知"
-            )
-
-            paper_info = [
-                f"标题: {result.title.strip()}",
-                f"作者: {', '.join(author_names)}" if author_names else "作者: 未知",
-                f"摘要: {result.summary.strip()}",
-                f"提交日期: {submitted_at}",
-                f"链接: {result.entry_id}",
-                "-" * 80,
-            ]
-
-            papers.append("\n".join(paper_info))
-
-        return "\n\n".join(papers)
-
-class modular_coding:
-    @staticmethod
-    def execute(**kwargs) -> str:
-        """
-        根据需求，撰写项目架构中的某一个文件的代码
-        """
-        conversation_dir = kwargs["conversation_dir"]
-        model = kwargs["model"]
-        # 获取conversation_dir下面的PDF文件的绝对地址
-        all_codes = ""
-        for char in write_codebase(conversation_dir, model):
-            all_codes += char
-            yield char
-        # 将answer写入文件
-        folder_path = os.path.join(conversation_dir, "code")
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-        now = datetime.now()
-        # 格式化时间部分: yyyymmdd-hhmmss
-        time_part = now.strftime("%Y%m%d-%H%M%S")
-        file_path = os.path.join(folder_path, f"code-{time_part}.json")
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(json.dumps(all_codes, indent=4))
-
 class StockAnalysisTool:
     """
     股票分析
@@ -288,6 +115,7 @@ class StockAnalysisAgent:
         model: str = "doubao-seed-1-6-251015",
         conversation_id: Optional[str] = None,
         user_id: Optional[str] = None,
+        files_dir: str = "files",
     ):
         """
         初始化智能体
@@ -298,12 +126,22 @@ class StockAnalysisAgent:
             model: 使用的模型名称
             conversation_id: 会话ID，若为 None 则自动生成
             user_id: 用户ID，若为 None 则自动生成游客ID
+            files_dir: 会话记录根目录（默认为聊天会话使用的 files/）
         """
-        load_dotenv()
-        self.api_key = api_key or os.getenv("DOUBAO_API_KEY")
+        from app.agents.tools import tool_registry
+        from app.config import settings
+        from app.core.conversation_journal import ConversationJournal
+        from app.core.llm_client import get_llm_client
+
+        self.api_key = api_key or settings.effective_ai_api_key
         self.base_url = base_url
         self.model = model
-        self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+        if api_key is None and base_url == settings.AI_BASE_URL:
+            # 默认配置复用共享客户端和连接池（启动预热时已建立连接）
+            self.client = get_llm_client()
+        else:
+            from openai import OpenAI
+            self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
         
         # 生成或使用提供的用户ID
         self.user_id = user_id or generate_guest_user_id()
@@ -312,7 +150,7 @@ class StockAnalysisAgent:
         self.conversation_id = conversation_id or generate_conversation_id()
         
         # 创建会话文件夹
-        self.files_dir = "files"
+        self.files_dir = files_dir
         self.conversation_dir = os.path.join(self.files_dir, self.conversation_id)
         os.makedirs(self.conversation_dir, exist_ok=True)
         
@@ -320,34 +158,15 @@ class StockAnalysisAgent:
         self.conversations: List[Dict[str, str]] = [
             {"role": "system", "content": STOCK_AGENT_PROMPT}
         ]
+        # 追加写的会话日志；已有记录的会话继续追加，不重复写入系统提示词
+        self.journal = ConversationJournal(self.conversation_dir)
+        self._journaled = 1 if self.journal.exists() else 0
         
-        # 定义可用工具
-        self.tools = self._define_tools()
-        
-        # 工具名称到执行函数的映射
-        self.tool_executors = {
-            "get_stock_info": StockAnalysisTool.execute,
-        }
-
-    def _define_tools(self) -> List[Dict[str, Any]]:
-        """定义可用的工具列表"""
-        return [
-            {
-                "type": "function",
-                "name": "get_stock_info",
-                "description": "获取股票信息",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "股票代码，例如: SH600519",
-                        },
-                    },
-                    "required": ["symbol"],
-                },
-            }
-        ]
+        # 可用工具（工具注册表预先构建的只读Schema）
+        self.tools = tool_registry.get_responses_schemas()
+
+        # chat_async运行时的主事件循环，工具协程提交到该循环执行
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def _execute_tool(self, tool_name: str, tool_arguments: Dict[str, Any]) -> str:
         """
@@ -361,69 +180,30 @@ class StockAnalysisAgent:
             工具执行结果
             
         Raises:
-            ValueError: 当工具不存在时
+            ToolNotFoundError: 当工具不存在时
+            ToolExecutionError: 工具执行失败或超时
         """
-        if tool_name not in self.tool_executors:
-            raise ValueError(f"未知的工具: {tool_name}")
-        
-        executor = self.tool_executors[tool_name]
-        return executor(**tool_arguments)
+        from app.agents.tools import tool_executor
 
-    def _save_conversation_json(self) -> None:
+        return tool_executor.execute_sync(tool_name, tool_arguments, loop=self._event_loop)
+
+    def _save_conversation(self) -> None:
         """
-        保存对话记录为JSON格式
-        使用原子写入确保数据完整性
+        把本轮新增的对话条目追加到会话日志
+        只写入新内容，不再重写 conversation.json / conversation.md
         """
-        json_path = os.path.join(self.conversation_dir, "conversation.json")
         try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(json_path), exist_ok=True)
-            
-            # 使用临时文件进行原子写入
-            temp_file = f"{json_path}.tmp"
-            with open(temp_file, "w", encoding="utf-8") as f:
-                json.dump(self.conversations, f, ensure_ascii=False, indent=2)
-            
-            # 原子性重命名
-            if os.path.exists(json_path):
-                os.replace(temp_file, json_path)
-            else:
-                os.rename(temp_file, json_path)
+            self.journal.append(self.conversations[self._journaled:])
+            self._journaled = len(self.conversations)
         except Exception as e:
-            # 清理临时文件
-            temp_file = f"{json_path}.tmp"
-            if os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-            print(f"保存JSON对话记录失败: {e}")
-
-    def _save_conversation_markdown(self) -> None:
-        """
-        保存对话记录为Markdown格式
-        """
-        md_path = os.path.join(self.conversation_dir, "conversation.md")
+            print(f"保存对话记录失败: {e}")
+
+    def close(self) -> None:
+        """释放智能体前把会话日志中尚未fsync的内容落盘"""
         try:
-            with open(md_path, "w", encoding="utf-8") as f:
-                f.write("# 对话记录\n\n")
-                f.write(f"会话ID: {self.conversation_id}\n\n")
-                f.write("---\n\n")
-                
-                for msg in self.conversations:
-                    role = msg.get("role", "unknown")
-                    content = msg.get("content", "")
-                    
-                    if role == "user":
-                        f.write(f"## 用户\n\n{content}\n\n")
-                    elif role == "assistant":
-                        f.write(f"## 助手\n\n{content}\n\n")
-                    elif role == "system":
-                        f.write(f"## 系统\n\n{content}\n\n")
-                    
-                    f.write("---\n\n")
+            self.journal.close()
         except Exception as e:
-            print(f"保存Markdown对话记录失败: {e}")
+            print(f"会话日志落盘失败: {e}")
 
     def chat(self, user_question: str) -> Generator[str, None, None]:
         """
@@ -435,6 +215,14 @@ class StockAnalysisAgent:
         Yields:
             流式输出的智能体回答
         """
+        from openai.types.responses import ResponseOutputItemAddedEvent
+        from app.agents.model_router import model_router, TIER_FLASH
+
+        # 按问题复杂度选择模型：寒暄和简单追问使用轻量模型
+        routing = model_router.route(user_question, self.conversations, self.client)
+        model = routing.model if routing.tier == TIER_FLASH else self.model
+        self.last_routing = routing
+
         # 第一轮请求：触发工具调用（如果需要）
         self.conversations.append({
             "type": "message",
@@ -443,7 +231,7 @@ class StockAnalysisAgent:
         })
 
         response = self.client.responses.create(
-            model=self.model,
+            model=model,
             input=self.conversations,
             stream=True,
             tools=self.tools,
@@ -455,7 +243,7 @@ class StockAnalysisAgent:
         assistant_response = ""
         for i, event in enumerate(response):
             if i == 2:
-                if type(event) == openai.types.responses.response_output_item_added_event.ResponseOutputItemAddedEvent:
+                if type(event) == ResponseOutputItemAddedEvent:
                     if event.item.type == "function_call":
                         response_type = "function_call"
                         tool_call = True
@@ -478,7 +266,7 @@ class StockAnalysisAgent:
                 "output": json.dumps(tool_output, ensure_ascii=False),
             })
             response = self.client.responses.create(
-                model=self.model,
+                model=model,
                 previous_response_id=event.response.id,
                 input=self.conversations,
                 stream=True,
@@ -490,7 +278,7 @@ class StockAnalysisAgent:
             assistant_response = ""
             for i, event in enumerate(response):
                 if i == 2:
-                    if type(event) == openai.types.responses.response_output_item_added_event.ResponseOutputItemAddedEvent:
+                    if type(event) == ResponseOutputItemAddedEvent:
                         if event.item.type == "function_call":
                             response_type = "function_call"
                             tool_call = True
@@ -509,8 +297,7 @@ class StockAnalysisAgent:
             })
         
         # 保存对话记录
-        self._save_conversation_json()
-        self._save_conversation_markdown()
+        self._save_conversation()
 
     async def chat_async(self, user_question: str) -> AsyncGenerator[str, None]:
         """
@@ -525,7 +312,9 @@ class StockAnalysisAgent:
         # 使用队列在线程中运行同步生成器，保持流式特性
         queue = asyncio.Queue()
         loop = asyncio.get_event_loop()
+        self._event_loop = loop
         done = False
+        cancelled = False
         error = None
         
         def run_chat():
@@ -533,6 +322,9 @@ class StockAnalysisAgent:
             nonlocal done, error
             try:
                 for chunk in self.chat(user_question):
+                    if cancelled:
+                        # 客户端已断开，关闭生成器以结束模型流式调用
+                        break
                     # 将chunk放入队列
                     loop.call_soon_threadsafe(queue.put_nowait, chunk)
                 loop.call_soon_threadsafe(queue.put_nowait, None)  # 结束标记
@@ -544,11 +336,14 @@ class StockAnalysisAgent:
         loop.run_in_executor(None, run_chat)
         
         # 异步从队列中获取chunks
-        while True:
-            chunk = await queue.get()
-            if chunk is None:  # 结束标记
-                break
-            yield chunk
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:  # 结束标记
+                    break
+                yield chunk
+        finally:
+            cancelled = True
         
         # 如果有错误，抛出异常
         if error:
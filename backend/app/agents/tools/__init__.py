@@ -3,6 +3,7 @@
 """
 from app.agents.tools.base import BaseTool, ToolSchema, ToolParameter
 from app.agents.tools.registry import ToolRegistry, tool_registry, register_tool
+from app.agents.tools.executor import ToolExecutor, tool_executor
 from app.agents.tools.stock_tool import StockInfoTool
 
 # 自动导入时注册所有工具
@@ -15,5 +16,7 @@ __all__ = [
     "ToolRegistry",
     "tool_registry",
     "register_tool",
+    "ToolExecutor",
+    "tool_executor",
     "StockInfoTool",
 ]
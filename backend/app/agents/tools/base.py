@@ -1,6 +1,7 @@
 """
 工具系统抽象基类
 """
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
@@ -24,6 +25,9 @@ class ToolSchema(BaseModel):
 class BaseTool(ABC):
     """工具抽象基类"""
 
+    # 单次执行超时时间（秒），None表示使用全局配置TOOL_TIMEOUT_SECONDS
+    timeout: Optional[float] = None
+
     def __init__(self):
         self._name: Optional[str] = None
         self._description: Optional[str] = None
@@ -66,6 +70,23 @@ class BaseTool(ABC):
         """
         pass
 
+    async def execute_async(self, **kwargs) -> str:
+        """
+        异步执行工具
+
+        默认在线程中运行同步的execute，I/O密集型工具应重写为原生异步实现
+
+        Args:
+            **kwargs: 工具参数
+
+        Returns:
+            执行结果（字符串格式）
+
+        Raises:
+            ToolExecutionError: 工具执行失败
+        """
+        return await asyncio.to_thread(self.execute, **kwargs)
+
     def get_openai_schema(self) -> Dict[str, Any]:
         """
         获取OpenAI格式的工具Schema
@@ -82,6 +103,20 @@ class BaseTool(ABC):
             }
         }
 
+    def get_responses_schema(self) -> Dict[str, Any]:
+        """
+        获取OpenAI Responses API格式的工具Schema
+
+        Returns:
+            Responses API function tool格式的Schema
+        """
+        return {
+            "type": "function",
+            "name": self.name,
+            "description": self.description,
+            "parameters": self.parameters_schema
+        }
+
     def validate_parameters(self, **kwargs) -> bool:
         """
         验证参数
@@ -0,0 +1,109 @@
+"""
+工具执行器
+通过工具注册表分发工具调用，统一处理参数校验、超时和并发预算
+"""
+import asyncio
+import logging
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from app.agents.tools.registry import ToolRegistry
+from app.config import settings
+from app.core.exceptions import ToolExecutionError, ToolValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class ToolExecutor:
+    """工具执行器（单例模式）"""
+
+    _instance: Optional["ToolExecutor"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            # 信号量绑定事件循环，按循环分别创建
+            cls._instance._semaphores = weakref.WeakKeyDictionary()  # {loop: Semaphore}
+        return cls._instance
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环的并发信号量"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.TOOL_MAX_CONCURRENCY)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def execute(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """
+        异步执行工具
+
+        Args:
+            tool_name: 工具名称
+            arguments: 工具参数
+
+        Returns:
+            工具执行结果
+
+        Raises:
+            ToolNotFoundError: 工具不存在
+            ToolValidationError: 缺少必需参数
+            ToolExecutionError: 工具执行失败或超时
+        """
+        tool = ToolRegistry.get_tool(tool_name)
+
+        if not tool.validate_parameters(**arguments):
+            raise ToolValidationError(
+                f"工具 '{tool_name}' 缺少必需参数",
+                details={"arguments": arguments}
+            )
+
+        timeout = tool.timeout or settings.TOOL_TIMEOUT_SECONDS
+
+        async with self._get_semaphore():
+            start_time = time.time()
+            try:
+                result = await asyncio.wait_for(tool.execute_async(**arguments), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"工具执行超时: {tool_name}, timeout={timeout}s")
+                raise ToolExecutionError(
+                    f"工具 '{tool_name}' 执行超时",
+                    details={"timeout": timeout, "arguments": arguments}
+                )
+
+        logger.info(f"[PERF] 工具 {tool_name} 执行耗时: {(time.time() - start_time) * 1000:.2f}ms")
+        return result
+
+    def execute_sync(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> str:
+        """
+        在同步代码（工作线程）中执行工具
+
+        如果提供了正在运行的事件循环，则将协程提交到该循环执行，
+        否则在当前线程中新建事件循环执行。
+
+        Args:
+            tool_name: 工具名称
+            arguments: 工具参数
+            loop: 主事件循环（可选）
+
+        Returns:
+            工具执行结果
+        """
+        coro = self.execute(tool_name, arguments)
+
+        if loop is not None and loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+            return future.result()
+
+        return asyncio.run(coro)
+
+
+# 创建全局执行器实例
+tool_executor = ToolExecutor()
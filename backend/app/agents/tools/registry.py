@@ -1,9 +1,13 @@
 """
 工具注册表
 提供工具的注册、查找和管理功能
+
+工具在注册时实例化一次并作为单例持有；OpenAI Schema列表预先构建并缓存，
+仅在注册/注销工具时失效，请求路径上获取Schema不产生任何对象分配。
 """
-from typing import Dict, List, Optional, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 import logging
+import threading
 
 from app.agents.tools.base import BaseTool
 from app.core.exceptions import ToolNotFoundError, ToolError
@@ -15,13 +19,24 @@ class ToolRegistry:
     """工具注册表（单例模式）"""
 
     _instance: Optional["ToolRegistry"] = None
-    _tools: Dict[str, Type[BaseTool]] = {}
+    _tools: Dict[str, BaseTool] = {}
+    _schemas: Optional[Tuple[Dict[str, Any], ...]] = None
+    _responses_schemas: Optional[Tuple[Dict[str, Any], ...]] = None
+    _version: int = 0
+    _lock = threading.RLock()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    @classmethod
+    def _invalidate(cls) -> None:
+        """使Schema缓存失效并递增版本号（调用方需持有锁）"""
+        cls._schemas = None
+        cls._responses_schemas = None
+        cls._version += 1
+
     @classmethod
     def register(cls, tool_class: Type[BaseTool]) -> None:
         """
@@ -33,14 +48,17 @@ class ToolRegistry:
         Raises:
             ToolError: 工具已存在
         """
-        # 创建临时实例以获取名称
-        temp_instance = tool_class()
-        tool_name = temp_instance.name
+        # 工具实例无状态，注册时创建单例
+        tool = tool_class()
+        tool_name = tool.name
 
-        if tool_name in cls._tools:
-            logger.warning(f"工具 {tool_name} 已存在，将被覆盖")
+        with cls._lock:
+            if tool_name in cls._tools:
+                logger.warning(f"工具 {tool_name} 已存在，将被覆盖")
+
+            cls._tools[tool_name] = tool
+            cls._invalidate()
 
-        cls._tools[tool_name] = tool_class
         logger.info(f"工具 {tool_name} 注册成功")
 
     @classmethod
@@ -51,9 +69,11 @@ class ToolRegistry:
         Args:
             tool_name: 工具名称
         """
-        if tool_name in cls._tools:
-            del cls._tools[tool_name]
-            logger.info(f"工具 {tool_name} 注销成功")
+        with cls._lock:
+            if tool_name in cls._tools:
+                del cls._tools[tool_name]
+                cls._invalidate()
+                logger.info(f"工具 {tool_name} 注销成功")
 
     @classmethod
     def get_tool(cls, tool_name: str) -> BaseTool:
@@ -64,19 +84,19 @@ class ToolRegistry:
             tool_name: 工具名称
 
         Returns:
-            工具实例
+            工具单例
 
         Raises:
             ToolNotFoundError: 工具不存在
         """
-        if tool_name not in cls._tools:
+        tool = cls._tools.get(tool_name)
+        if tool is None:
             raise ToolNotFoundError(
                 f"工具 '{tool_name}' 未注册",
                 details={"available_tools": list(cls._tools.keys())}
             )
 
-        tool_class = cls._tools[tool_name]
-        return tool_class()
+        return tool
 
     @classmethod
     def get_all_tools(cls) -> List[BaseTool]:
@@ -84,9 +104,9 @@ class ToolRegistry:
         获取所有工具实例
 
         Returns:
-            工具实例列表
+            工具单例列表
         """
-        return [tool_class() for tool_class in cls._tools.values()]
+        return list(cls._tools.values())
 
     @classmethod
     def get_tool_names(cls) -> List[str]:
@@ -99,20 +119,62 @@ class ToolRegistry:
         return list(cls._tools.keys())
 
     @classmethod
-    def get_openai_schemas(cls) -> List[Dict]:
+    def get_openai_schemas(cls) -> Tuple[Dict[str, Any], ...]:
         """
         获取所有工具的OpenAI Schema
 
+        返回预先构建的只读缓存，调用方不得修改。
+
+        Returns:
+            OpenAI格式的工具Schema元组
+        """
+        schemas = cls._schemas
+        if schemas is not None:
+            return schemas
+
+        with cls._lock:
+            if cls._schemas is None:
+                cls._schemas = tuple(tool.get_openai_schema() for tool in cls._tools.values())
+                logger.debug(f"构建工具Schema缓存: version={cls._version}, count={len(cls._schemas)}")
+            return cls._schemas
+
+    @classmethod
+    def get_responses_schemas(cls) -> Tuple[Dict[str, Any], ...]:
+        """
+        获取所有工具的OpenAI Responses API Schema
+
+        返回预先构建的只读缓存，调用方不得修改。
+
+        Returns:
+            Responses API格式的工具Schema元组
+        """
+        schemas = cls._responses_schemas
+        if schemas is not None:
+            return schemas
+
+        with cls._lock:
+            if cls._responses_schemas is None:
+                cls._responses_schemas = tuple(
+                    tool.get_responses_schema() for tool in cls._tools.values()
+                )
+            return cls._responses_schemas
+
+    @classmethod
+    def get_version(cls) -> int:
+        """
+        获取注册表版本号（每次注册/注销工具时递增）
+
         Returns:
-            OpenAI格式的工具Schema列表
+            版本号
         """
-        tools = cls.get_all_tools()
-        return [tool.get_openai_schema() for tool in tools]
+        return cls._version
 
     @classmethod
     def clear(cls) -> None:
         """清空所有注册的工具"""
-        cls._tools.clear()
+        with cls._lock:
+            cls._tools.clear()
+            cls._invalidate()
         logger.info("工具注册表已清空")
 
     @classmethod
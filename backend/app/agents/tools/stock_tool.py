@@ -7,19 +7,20 @@ import sys
 import os
 import asyncio
 import time
-from typing import Dict, Any
-from concurrent.futures import ThreadPoolExecutor
-import pysnowball as ball
+from datetime import datetime
+from textwrap import dedent
+from typing import Dict, Any, Optional, Tuple
 
 from app.agents.tools.base import BaseTool
 from app.agents.tools.registry import register_tool
-from app.core.exceptions import ToolExecutionError
+from app.core.exceptions import ToolExecutionError, CircuitOpenError
+from app.core.answer_cache import answer_cache
+from app.core.xueqiu_client import xueqiu_client
+from app.core.snapshot_store import snapshot_store
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-# 创建线程池用于执行同步的pysnowball API调用
-_executor = ThreadPoolExecutor(max_workers=10)
-
 # 设置默认编码为UTF-8
 os.environ['PYTHONIOENCODING'] = 'utf-8'
 
@@ -32,6 +33,54 @@ if sys.stderr.encoding != 'utf-8':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 
+INFO_TEMPLATE = dedent(
+    """
+    cash_flow:
+    {cash_flow}
+    ---
+
+    income:
+    {income}
+    ----
+
+    business:
+    {business}
+    ----
+
+    top_holders:
+    {top_holders}
+    ---
+
+    main_indicator:
+    {main_indicator}
+    ---
+
+    org_holding_change:
+    {org_holding_change}
+    ---
+
+    industry_compare:
+    {industry_compare}
+    """
+).strip()
+
+# 股票数据接口定义：(模板字段, 异步调用函数, 返回数据的提取路径)
+STOCK_DATA_ENDPOINTS = (
+    ("cash_flow", lambda symbol: xueqiu_client.cash_flow(symbol), ("data", "list")),
+    ("income", lambda symbol: xueqiu_client.income(symbol, is_annals=1, count=1), ("data", "list")),
+    # 主营业务构成
+    ("business", lambda symbol: xueqiu_client.business(symbol, count=1), ("data", "list")),
+    # 十大股东
+    ("top_holders", lambda symbol: xueqiu_client.top_holders(symbol, circula=0), ("data", "items")),
+    # 主要指标
+    ("main_indicator", lambda symbol: xueqiu_client.main_indicator(symbol), ("data",)),
+    # 机构持仓
+    ("org_holding_change", lambda symbol: xueqiu_client.org_holding_change(symbol), ("data", "items")),
+    # 行业对比
+    ("industry_compare", lambda symbol: xueqiu_client.industry_compare(symbol), ("data",)),
+)
+
+
 @register_tool
 class StockInfoTool(BaseTool):
     """股票信息查询工具"""
@@ -42,7 +91,7 @@ class StockInfoTool(BaseTool):
 
     @property
     def description(self) -> str:
-        return "获取股票的详细财务信息，包括现金流、收入、主营业务和股东信息等"
+        return "获取股票的详细财务信息，包括现金流、收入、主营业务、股东、主要指标、机构持仓和行业对比等"
 
     @property
     def parameters_schema(self) -> Dict[str, Any]:
@@ -67,16 +116,9 @@ class StockInfoTool(BaseTool):
         Returns:
             股票详细信息的字符串表示
         """
-        # 获取或创建事件循环
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        # 运行异步方法
-        return loop.run_until_complete(self.execute_async(**kwargs))
-    
+        # 同步调用方（工作线程/命令行）没有正在运行的事件循环，直接新建循环执行
+        return asyncio.run(self.execute_async(**kwargs))
+
     async def execute_async(self, **kwargs) -> str:
         """
         异步执行股票信息查询
@@ -87,7 +129,6 @@ class StockInfoTool(BaseTool):
         Returns:
             股票详细信息的字符串表示
         """
-        tool_start_time = time.time()
         symbol = kwargs.get("symbol")
 
         if not symbol:
@@ -96,78 +137,89 @@ class StockInfoTool(BaseTool):
                 details=kwargs
             )
 
+        # 记录查询热度，后台调度器据此提前刷新热门股票
+        from app.services.stock_data_service import symbol_popularity
+        symbol_popularity.record(symbol)
+
+        return await self.fetch_async(symbol, max_age=settings.SNAPSHOT_MAX_AGE_SECONDS)
+
+    async def fetch_async(self, symbol: str, max_age: float) -> str:
+        """
+        获取股票信息（供工具调用和后台刷新共用）
+
+        Args:
+            symbol: 股票代码
+            max_age: 快照复用的最大数据年龄（秒），0表示全部重新请求
+
+        Returns:
+            股票详细信息的字符串表示
+        """
         try:
             logger.info(f"查询股票信息: {symbol}")
 
-            # 设置token（从环境变量读取，如果没有则使用默认值）
-            # 确保token字符串使用UTF-8编码
-            import os
-            from dotenv import load_dotenv
-            perf_token_start = time.time()
-            load_dotenv()
-            
-            xq_token = os.getenv("xq_a_token", "")
-            if xq_token:
-                token = f'xq_a_token={xq_token};'
-            else:
-                # 如果没有设置token，使用默认值（但实际应该要求用户设置）
-                token = 'xq_a_token=填入你的token;'
-            
-            # 确保token是UTF-8编码的字符串
-            if isinstance(token, bytes):
-                token = token.decode('utf-8', errors='ignore')
-            elif isinstance(token, str):
-                # 确保字符串是有效的UTF-8
-                token = token.encode('utf-8', errors='ignore').decode('utf-8')
-            
-            ball.set_token(token)
-            perf_token_end = time.time()
-            logger.info(f"[PERF] Token设置耗时: {(perf_token_end - perf_token_start) * 1000:.2f}ms")
+            # 上游熔断时直接使用磁盘快照，不等待失败
+            if xueqiu_client.breaker.is_open:
+                snapshot = await asyncio.to_thread(self._load_snapshot, symbol)
+                if snapshot is not None:
+                    return snapshot
+
+            # 未过期的快照直接复用，只请求缺失或过期的接口
+            cached = {}
+            if max_age > 0:
+                cached = await asyncio.to_thread(snapshot_store.get_all, symbol, max_age)
+            pending = [endpoint for endpoint in STOCK_DATA_ENDPOINTS if endpoint[0] not in cached]
 
-            # 并发获取股票基本信息，使用UTF-8编码处理返回结果
-            # 使用asyncio.gather并发执行多个API调用，大幅提升速度
+            # 使用asyncio.gather并发执行所有API调用，总耗时取决于最慢的一个接口
+            # 请求通过共享连接池的异步客户端发出，不占用线程
             perf_api_start = time.time()
-            cash_flow_task = self._safe_get_data_async(lambda: ball.cash_flow(symbol))
-            income_task = self._safe_get_data_async(lambda: ball.income(symbol))
-            business_task = self._safe_get_data_async(lambda: ball.business(symbol))
-            holders_task = self._safe_get_data_async(lambda: ball.top_holders(symbol))
-            
-            # 并发执行所有API调用
-            cash_flow, income_statement, business_analysis, holders = await asyncio.gather(
-                cash_flow_task,
-                income_task,
-                business_task,
-                holders_task,
+            results = await asyncio.gather(
+                *(self._safe_get_data_async(fetch(symbol)) for _, fetch, _ in pending),
                 return_exceptions=True
             )
             perf_api_end = time.time()
-            logger.info(f"[PERF] 股票API并发调用总耗时: {(perf_api_end - perf_api_start) * 1000:.2f}ms")
-            
-            # 处理可能的异常
-            for i, result in enumerate([cash_flow, income_statement, business_analysis, holders]):
-                if isinstance(result, Exception):
-                    logger.warning(f"API调用 {i} 失败: {result}")
-
-            # 格式化返回结果，确保使用UTF-8编码
-            result = f"""
-股票代码: {symbol}
+            logger.info(
+                f"[PERF] 股票API并发调用总耗时: {(perf_api_end - perf_api_start) * 1000:.2f}ms, "
+                f"快照命中 {len(cached)}/{len(STOCK_DATA_ENDPOINTS)}"
+            )
 
-【现金流分析】
-{self._format_dict(cash_flow if not isinstance(cash_flow, Exception) else None)}
+            failures = [data for data in results if isinstance(data, Exception)]
+            if any(isinstance(error, CircuitOpenError) for error in failures):
+                snapshot = await asyncio.to_thread(self._load_snapshot, symbol)
+                if snapshot is not None:
+                    return snapshot
 
-【收入分析】
-{self._format_dict(income_statement if not isinstance(income_statement, Exception) else None)}
+            fetched = {}
+            for (section, _, _), data in zip(pending, results):
+                if isinstance(data, Exception):
+                    logger.warning(f"API调用 {section} 失败: {data}")
+                    continue
+                fetched[section] = data
 
-【主营业务分析】
-{self._format_dict(business_analysis if not isinstance(business_analysis, Exception) else None)}
+            if not fetched and not cached:
+                # 所有接口都失败且没有可复用的数据：回退到快照，不把全是“无数据”的结果当作成功返回
+                snapshot = await asyncio.to_thread(self._load_snapshot, symbol)
+                if snapshot is not None:
+                    return snapshot
+                raise ToolExecutionError(
+                    f"查询股票信息失败: 所有数据接口均请求失败（{failures[0] if failures else '无可用数据'}）",
+                    details={"symbol": symbol}
+                )
 
-【主要股东】
-{self._format_dict(holders if not isinstance(holders, Exception) else None)}
-"""
+            raw_data = {section: entry.data for section, entry in cached.items()}
+            raw_data.update(fetched)
+            result = self._format_sections(raw_data)
             logger.info(f"股票信息查询成功: {symbol}")
-            # 确保返回的字符串是UTF-8编码
-            return result.strip().encode('utf-8').decode('utf-8')
 
+            if fetched:
+                await asyncio.to_thread(snapshot_store.put_many, symbol, fetched)
+            if not failures:
+                # 数据变化时使回答缓存失效
+                answer_cache.update_snapshot(symbol, result)
+            return result
+
+        except ToolExecutionError:
+            logger.error(f"股票信息查询失败: {symbol}, 所有数据接口均请求失败")
+            raise
         except Exception as e:
             error_msg = str(e)
             logger.error(f"股票信息查询失败: {symbol}, 错误: {error_msg}")
@@ -175,54 +227,94 @@ class StockInfoTool(BaseTool):
                 f"查询股票信息失败: {error_msg}",
                 details={"symbol": symbol}
             )
-    
+
+    def _format_sections(self, raw_data: Dict[str, Any]) -> str:
+        """
+        将各接口的原始返回格式化为工具输出
+
+        Args:
+            raw_data: {模板字段: 接口原始返回}，缺失的字段输出"无数据"
+
+        Returns:
+            股票信息字符串
+        """
+        sections = {}
+        for section, _, path in STOCK_DATA_ENDPOINTS:
+            sections[section] = self._extract(raw_data[section], path) if section in raw_data else "无数据"
+
+        result = INFO_TEMPLATE.format(**sections)
+        # 确保返回的字符串是UTF-8编码
+        return result.encode('utf-8').decode('utf-8')
+
+    def _load_snapshot(self, symbol: str) -> Optional[str]:
+        """
+        读取磁盘快照（不限数据年龄，上游不可用时回退使用）
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            带数据时间说明的股票信息，不存在返回None
+        """
+        entries = snapshot_store.get_all(symbol)
+        if not entries:
+            logger.warning(f"上游不可用且无可用快照: {symbol}")
+            return None
+
+        fetched_at = min(entry.fetched_at for entry in entries.values())
+        fetched_at_str = datetime.fromtimestamp(fetched_at).strftime("%Y-%m-%d %H:%M:%S")
+        logger.info(f"上游不可用，使用快照数据: {symbol}, 获取时间: {fetched_at_str}")
+        result = self._format_sections({section: entry.data for section, entry in entries.items()})
+        return f"（数据源暂时不可用，以下为 {fetched_at_str} 获取的缓存数据）\n{result}"
+
+    @staticmethod
+    def _extract(data: Any, path: Tuple[str, ...]) -> Any:
+        """
+        按路径提取接口返回中的数据部分
+
+        Args:
+            data: 接口原始返回
+            path: 键路径，例如 ("data", "list")
+
+        Returns:
+            提取的数据，提取失败返回"无数据"
+        """
+        try:
+            for key in path:
+                data = data[key]
+        except (KeyError, IndexError, TypeError):
+            logger.warning(f"接口返回缺少字段: {'/'.join(path)}")
+            return "无数据"
+        return data if data is not None else "无数据"
+
     @staticmethod
-    async def _safe_get_data_async(func):
+    async def _safe_get_data_async(coro):
         """
         异步安全获取数据，处理编码问题
-        
+
         Args:
-            func: 调用pysnowball API的函数
-            
+            coro: 调用雪球客户端接口的协程
+
         Returns:
             处理后的数据
         """
-        loop = asyncio.get_event_loop()
-        
         try:
-            # 在线程池中执行同步API调用
-            data = await loop.run_in_executor(_executor, func)
-            
-            # 如果数据为空，直接返回
-            if data is None:
-                return None
-            
-            # 将数据转换为JSON字符串再解析，确保编码正确
-            # 这样可以处理所有编码问题，包括latin-1编码错误
-            try:
-                json_str = json.dumps(data, ensure_ascii=False, default=str)
-                return json.loads(json_str)
-            except (UnicodeEncodeError, UnicodeDecodeError, TypeError) as e:
-                logger.warning(f"JSON序列化/反序列化时出现编码问题: {str(e)}，尝试修复")
-                # 如果JSON处理失败，尝试递归处理数据
-                return StockInfoTool._fix_encoding(data)
-        except (UnicodeEncodeError, UnicodeDecodeError) as e:
-            logger.warning(f"编码错误，尝试修复: {str(e)}")
-            # 如果出现编码错误，尝试使用JSON序列化/反序列化来修复
-            try:
-                data = await loop.run_in_executor(_executor, func)
-                if data is None:
-                    return None
-                json_str = json.dumps(data, ensure_ascii=False, default=str)
-                return json.loads(json_str)
-            except Exception as e2:
-                logger.error(f"修复编码错误失败: {str(e2)}")
-                raise ToolExecutionError(f"数据编码处理失败: {str(e2)}")
+            data = await coro
         except Exception as e:
-            # 其他异常直接抛出
             logger.error(f"获取数据失败: {str(e)}")
             raise
-    
+
+        if data is None:
+            return None
+
+        # httpx按UTF-8解析JSON，这里仅兜底处理异常字符
+        try:
+            json_str = json.dumps(data, ensure_ascii=False, default=str)
+            return json.loads(json_str)
+        except (UnicodeEncodeError, UnicodeDecodeError, TypeError) as e:
+            logger.warning(f"JSON序列化/反序列化时出现编码问题: {str(e)}，尝试修复")
+            return StockInfoTool._fix_encoding(data)
+
     @staticmethod
     def _safe_get_data(func):
         """
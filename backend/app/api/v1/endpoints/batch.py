@@ -0,0 +1,75 @@
+"""
+批量分析API端点
+"""
+import logging
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.services.batch_service import BatchAnalysisService, batch_result_store
+from app.schemas.batch import BatchAnalysisRequest, BatchEvent
+from app.core.security import get_current_user_id_or_default
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_HEADERS = {
+    "Cache-Control": "no-cache, no-transform",
+    "X-Accel-Buffering": "no",
+}
+
+
+@router.post("/batch/analyses")
+async def create_batch_analysis(
+    request: BatchAnalysisRequest,
+    user_id: str = Depends(get_current_user_id_or_default)
+):
+    """
+    批量分析股票（NDJSON流式输出，每行一个事件）
+
+    事件按完成顺序输出；连接中断后携带首个事件中的 batch_id 重新请求即可续跑
+
+    Args:
+        request: 批量分析请求
+        user_id: 用户ID（从Token获取）
+
+    Returns:
+        NDJSON流式响应
+    """
+    service = BatchAnalysisService()
+    # 在返回流之前创建/加载批次，参数错误和越权能以正常的错误响应返回
+    events = service.run(int(user_id), request)
+    first_event = await events.__anext__()
+
+    async def generate():
+        yield (first_event.model_dump_json(exclude_none=True) + "\n").encode("utf-8")
+        try:
+            async for event in events:
+                yield (event.model_dump_json(exclude_none=True) + "\n").encode("utf-8")
+        except Exception as e:
+            logger.error(f"批量分析失败: batch_id={first_event.batch_id}, 错误: {str(e)}", exc_info=True)
+            error_event = BatchEvent(type="error", batch_id=first_event.batch_id, error=f"服务器错误: {str(e)}")
+            yield (error_event.model_dump_json(exclude_none=True) + "\n").encode("utf-8")
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE, headers=NDJSON_HEADERS)
+
+
+@router.get("/batch/analyses/{batch_id}")
+def get_batch_analysis(
+    batch_id: str,
+    user_id: str = Depends(get_current_user_id_or_default)
+):
+    """
+    获取批次已保存的结果（NDJSON，首行为批次信息）
+
+    Args:
+        batch_id: 批次ID
+        user_id: 用户ID（从Token获取）
+
+    Returns:
+        NDJSON响应
+    """
+    # 先校验批次存在且属于当前用户
+    batch_result_store.load(batch_id, int(user_id))
+    return StreamingResponse(batch_result_store.iter_lines(batch_id), media_type=NDJSON_MEDIA_TYPE)
@@ -1,18 +1,20 @@
 """
 对话管理API端点
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.services.conversation_service import ConversationService
+from app.services.conversation_service import ConversationService, parse_message_fields
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationResponse,
     ConversationDetail,
     ConversationUpdate,
     ConversationSummary,
+    ConversationSearchResult,
     MessageResponse
 )
 from app.core.security import get_current_user_id_or_default
@@ -83,9 +85,41 @@ def get_conversations(
     return conversations
 
 
+@router.get("/conversations/search", response_model=List[ConversationSearchResult])
+def search_conversations(
+    q: str = Query(..., min_length=1, max_length=200, description="搜索词"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id_or_default),
+    db: Session = Depends(get_db)
+):
+    """
+    全文搜索对话历史（按消息内容，包括已归档的对话），按相关度排序
+
+    Args:
+        q: 搜索词（中文按连续片段匹配，多个词需出现在同一条消息中）
+        skip: 跳过的记录数
+        limit: 返回的最大记录数
+        user_id: 用户ID（从Token获取）
+        db: 数据库会话
+
+    Returns:
+        搜索结果列表
+    """
+    conversation_service = ConversationService(db)
+    return conversation_service.search_conversations(
+        user_id=int(user_id),
+        query=q,
+        limit=limit,
+        skip=skip
+    )
+
+
 @router.get("/conversations/{conversation_id}", response_model=ConversationDetail)
 def get_conversation(
     conversation_id: str,
+    message_limit: Optional[int] = Query(None, ge=1, le=1000, description="最多返回的消息数，不提供则返回全部"),
+    max_content_length: Optional[int] = Query(None, ge=1, description="消息内容截断长度"),
     user_id: str = Depends(get_current_user_id_or_default),
     db: Session = Depends(get_db)
 ):
@@ -94,6 +128,8 @@ def get_conversation(
 
     Args:
         conversation_id: 会话ID
+        message_limit: 最多返回的消息数，超出时通过next_cursor继续获取
+        max_content_length: 消息内容截断长度
         user_id: 用户ID（从Token获取）
         db: 数据库会话
 
@@ -108,9 +144,12 @@ def get_conversation(
         )
 
         # 获取消息
-        messages = conversation_service.get_messages(
+        messages, next_cursor = conversation_service.get_message_page(
             conversation_id=conversation_id,
-            user_id=int(user_id)
+            user_id=int(user_id),
+            limit=message_limit,
+            max_content_length=max_content_length,
+            conversation=conversation
         )
 
         # 构建响应
@@ -122,7 +161,8 @@ def get_conversation(
             message_count=conversation.message_count,
             created_at=conversation.created_at,
             updated_at=conversation.updated_at,
-            messages=[MessageResponse.from_orm(msg) for msg in messages]
+            messages=messages,
+            next_cursor=next_cursor
         )
 
     except ResourceNotFoundError as e:
@@ -216,21 +256,35 @@ def delete_conversation(
         )
 
 
-@router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
+@router.get(
+    "/conversations/{conversation_id}/messages",
+    response_model=List[MessageResponse],
+    response_model_exclude_unset=True
+)
 def get_messages(
     conversation_id: str,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 中的游标"),
+    skip: int = Query(0, ge=0, description="跳过的记录数（已废弃，请使用cursor）"),
     limit: int = Query(100, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段，例如 role,content"),
+    max_content_length: Optional[int] = Query(None, ge=1, description="消息内容截断长度"),
     user_id: str = Depends(get_current_user_id_or_default),
     db: Session = Depends(get_db)
 ):
     """
-    获取对话的消息列表
+    获取对话的消息列表（按 (created_at, id) 键集分页）
+
+    还有更多消息时通过响应头 X-Next-Cursor 返回下一页游标
 
     Args:
         conversation_id: 会话ID
-        skip: 跳过的记录数
+        response: 响应对象（用于设置游标响应头）
+        cursor: 分页游标
+        skip: 跳过的记录数（仅在未提供cursor时使用）
         limit: 返回的最大记录数
+        fields: 返回字段投影
+        max_content_length: 消息内容截断长度
         user_id: 用户ID（从Token获取）
         db: 数据库会话
 
@@ -239,13 +293,19 @@ def get_messages(
     """
     try:
         conversation_service = ConversationService(db)
-        messages = conversation_service.get_messages(
+        messages, next_cursor = conversation_service.get_message_page(
             conversation_id=conversation_id,
             user_id=int(user_id),
+            cursor=cursor,
+            limit=limit,
             skip=skip,
-            limit=limit
+            fields=parse_message_fields(fields),
+            max_content_length=max_content_length
         )
 
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
         return messages
 
     except ResourceNotFoundError as e:
@@ -258,3 +318,45 @@ def get_messages(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
+
+
+@router.get("/conversations/{conversation_id}/messages/stream")
+def stream_messages(
+    conversation_id: str,
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段，例如 role,content"),
+    max_content_length: Optional[int] = Query(None, ge=1, description="消息内容截断长度"),
+    user_id: str = Depends(get_current_user_id_or_default),
+    db: Session = Depends(get_db)
+):
+    """
+    以NDJSON流式导出对话的全部消息（每行一条，按创建时间升序）
+
+    服务端逐页读取数据库，内存占用与对话长度无关
+
+    Args:
+        conversation_id: 会话ID
+        fields: 返回字段投影
+        max_content_length: 消息内容截断长度
+        user_id: 用户ID（从Token获取）
+        db: 数据库会话
+
+    Returns:
+        NDJSON流式响应
+    """
+    conversation_service = ConversationService(db)
+    messages = conversation_service.iter_messages(
+        conversation_id=conversation_id,
+        user_id=int(user_id),
+        fields=parse_message_fields(fields),
+        max_content_length=max_content_length
+    )
+
+    def generate():
+        for message in messages:
+            yield message.model_dump_json(by_alias=True, exclude_unset=True) + "\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,142 @@
+"""
+报告任务API端点
+"""
+import logging
+from typing import List
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.services.report_job_service import ReportJobService
+from app.schemas.chat import ChatChunkResponse
+from app.schemas.report_job import ReportJobCreate, ReportJobResponse, ReportJobDetail
+from app.core.security import get_current_user_id_or_default
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/report-jobs", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(
+    job_data: ReportJobCreate,
+    user_id: str = Depends(get_current_user_id_or_default),
+    db: Session = Depends(get_db)
+):
+    """
+    提交报告任务（由后台worker执行，立即返回任务ID）
+
+    Args:
+        job_data: 任务数据
+        user_id: 用户ID（从Token获取）
+        db: 数据库会话
+
+    Returns:
+        创建的任务
+    """
+    return ReportJobService(db).create_job(int(user_id), job_data)
+
+
+@router.get("/report-jobs", response_model=List[ReportJobResponse])
+def get_report_jobs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    user_id: str = Depends(get_current_user_id_or_default),
+    db: Session = Depends(get_db)
+):
+    """
+    获取用户的报告任务列表
+
+    Args:
+        skip: 跳过的记录数
+        limit: 返回的最大记录数
+        user_id: 用户ID（从Token获取）
+        db: 数据库会话
+
+    Returns:
+        任务列表
+    """
+    return ReportJobService(db).get_user_jobs(int(user_id), skip, limit)
+
+
+@router.get("/report-jobs/{job_id}", response_model=ReportJobDetail)
+def get_report_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id_or_default),
+    db: Session = Depends(get_db)
+):
+    """
+    获取报告任务详情（执行中返回已生成的部分内容）
+
+    Args:
+        job_id: 任务ID
+        user_id: 用户ID（从Token获取）
+        db: 数据库会话
+
+    Returns:
+        任务详情
+    """
+    return ReportJobService(db).get_job(job_id, int(user_id))
+
+
+@router.post("/report-jobs/{job_id}/cancel", response_model=ReportJobResponse)
+def cancel_report_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id_or_default),
+    db: Session = Depends(get_db)
+):
+    """
+    取消报告任务
+
+    Args:
+        job_id: 任务ID
+        user_id: 用户ID（从Token获取）
+        db: 数据库会话
+
+    Returns:
+        取消后的任务
+    """
+    return ReportJobService(db).cancel_job(job_id, int(user_id))
+
+
+@router.get("/report-jobs/{job_id}/stream")
+async def stream_report_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id_or_default),
+    db: Session = Depends(get_db)
+):
+    """
+    推送报告任务进度（SSE，事件格式与聊天接口相同）
+
+    Args:
+        job_id: 任务ID
+        user_id: 用户ID（从Token获取）
+        db: 数据库会话
+
+    Returns:
+        Server-Sent Events流式响应
+    """
+    job_service = ReportJobService(db)
+    # 在返回流之前校验任务存在且属于当前用户
+    job_service.get_job(job_id, int(user_id))
+
+    async def generate():
+        try:
+            async for response in job_service.stream_job(job_id, int(user_id)):
+                yield f"data: {response.model_dump_json()}\n\n".encode("utf-8")
+        except Exception as e:
+            logger.error(f"推送报告任务进度失败: job_id={job_id}, 错误: {str(e)}", exc_info=True)
+            error_response = ChatChunkResponse(type="error", error=f"服务器错误: {str(e)}")
+            yield f"data: {error_response.model_dump_json()}\n\n".encode("utf-8")
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache, no-transform",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+            "X-Content-Type-Options": "nosniff"
+        }
+    )
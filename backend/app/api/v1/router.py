@@ -3,7 +3,7 @@ API v1路由聚合器
 """
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, chat, conversations
+from app.api.v1.endpoints import auth, batch, chat, conversations, report_jobs
 
 # 创建v1路由器
 api_router = APIRouter()
@@ -26,3 +26,15 @@ api_router.include_router(
     prefix="",
     tags=["对话管理"]
 )
+
+api_router.include_router(
+    batch.router,
+    prefix="",
+    tags=["批量分析"]
+)
+
+api_router.include_router(
+    report_jobs.router,
+    prefix="",
+    tags=["报告任务"]
+)
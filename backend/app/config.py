@@ -7,6 +7,10 @@ from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator, model_validator
 import os
 from functools import lru_cache
+from dotenv import load_dotenv
+
+# 将.env载入环境变量，供 DOUBAO_API_KEY、xq_a_token 等非Settings字段的备选变量名使用
+load_dotenv()
 
 
 class Settings(BaseSettings):
@@ -44,6 +48,15 @@ class Settings(BaseSettings):
     DATABASE_ECHO: bool = Field(default=False, env="DATABASE_ECHO")
     DATABASE_POOL_SIZE: int = Field(default=5, env="DATABASE_POOL_SIZE")
     DATABASE_MAX_OVERFLOW: int = Field(default=10, env="DATABASE_MAX_OVERFLOW")
+    # SQLite文件数据库调优（内存数据库不生效）
+    SQLITE_JOURNAL_MODE: str = Field(default="WAL", env="SQLITE_JOURNAL_MODE")
+    SQLITE_SYNCHRONOUS: str = Field(default="NORMAL", env="SQLITE_SYNCHRONOUS")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    SQLITE_CACHE_SIZE_KB: int = Field(default=65536, env="SQLITE_CACHE_SIZE_KB")
+    SQLITE_MMAP_SIZE_MB: int = Field(default=256, env="SQLITE_MMAP_SIZE_MB")
+    # 消息内容和JSON列超过该大小（字节）时zlib压缩存储
+    DB_COMPRESSION_MIN_SIZE_BYTES: int = Field(default=512, env="DB_COMPRESSION_MIN_SIZE_BYTES")
+    DB_COMPRESSION_LEVEL: int = Field(default=6, env="DB_COMPRESSION_LEVEL")
 
     # Redis配置（可选，用于缓存和会话）
     REDIS_URL: Optional[str] = Field(default=None, env="REDIS_URL")
@@ -83,14 +96,109 @@ class Settings(BaseSettings):
     AI_TEMPERATURE: float = Field(default=0.7, env="AI_TEMPERATURE")
     AI_TIMEOUT: int = Field(default=60, env="AI_TIMEOUT")
 
+    # 模型路由（寒暄、简单追问使用AI_FLASH_MODEL，需要分析的问题使用AI_MODEL）
+    MODEL_ROUTING_ENABLED: bool = Field(default=True, env="MODEL_ROUTING_ENABLED")
+    MODEL_ROUTING_FLASH_MAX_CHARS: int = Field(default=30, env="MODEL_ROUTING_FLASH_MAX_CHARS")
+    # 规则无法判断时是否调用轻量模型分类（默认直接使用完整模型）
+    MODEL_ROUTING_LLM_CLASSIFIER: bool = Field(default=False, env="MODEL_ROUTING_LLM_CLASSIFIER")
+    MODEL_ROUTING_CLASSIFIER_TIMEOUT: float = Field(default=2.0, env="MODEL_ROUTING_CLASSIFIER_TIMEOUT")
+
+    # LLM流式调用准入控制（不超过模型服务商的并发配额）
+    LLM_MAX_CONCURRENT_STREAMS: int = Field(default=10, env="LLM_MAX_CONCURRENT_STREAMS")
+    LLM_MAX_QUEUE_SIZE: int = Field(default=100, env="LLM_MAX_QUEUE_SIZE")
+    LLM_QUEUE_TIMEOUT_SECONDS: float = Field(default=60.0, env="LLM_QUEUE_TIMEOUT_SECONDS")
+
+    # 工具执行配置
+    TOOL_TIMEOUT_SECONDS: float = Field(default=30.0, env="TOOL_TIMEOUT_SECONDS")
+    TOOL_MAX_CONCURRENCY: int = Field(default=20, env="TOOL_MAX_CONCURRENCY")
+
+    # 雪球数据源配置
+    # 支持 XUEQIU_TOKEN 和 xq_a_token 两种环境变量名称，均未设置时自动获取游客token
+    XUEQIU_TOKEN: Optional[str] = Field(default=None, env="XUEQIU_TOKEN")
+
+    @property
+    def effective_xueqiu_token(self) -> Optional[str]:
+        """获取有效的雪球token（支持xq_a_token作为备选）"""
+        return self.XUEQIU_TOKEN or os.getenv("xq_a_token")
+    XUEQIU_BASE_URL: str = Field(default="https://stock.xueqiu.com", env="XUEQIU_BASE_URL")
+    XUEQIU_TIMEOUT: float = Field(default=10.0, env="XUEQIU_TIMEOUT")
+    XUEQIU_MAX_CONNECTIONS: int = Field(default=50, env="XUEQIU_MAX_CONNECTIONS")
+    XUEQIU_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, env="XUEQIU_MAX_KEEPALIVE_CONNECTIONS")
+    XUEQIU_MAX_RETRIES: int = Field(default=2, env="XUEQIU_MAX_RETRIES")
+    XUEQIU_RETRY_BACKOFF: float = Field(default=0.5, env="XUEQIU_RETRY_BACKOFF")
+    # 上游保护：每个接口的令牌桶限流 + 熔断器
+    XUEQIU_RATE_LIMIT_PER_SECOND: float = Field(default=10.0, env="XUEQIU_RATE_LIMIT_PER_SECOND")
+    XUEQIU_RATE_LIMIT_BURST: int = Field(default=20, env="XUEQIU_RATE_LIMIT_BURST")
+    XUEQIU_RATE_LIMIT_MAX_WAIT: float = Field(default=2.0, env="XUEQIU_RATE_LIMIT_MAX_WAIT")
+    XUEQIU_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, env="XUEQIU_CIRCUIT_FAILURE_THRESHOLD")
+    XUEQIU_CIRCUIT_RECOVERY_SECONDS: float = Field(default=30.0, env="XUEQIU_CIRCUIT_RECOVERY_SECONDS")
+
+    # 股票数据快照存储（磁盘持久化，重启和多worker共享）
+    SNAPSHOT_STORE_DIR: str = Field(default="./data/snapshots", env="SNAPSHOT_STORE_DIR")
+    # 快照在该时间内直接复用，不请求上游（0表示每次都请求，快照仅用于熔断回退）
+    SNAPSHOT_MAX_AGE_SECONDS: int = Field(default=3600, env="SNAPSHOT_MAX_AGE_SECONDS")
+    # 启动时预热的关注列表，例如 SH600519,SZ000001
+    SNAPSHOT_WATCHLIST: str = Field(default="", env="SNAPSHOT_WATCHLIST")
+    SNAPSHOT_WARMUP_CONCURRENCY: int = Field(default=4, env="SNAPSHOT_WARMUP_CONCURRENCY")
+    # 后台刷新：关注列表 + 最近查询热度前N的股票
+    SNAPSHOT_REFRESH_ENABLED: bool = Field(default=True, env="SNAPSHOT_REFRESH_ENABLED")
+    SNAPSHOT_REFRESH_INTERVAL_SECONDS: int = Field(default=600, env="SNAPSHOT_REFRESH_INTERVAL_SECONDS")
+    SNAPSHOT_REFRESH_TOP_N: int = Field(default=50, env="SNAPSHOT_REFRESH_TOP_N")
+    SNAPSHOT_REFRESH_CONCURRENCY: int = Field(default=4, env="SNAPSHOT_REFRESH_CONCURRENCY")
+
+    # 批量分析配置
+    BATCH_RESULTS_DIR: str = Field(default="./data/batches", env="BATCH_RESULTS_DIR")
+    BATCH_MAX_SYMBOLS: int = Field(default=300, env="BATCH_MAX_SYMBOLS")
+    BATCH_PREFETCH_CONCURRENCY: int = Field(default=8, env="BATCH_PREFETCH_CONCURRENCY")
+    BATCH_LLM_CONCURRENCY: int = Field(default=5, env="BATCH_LLM_CONCURRENCY")
+    # 批量任务在LLM准入队列中的权重（交互请求为1.0，越小越让位于交互请求）
+    BATCH_LLM_WEIGHT: float = Field(default=0.5, env="BATCH_LLM_WEIGHT")
+    BATCH_LLM_QUEUE_TIMEOUT_SECONDS: float = Field(default=600.0, env="BATCH_LLM_QUEUE_TIMEOUT_SECONDS")
+
+    # 报告任务配置（python -m app.workers.report_worker 执行）
+    REPORT_WORKER_PROCESSES: int = Field(default=2, env="REPORT_WORKER_PROCESSES")
+    REPORT_JOB_MAX_PENDING_PER_USER: int = Field(default=10, env="REPORT_JOB_MAX_PENDING_PER_USER")
+    # worker空闲时领取任务、API推送进度时读取任务的间隔
+    REPORT_JOB_POLL_INTERVAL_SECONDS: float = Field(default=1.0, env="REPORT_JOB_POLL_INTERVAL_SECONDS")
+    # 执行中写回已生成内容（兼作心跳）的间隔
+    REPORT_JOB_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0, env="REPORT_JOB_FLUSH_INTERVAL_SECONDS")
+    # 心跳超过该时间的执行中任务视为worker已崩溃
+    REPORT_JOB_STALE_SECONDS: int = Field(default=300, env="REPORT_JOB_STALE_SECONDS")
+    REPORT_JOB_MAX_ATTEMPTS: int = Field(default=2, env="REPORT_JOB_MAX_ATTEMPTS")
+    # 报告任务的会话记录目录（与聊天会话的 files/ 分开，不出现在会话列表中）
+    REPORT_JOB_FILES_DIR: str = Field(default="./data/report_jobs", env="REPORT_JOB_FILES_DIR")
+
     # 会话配置
     MAX_CONVERSATION_HISTORY: int = Field(default=50, env="MAX_CONVERSATION_HISTORY")
     CONVERSATION_TIMEOUT_MINUTES: int = Field(default=30, env="CONVERSATION_TIMEOUT_MINUTES")
     MAX_ACTIVE_AGENTS_PER_USER: int = Field(default=5, env="MAX_ACTIVE_AGENTS_PER_USER")
 
+    # 回答缓存配置（可选，相同意图+相同股票+相同数据版本的问题直接复用回答）
+    ANSWER_CACHE_ENABLED: bool = Field(default=False, env="ANSWER_CACHE_ENABLED")
+    ANSWER_CACHE_MODE: str = Field(default="exact", env="ANSWER_CACHE_MODE")  # exact, semantic
+    ANSWER_CACHE_TTL_SECONDS: int = Field(default=3600, env="ANSWER_CACHE_TTL_SECONDS")
+    ANSWER_CACHE_MAX_ENTRIES: int = Field(default=1000, env="ANSWER_CACHE_MAX_ENTRIES")
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = Field(default=0.85, env="ANSWER_CACHE_SIMILARITY_THRESHOLD")
+
+    # 启动预热配置
+    WARMUP_ENABLED: bool = Field(default=True, env="WARMUP_ENABLED")
+    WARMUP_TIMEOUT_SECONDS: float = Field(default=30.0, env="WARMUP_TIMEOUT_SECONDS")
+
     # 文件存储配置
     FILES_DIR: str = Field(default="./files", env="FILES_DIR")
     MAX_FILE_SIZE_MB: int = Field(default=10, env="MAX_FILE_SIZE_MB")
+    # 会话日志fsync的最小间隔（秒），间隔内的追加只写入页缓存；0表示每次追加都fsync
+    CONVERSATION_JOURNAL_FSYNC_INTERVAL_SECONDS: float = Field(default=1.0, env="CONVERSATION_JOURNAL_FSYNC_INTERVAL_SECONDS")
+    # 内容寻址的大对象存储：会话日志中超过阈值的工具输出只保存引用，相同内容只存一份
+    BLOB_STORE_DIR: str = Field(default="./data/blobs", env="BLOB_STORE_DIR")
+    BLOB_STORE_MIN_SIZE_BYTES: int = Field(default=4096, env="BLOB_STORE_MIN_SIZE_BYTES")
+
+    # 冷对话归档（python -m app.workers.conversation_archiver）：超过空闲时间的对话移出热表，打开时自动恢复
+    ARCHIVE_DIR: str = Field(default="./data/archive", env="ARCHIVE_DIR")
+    ARCHIVE_IDLE_HOURS: int = Field(default=72, env="ARCHIVE_IDLE_HOURS")
+    ARCHIVE_INTERVAL_SECONDS: int = Field(default=3600, env="ARCHIVE_INTERVAL_SECONDS")
+    ARCHIVE_BATCH_SIZE: int = Field(default=200, env="ARCHIVE_BATCH_SIZE")
+    ARCHIVE_SEGMENT_MAX_MB: int = Field(default=64, env="ARCHIVE_SEGMENT_MAX_MB")
 
     # 日志配置
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
@@ -101,6 +209,17 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
     RATE_LIMIT_PER_MINUTE: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
     RATE_LIMIT_BURST: int = Field(default=10, env="RATE_LIMIT_BURST")
+    # 全局限流（所有客户端合计），0表示不限制
+    RATE_LIMIT_GLOBAL_PER_MINUTE: int = Field(default=0, env="RATE_LIMIT_GLOBAL_PER_MINUTE")
+    RATE_LIMIT_GLOBAL_BURST: int = Field(default=100, env="RATE_LIMIT_GLOBAL_BURST")
+    # 逗号分隔
+    RATE_LIMIT_EXEMPT_PATHS: str = Field(
+        default="/,/health,/health/live,/health/ready",
+        env="RATE_LIMIT_EXEMPT_PATHS"
+    )
+    # 是否信任反向代理设置的 X-Real-IP / X-Forwarded-For 头
+    # 仅在服务只能经由会覆盖这些头的可信代理访问时开启，否则客户端可伪造IP绕过限流
+    RATE_LIMIT_TRUST_PROXY_HEADERS: bool = Field(default=False, env="RATE_LIMIT_TRUST_PROXY_HEADERS")
 
     # 监控配置
     METRICS_ENABLED: bool = Field(default=True, env="METRICS_ENABLED")
@@ -131,6 +250,16 @@ class Settings(BaseSettings):
         """是否为开发环境"""
         return self.ENVIRONMENT == "development"
 
+    @property
+    def rate_limit_exempt_paths(self) -> List[str]:
+        """不限流的路径列表"""
+        return [path.strip() for path in self.RATE_LIMIT_EXEMPT_PATHS.split(",") if path.strip()]
+
+    @property
+    def snapshot_watchlist(self) -> List[str]:
+        """关注列表股票代码（大写）"""
+        return [symbol.strip().upper() for symbol in self.SNAPSHOT_WATCHLIST.split(",") if symbol.strip()]
+
     @property
     def sqlalchemy_database_uri(self) -> str:
         """获取SQLAlchemy数据库URI"""
@@ -0,0 +1,212 @@
+"""
+LLM流式请求准入控制
+限制同时进行中的模型流式调用数量，超出时进入有界等待队列
+
+排队调度采用加权公平队列（虚拟完成时间）：
+- 每个用户的请求依次获得递增的虚拟完成时间 max(系统虚拟时间, 该用户上次完成时间) + 1/权重
+- 空出名额时放行虚拟完成时间最小的请求，单个用户连续提交大量请求不会饿死其他用户
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import AsyncGenerator, Dict, List, Tuple
+
+from app.config import settings
+from app.core.exceptions import RateLimitExceededError
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionTicket:
+    """准入凭证"""
+
+    __slots__ = ("user_key", "finish_tag", "seq", "granted", "released", "enqueued_at", "_changed")
+
+    def __init__(self, user_key: str, finish_tag: float, seq: int):
+        self.user_key = user_key
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.granted = False
+        self.released = False
+        self.enqueued_at = time.monotonic()
+        self._changed = asyncio.Event()
+
+    @property
+    def sort_key(self) -> Tuple[float, int]:
+        """调度顺序"""
+        return self.finish_tag, self.seq
+
+
+class AdmissionController:
+    """准入控制器（运行在单个事件循环内，所有方法均不跨await修改状态）"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue_size: int):
+        """
+        初始化准入控制器
+
+        Args:
+            name: 名称（用于日志）
+            max_concurrent: 最大并发数
+            max_queue_size: 等待队列上限
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue_size = max_queue_size
+        self._active = 0
+        self._waiting: List[Tuple[float, int, AdmissionTicket]] = []  # 按虚拟完成时间排序的堆
+        self._user_tags: Dict[str, float] = {}  # {user_key: 上次分配的虚拟完成时间}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+
+    def enqueue(self, user_key: str, weight: float = 1.0) -> AdmissionTicket:
+        """
+        申请准入，有空闲名额且无人排队时立即放行
+
+        Args:
+            user_key: 用户标识
+            weight: 调度权重（越大分到的份额越多）
+
+        Returns:
+            准入凭证
+
+        Raises:
+            RateLimitExceededError: 等待队列已满
+        """
+        if self._active < self.max_concurrent and not self._waiting:
+            ticket = AdmissionTicket(user_key, self._virtual_time, next(self._seq))
+            self._grant(ticket)
+            return ticket
+
+        if len(self._waiting) >= self.max_queue_size:
+            raise RateLimitExceededError(
+                "当前请求过多，请稍后再试",
+                details={"active": self._active, "queued": len(self._waiting)}
+            )
+
+        start_tag = max(self._virtual_time, self._user_tags.get(user_key, 0.0))
+        ticket = AdmissionTicket(user_key, start_tag + 1.0 / weight, next(self._seq))
+        self._user_tags[user_key] = ticket.finish_tag
+        heapq.heappush(self._waiting, (ticket.finish_tag, ticket.seq, ticket))
+        # 新请求可能插队到已有请求之前，通知其他等待者刷新位置
+        self._notify_waiting()
+        return ticket
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        """
+        获取排队位置
+
+        Args:
+            ticket: 准入凭证
+
+        Returns:
+            排队位置（从1开始，已放行返回0）
+        """
+        if ticket.granted:
+            return 0
+        return 1 + sum(1 for _, _, other in self._waiting if other.sort_key < ticket.sort_key)
+
+    async def wait_turn(self, ticket: AdmissionTicket, timeout: float) -> AsyncGenerator[int, None]:
+        """
+        等待放行，排队位置变化时产出新位置
+
+        Args:
+            ticket: 准入凭证
+            timeout: 最长排队时间（秒）
+
+        Yields:
+            当前排队位置
+
+        Raises:
+            RateLimitExceededError: 排队超时
+        """
+        deadline = ticket.enqueued_at + timeout
+        last_position = None
+
+        while not ticket.granted:
+            position = self.position(ticket)
+            if position != last_position:
+                last_position = position
+                yield position
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.release(ticket)
+                raise RateLimitExceededError(
+                    "排队等待超时，请稍后再试",
+                    details={"timeout": timeout, "position": position}
+                )
+
+            ticket._changed.clear()
+            try:
+                await asyncio.wait_for(ticket._changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        waited = time.monotonic() - ticket.enqueued_at
+        if waited > 0.01:
+            logger.info(f"准入放行: {self.name}, user={ticket.user_key}, 排队 {waited:.2f}s")
+
+    def release(self, ticket: AdmissionTicket) -> None:
+        """
+        释放名额或退出队列（可重复调用）
+
+        Args:
+            ticket: 准入凭证
+        """
+        if ticket.released:
+            return
+        ticket.released = True
+
+        if ticket.granted:
+            self._active -= 1
+            self._dispatch()
+            return
+
+        self._waiting = [entry for entry in self._waiting if entry[2] is not ticket]
+        heapq.heapify(self._waiting)
+        self._notify_waiting()
+
+    def stats(self) -> Dict[str, int]:
+        """当前状态"""
+        return {
+            "active": self._active,
+            "queued": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+        }
+
+    def _grant(self, ticket: AdmissionTicket) -> None:
+        """放行请求"""
+        ticket.granted = True
+        self._active += 1
+        self._virtual_time = max(self._virtual_time, ticket.finish_tag)
+        ticket._changed.set()
+
+    def _dispatch(self) -> None:
+        """按虚拟完成时间放行等待中的请求"""
+        dispatched = False
+        while self._active < self.max_concurrent and self._waiting:
+            _, _, ticket = heapq.heappop(self._waiting)
+            self._grant(ticket)
+            dispatched = True
+
+        if dispatched:
+            self._notify_waiting()
+
+        if not self._waiting:
+            # 队列清空后历史虚拟时间不再影响调度
+            self._user_tags.clear()
+
+    def _notify_waiting(self) -> None:
+        """通知所有等待者排队位置可能变化"""
+        for _, _, ticket in self._waiting:
+            ticket._changed.set()
+
+
+# 全局LLM流式调用准入控制器
+llm_admission = AdmissionController(
+    name="llm_stream",
+    max_concurrent=settings.LLM_MAX_CONCURRENT_STREAMS,
+    max_queue_size=settings.LLM_MAX_QUEUE_SIZE,
+)
@@ -0,0 +1,306 @@
+"""
+回答缓存
+对“相同意图 + 相同股票 + 相同数据版本”的问题直接复用已生成的回答
+
+缓存键由三部分组成：
+- 归一化意图：去掉股票代码、语气词和标点后的问题文本
+- 股票集合：问题中出现的所有股票代码
+- 数据快照版本：每只股票的数据指纹，股票数据发生变化时自动失效
+"""
+import re
+import math
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 股票代码：SH600519 / sz000001 / SZ:002384
+SYMBOL_PATTERN = re.compile(r"(?<![A-Za-z0-9])(S[HZ])[:：]?(\d{6})(?!\d)", re.IGNORECASE)
+
+# 不影响意图的填充短语（只匹配完整的多字短语，避免误删“该不该”“下半年”中的单字）
+FILLER_PHRASES = sorted(
+    [
+        "帮我", "帮忙", "麻烦", "一下", "这只股票", "这个股票", "该股票", "这家公司", "该公司",
+        "这只", "这个", "给出", "给我", "我想", "看看", "一份",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# 句首/句尾的语气词（只在两端去除）
+_LEADING_PARTICLES_PATTERN = re.compile(r"^(?:请问|请|你|的)+")
+_TRAILING_PARTICLES_PATTERN = re.compile(r"(?:吗|呢|吧|啊|呀)+$")
+
+_PUNCTUATION_PATTERN = re.compile(r"[\s\W_]+", re.UNICODE)
+
+# 语义模式下向量的维度（字符n-gram哈希）
+EMBEDDING_DIM = 256
+
+
+def extract_symbols(text: str) -> FrozenSet[str]:
+    """
+    提取文本中的股票代码
+
+    Args:
+        text: 用户问题
+
+    Returns:
+        规范化后的股票代码集合（例如 {"SH600519"}）
+    """
+    return frozenset(
+        f"{market.upper()}{code}" for market, code in SYMBOL_PATTERN.findall(text)
+    )
+
+
+def normalize_intent(text: str) -> str:
+    """
+    归一化用户意图
+
+    Args:
+        text: 用户问题
+
+    Returns:
+        去除股票代码、填充短语、首尾语气词和标点后的文本
+
+    Examples:
+        >>> normalize_intent("请帮我分析一下SH600519吗？")
+        '分析'
+        >>> normalize_intent("SH600519该不该买") == normalize_intent("SH600519不该买吗")
+        False
+        >>> normalize_intent("SH600519下半年业绩")
+        '下半年业绩'
+    """
+    normalized = _PUNCTUATION_PATTERN.sub("", SYMBOL_PATTERN.sub(" ", text).lower())
+    for phrase in FILLER_PHRASES:
+        normalized = normalized.replace(phrase, "")
+    normalized = _LEADING_PARTICLES_PATTERN.sub("", normalized)
+    return _TRAILING_PARTICLES_PATTERN.sub("", normalized)
+
+
+def embed_text(text: str) -> List[float]:
+    """
+    计算文本的本地向量表示（字符unigram+bigram哈希，L2归一化）
+
+    Args:
+        text: 归一化后的意图文本
+
+    Returns:
+        向量
+    """
+    vector = [0.0] * EMBEDDING_DIM
+    grams = list(text) + [text[i:i + 2] for i in range(len(text) - 1)]
+    for gram in grams:
+        digest = hashlib.md5(gram.encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "little") % EMBEDDING_DIM] += 1.0
+
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return vector
+    return [v / norm for v in vector]
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    """计算两个已归一化向量的余弦相似度"""
+    return sum(x * y for x, y in zip(a, b))
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+    intent: str
+    symbols: FrozenSet[str]
+    versions: Tuple[Tuple[str, str], ...]
+    answer: str
+    created_at: float
+    embedding: List[float] = field(default_factory=list)
+    hits: int = 0
+
+
+class AnswerCache:
+    """回答缓存（单例模式）"""
+
+    _instance: Optional["AnswerCache"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+            cls._instance._snapshot_versions: Dict[str, str] = {}  # {symbol: 数据指纹}
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用缓存"""
+        return settings.ANSWER_CACHE_ENABLED
+
+    def _versions_for(self, symbols: FrozenSet[str]) -> Tuple[Tuple[str, str], ...]:
+        """获取股票集合当前的数据版本（调用方需持有锁）"""
+        return tuple(
+            (symbol, self._snapshot_versions.get(symbol, ""))
+            for symbol in sorted(symbols)
+        )
+
+    def _is_fresh(self, entry: CacheEntry, now: float) -> bool:
+        """检查条目是否在有效期内且数据版本未变化（调用方需持有锁）"""
+        if now - entry.created_at > settings.ANSWER_CACHE_TTL_SECONDS:
+            return False
+        return entry.versions == self._versions_for(entry.symbols)
+
+    def get(self, question: str) -> Optional[str]:
+        """
+        查找缓存的回答
+
+        Args:
+            question: 用户问题
+
+        Returns:
+            缓存的回答，未命中返回None
+        """
+        if not self.enabled:
+            return None
+
+        symbols = extract_symbols(question)
+        if not symbols:
+            return None
+
+        intent = normalize_intent(question)
+        now = time.time()
+
+        with self._lock:
+            key = (intent, symbols)
+            entry = self._entries.get(key)
+
+            if entry is None and settings.ANSWER_CACHE_MODE == "semantic":
+                entry = self._semantic_lookup(intent, symbols, now)
+
+            if entry is None:
+                return None
+
+            if not self._is_fresh(entry, now):
+                self._entries.pop((entry.intent, entry.symbols), None)
+                return None
+
+            entry.hits += 1
+            self._entries.move_to_end((entry.intent, entry.symbols))
+
+        logger.info(f"回答缓存命中: symbols={sorted(symbols)}, intent={intent}, hits={entry.hits}")
+        return entry.answer
+
+    def _semantic_lookup(
+        self,
+        intent: str,
+        symbols: FrozenSet[str],
+        now: float
+    ) -> Optional[CacheEntry]:
+        """
+        在相同股票集合的条目中按向量相似度查找（调用方需持有锁）
+
+        Args:
+            intent: 归一化意图
+            symbols: 股票集合
+            now: 当前时间戳
+
+        Returns:
+            最相似且超过阈值的条目
+        """
+        query_vector = embed_text(intent)
+        best_entry = None
+        best_score = settings.ANSWER_CACHE_SIMILARITY_THRESHOLD
+
+        for entry in self._entries.values():
+            if entry.symbols != symbols or not self._is_fresh(entry, now):
+                continue
+            score = _cosine(query_vector, entry.embedding)
+            if score >= best_score:
+                best_entry, best_score = entry, score
+
+        return best_entry
+
+    def set(self, question: str, answer: str) -> None:
+        """
+        写入缓存
+
+        Args:
+            question: 用户问题
+            answer: 完整回答
+        """
+        if not self.enabled or not answer:
+            return
+
+        symbols = extract_symbols(question)
+        if not symbols:
+            return
+
+        intent = normalize_intent(question)
+
+        with self._lock:
+            key = (intent, symbols)
+            self._entries[key] = CacheEntry(
+                intent=intent,
+                symbols=symbols,
+                versions=self._versions_for(symbols),
+                answer=answer,
+                created_at=time.time(),
+                embedding=embed_text(intent) if settings.ANSWER_CACHE_MODE == "semantic" else [],
+            )
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > settings.ANSWER_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+        logger.debug(f"写入回答缓存: symbols={sorted(symbols)}, intent={intent}")
+
+    def update_snapshot(self, symbol: str, data: str) -> bool:
+        """
+        更新股票数据快照版本，数据变化时使相关缓存失效
+
+        Args:
+            symbol: 股票代码
+            data: 最新获取的股票数据（原始文本）
+
+        Returns:
+            数据是否发生变化
+        """
+        symbol = symbol.replace(":", "").upper()
+        fingerprint = hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            previous = self._snapshot_versions.get(symbol)
+            self._snapshot_versions[symbol] = fingerprint
+
+            if previous is None or previous == fingerprint:
+                return False
+
+            stale_keys = [key for key, entry in self._entries.items() if symbol in entry.symbols]
+            for key in stale_keys:
+                del self._entries[key]
+
+        logger.info(f"股票数据已变化，失效 {len(stale_keys)} 条回答缓存: symbol={symbol}")
+        return True
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._snapshot_versions.clear()
+
+    def count(self) -> int:
+        """
+        获取缓存条目数量
+
+        Returns:
+            条目数量
+        """
+        return len(self._entries)
+
+
+# 创建全局缓存实例
+answer_cache = AnswerCache()
@@ -0,0 +1,109 @@
+"""
+内容寻址的大对象存储
+大块内容（例如股票工具输出的基本面数据）按SHA-256存储一次，引用方只保存 "sha256:<摘要>" 形式的引用。
+同一份数据被多个会话引用时只占用一份磁盘空间
+
+文件布局: {BLOB_STORE_DIR}/<摘要前2位>/<摘要>，内容为zlib压缩的UTF-8文本。
+对象只写一次、不修改；写入先写临时文件再原子替换，多个进程并发写入同一对象是安全的
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import zlib
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BLOB_REF_PREFIX = "sha256:"
+
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_blob_ref(value) -> bool:
+    """判断是否为大对象引用"""
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+
+class BlobStore:
+    """内容寻址的大对象存储"""
+
+    def __init__(self, base_dir: str):
+        """
+        初始化大对象存储
+
+        Args:
+            base_dir: 存储目录
+        """
+        self.base_dir = base_dir
+
+    def _path(self, ref: str) -> Optional[str]:
+        """引用对应的文件路径（非法引用返回None，避免路径穿越）"""
+        digest = ref[len(BLOB_REF_PREFIX):] if is_blob_ref(ref) else ""
+        if not _DIGEST_PATTERN.match(digest):
+            return None
+        return os.path.join(self.base_dir, digest[:2], digest)
+
+    def put(self, data: str) -> str:
+        """
+        存储内容（已存在时直接返回引用）
+
+        Args:
+            data: 内容
+
+        Returns:
+            引用
+        """
+        raw = data.encode("utf-8")
+        ref = BLOB_REF_PREFIX + hashlib.sha256(raw).hexdigest()
+        path = self._path(ref)
+        if os.path.exists(path):
+            return ref
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(raw))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return ref
+
+    def get(self, ref: str) -> str:
+        """
+        读取内容
+
+        Args:
+            ref: 引用
+
+        Returns:
+            内容
+
+        Raises:
+            KeyError: 引用不存在或对象已损坏
+        """
+        path = self._path(ref)
+        if path is None:
+            raise KeyError(ref)
+        try:
+            with open(path, "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error) as e:
+            logger.warning(f"读取大对象失败: {ref}, 错误: {e}")
+            raise KeyError(ref) from e
+
+    def exists(self, ref: str) -> bool:
+        """引用的对象是否存在"""
+        path = self._path(ref)
+        return path is not None and os.path.exists(path)
+
+
+# 创建全局大对象存储实例
+blob_store = BlobStore(settings.BLOB_STORE_DIR)
@@ -0,0 +1,118 @@
+"""
+冷对话归档存储
+长期未访问的对话从热表移出后，按用户追加写入本地磁盘上的归档段文件
+
+文件布局: {ARCHIVE_DIR}/<用户ID>/seg-000001.arc，每个对话是一个独立的zlib压缩JSON块，
+对话行记录 (段名, 偏移, 长度)，恢复时直接定位读取，不需要解压整个段。
+段文件只追加，超过 ARCHIVE_SEGMENT_MAX_MB 后切换到新段；同一用户的追加通过文件锁串行
+"""
+import contextlib
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 没有fcntl时（Windows）退化为进程内互斥，只保证单进程部署的追加串行
+_append_lock = threading.Lock() if fcntl is None else contextlib.nullcontext()
+
+SEGMENT_PATTERN = re.compile(r"^seg-(\d{6})\.arc$")
+
+
+class ArchiveStore:
+    """按用户分段的归档存储"""
+
+    def __init__(self, base_dir: str):
+        """
+        初始化归档存储
+
+        Args:
+            base_dir: 存储目录
+        """
+        self.base_dir = base_dir
+
+    def _user_dir(self, user_id: int) -> str:
+        return os.path.join(self.base_dir, str(int(user_id)))
+
+    def _current_segment(self, user_dir: str) -> str:
+        """当前可追加的段名（最新的段写满时返回下一个段名）"""
+        numbers = [
+            int(match.group(1))
+            for match in (SEGMENT_PATTERN.match(name) for name in os.listdir(user_dir))
+            if match
+        ]
+        number = max(numbers, default=1)
+        path = os.path.join(user_dir, f"seg-{number:06d}.arc")
+        if os.path.exists(path) and os.path.getsize(path) >= settings.ARCHIVE_SEGMENT_MAX_MB * 1024 * 1024:
+            number += 1
+        return f"seg-{number:06d}.arc"
+
+    def append(self, user_id: int, payload: Dict[str, Any]) -> Tuple[str, int, int]:
+        """
+        追加一个对话的归档数据（写入并fsync后返回）
+
+        Args:
+            user_id: 用户ID
+            payload: 归档数据
+
+        Returns:
+            (段名, 偏移, 长度)
+        """
+        block = zlib.compress(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            settings.DB_COMPRESSION_LEVEL
+        )
+        user_dir = self._user_dir(user_id)
+        os.makedirs(user_dir, exist_ok=True)
+
+        with open(os.path.join(user_dir, ".lock"), "a") as lock_file, _append_lock:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            segment = self._current_segment(user_dir)
+            with open(os.path.join(user_dir, segment), "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(block)
+                f.flush()
+                os.fsync(f.fileno())
+        return segment, offset, len(block)
+
+    def read(self, user_id: int, segment: str, offset: int, length: int) -> Dict[str, Any]:
+        """
+        读取一个对话的归档数据
+
+        Args:
+            user_id: 用户ID
+            segment: 段名
+            offset: 偏移
+            length: 长度
+
+        Returns:
+            归档数据
+
+        Raises:
+            ValueError: 段名非法或数据损坏
+        """
+        if not SEGMENT_PATTERN.match(segment):
+            raise ValueError(f"非法的归档段名: {segment}")
+        with open(os.path.join(self._user_dir(user_id), segment), "rb") as f:
+            f.seek(offset)
+            block = f.read(length)
+        try:
+            return json.loads(zlib.decompress(block))
+        except zlib.error as e:
+            raise ValueError(f"归档数据损坏: {segment}@{offset}") from e
+
+
+# 创建全局归档存储实例
+archive_store = ArchiveStore(settings.ARCHIVE_DIR)
@@ -0,0 +1,237 @@
+"""
+会话目录索引
+为基于文件的会话存储（files/<会话ID>/）维护一个SQLite目录（files/catalog.db），
+记录每个会话的标题、摘要、时间戳和消息数。会话日志每次追加时增量更新，
+列表查询走索引分页，不再打开会话正文
+
+目录丢失或首次创建时会扫描会话目录重建一次
+"""
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = "catalog.db"
+
+TITLE_MAX_LENGTH = 30
+SUMMARY_MAX_LENGTH = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    message_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def _truncate(text: str, max_length: int) -> str:
+    return text[:max_length] + ("..." if len(text) > max_length else "")
+
+
+def summarize_items(items: Iterable[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str], int]:
+    """
+    提取一批会话条目的标题、摘要和消息数
+
+    Args:
+        items: 会话条目
+
+    Returns:
+        (第一条用户消息生成的标题, 最后一条助手消息生成的摘要, 用户和助手消息数)，没有对应消息时为None
+    """
+    title = summary = None
+    count = 0
+    for item in items:
+        role, content = item.get("role"), item.get("content")
+        if role not in ("user", "assistant") or not content:
+            continue
+        count += 1
+        if role == "user" and title is None:
+            title = _truncate(content, TITLE_MAX_LENGTH)
+        elif role == "assistant":
+            summary = _truncate(content, SUMMARY_MAX_LENGTH)
+    return title, summary, count
+
+
+class ConversationCatalog:
+    """会话目录索引"""
+
+    def __init__(self, files_dir: str):
+        """
+        初始化目录索引
+
+        Args:
+            files_dir: 会话文件根目录
+        """
+        self.files_dir = files_dir
+        self.path = os.path.join(files_dir, CATALOG_FILE)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开连接（每次操作使用独立连接，线程和进程之间通过SQLite锁协调）"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _ensure_initialized(self) -> bool:
+        """
+        创建表结构，新建的目录扫描已有会话重建
+
+        Returns:
+            本次调用是否执行了重建
+        """
+        if self._initialized:
+            return False
+        with self._init_lock:
+            if self._initialized:
+                return False
+            os.makedirs(self.files_dir, exist_ok=True)
+            is_new = not os.path.exists(self.path)
+            with closing(self._connect()) as conn:
+                conn.executescript(_SCHEMA)
+            if is_new:
+                self._rebuild()
+            self._initialized = True
+            return is_new
+
+    def record(self, conversation_id: str, items: List[Dict[str, Any]], replace: bool = False) -> None:
+        """
+        记录会话新追加的条目（增量更新标题、摘要、消息数和更新时间）
+
+        Args:
+            conversation_id: 会话ID
+            items: 新追加的条目
+            replace: items是会话的全部条目时为True，覆盖已有的标题和消息数而不是累加
+        """
+        if self._ensure_initialized():
+            # 重建时已从磁盘读到这些条目
+            return
+        title, summary, count = summarize_items(items)
+        now = datetime.now().isoformat(timespec="seconds")
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO conversations (id, title, summary, message_count, created_at, updated_at)
+                VALUES (:id, :title, :summary, :count, :now, :now)
+                ON CONFLICT (id) DO UPDATE SET
+                    title = CASE WHEN conversations.title = '' OR :replace THEN excluded.title ELSE conversations.title END,
+                    summary = CASE WHEN excluded.summary = '' THEN conversations.summary ELSE excluded.summary END,
+                    message_count = CASE WHEN :replace THEN excluded.message_count
+                                         ELSE conversations.message_count + excluded.message_count END,
+                    updated_at = excluded.updated_at
+                """,
+                {
+                    "id": conversation_id, "title": title or "", "summary": summary or "", "count": count,
+                    "now": now, "replace": replace
+                }
+            )
+
+    def remove(self, conversation_id: str) -> None:
+        """
+        从目录中移除会话（会话文件被归档或删除时调用）
+
+        Args:
+            conversation_id: 会话ID
+        """
+        if self._ensure_initialized():
+            # 重建时已按磁盘上的会话收录
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+    def list(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按会话ID倒序（即创建时间倒序）分页列出会话
+
+        Args:
+            limit: 返回的最大条数
+            before: 游标，上一页最后一个会话ID
+
+        Returns:
+            会话摘要列表
+        """
+        self._ensure_initialized()
+        sql = "SELECT id, title, summary, message_count, created_at, updated_at FROM conversations"
+        params: list = []
+        if before:
+            sql += " WHERE id < ?"
+            params.append(before)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def rebuild(self) -> int:
+        """
+        扫描会话目录重建目录索引（读取每个会话的完整记录，只在目录丢失或损坏时使用）
+
+        Returns:
+            收录的会话数
+        """
+        self._ensure_initialized()
+        return self._rebuild()
+
+    def _rebuild(self) -> int:
+        """扫描会话目录重建目录索引"""
+        from app.core.conversation_journal import read_conversation_items
+
+        rows = []
+        for conversation_id in os.listdir(self.files_dir):
+            conversation_dir = os.path.join(self.files_dir, conversation_id)
+            if not os.path.isdir(conversation_dir):
+                continue
+            try:
+                items = read_conversation_items(conversation_dir)
+            except Exception as e:
+                logger.warning(f"重建会话目录时跳过无法解析的会话: {conversation_id}, 错误: {str(e)}")
+                continue
+            if not items:
+                continue
+
+            title, summary, count = summarize_items(items)
+            mtime = datetime.fromtimestamp(os.path.getmtime(conversation_dir)).isoformat(timespec="seconds")
+            rows.append((conversation_id, title or "", summary or "", count, mtime, mtime))
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM conversations")
+            conn.executemany(
+                "INSERT INTO conversations (id, title, summary, message_count, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        logger.info(f"会话目录已重建: {len(rows)} 个会话")
+        return len(rows)
+
+
+_catalogs: Dict[str, ConversationCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_conversation_catalog(files_dir: str) -> ConversationCatalog:
+    """
+    获取会话文件根目录对应的目录索引（同一目录共享实例）
+
+    Args:
+        files_dir: 会话文件根目录
+
+    Returns:
+        目录索引
+    """
+    key = os.path.abspath(files_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = ConversationCatalog(key)
+        return catalog
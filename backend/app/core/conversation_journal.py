@@ -0,0 +1,230 @@
+"""
+对话日志（追加写）
+每个会话一个JSONL文件（files/<会话ID>/conversation.jsonl），每轮对话只追加新增的条目，
+写盘量与新内容成正比；fsync按时间间隔批量执行，间隔内未落盘的追加由定时器补做fsync，
+智能体被移除或服务关闭时也会立即落盘
+
+conversation.json / conversation.md 不再写入。只有旧格式 conversation.json 的会话仍可读取，
+首次追加时会先把其内容转入日志。
+每次追加同时增量更新会话目录索引（见 conversation_catalog）
+
+超过 BLOB_STORE_MIN_SIZE_BYTES 的工具输出存入大对象存储，日志条目只保存 output_ref 引用；
+读取时默认不加载这些内容（列表、标题、消息导入都不需要），需要完整内容时传 resolve_blobs=True
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.core.blob_store import blob_store
+from app.core.conversation_catalog import get_conversation_catalog
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = "conversation.jsonl"
+JSON_VIEW_FILE = "conversation.json"
+MARKDOWN_VIEW_FILE = "conversation.md"
+
+
+def offload_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把条目中较大的工具输出存入大对象存储，替换为引用
+
+    Args:
+        item: 会话条目
+
+    Returns:
+        可能替换了输出的新条目（原条目不修改）
+    """
+    output = item.get("output")
+    if item.get("type") != "function_call_output" or not isinstance(output, str):
+        return item
+    if len(output.encode("utf-8")) < settings.BLOB_STORE_MIN_SIZE_BYTES:
+        return item
+
+    try:
+        ref = blob_store.put(output)
+    except OSError as e:
+        logger.warning(f"写入大对象失败，工具输出保留在日志中: {str(e)}")
+        return item
+    offloaded = {key: value for key, value in item.items() if key != "output"}
+    offloaded["output_ref"] = ref
+    return offloaded
+
+
+def resolve_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    加载条目引用的大对象，还原为完整条目
+
+    Args:
+        item: 会话条目
+
+    Returns:
+        完整条目（对象丢失时保留引用）
+    """
+    ref = item.get("output_ref")
+    if ref is None:
+        return item
+    try:
+        output = blob_store.get(ref)
+    except KeyError:
+        return item
+    resolved = {key: value for key, value in item.items() if key != "output_ref"}
+    resolved["output"] = output
+    return resolved
+
+
+def read_conversation_items(conversation_dir: str, resolve_blobs: bool = False) -> List[Dict[str, Any]]:
+    """
+    读取会话的全部条目（优先读取日志，不存在时读取旧格式的conversation.json）
+
+    Args:
+        conversation_dir: 会话目录
+        resolve_blobs: 是否加载大对象存储中的工具输出（默认只返回引用）
+
+    Returns:
+        条目列表，会话不存在时为空列表
+    """
+    journal_path = os.path.join(conversation_dir, JOURNAL_FILE)
+    if os.path.exists(journal_path):
+        items = []
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 进程崩溃可能留下半行，跳过即可，之前的条目仍然完整
+                    logger.warning(f"跳过无法解析的日志行: {journal_path}:{line_number}")
+        return [resolve_item(item) for item in items] if resolve_blobs else items
+
+    json_path = os.path.join(conversation_dir, JSON_VIEW_FILE)
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return []
+
+
+class ConversationJournal:
+    """单个会话的追加写日志"""
+
+    def __init__(self, conversation_dir: str, fsync_interval: Optional[float] = None):
+        """
+        初始化对话日志
+
+        Args:
+            conversation_dir: 会话目录
+            fsync_interval: fsync最小间隔（秒），0表示每次追加都fsync，为None时读取配置
+        """
+        self.conversation_dir = conversation_dir
+        self.conversation_id = os.path.basename(os.path.normpath(conversation_dir))
+        self.path = os.path.join(conversation_dir, JOURNAL_FILE)
+        self.fsync_interval = (
+            settings.CONVERSATION_JOURNAL_FSYNC_INTERVAL_SECONDS if fsync_interval is None else fsync_interval
+        )
+        self._lock = threading.Lock()
+        self._last_sync = 0.0
+        self._dirty = False
+        self._sync_timer: Optional[threading.Timer] = None
+
+    def exists(self) -> bool:
+        """会话是否已有记录（日志或旧格式JSON）"""
+        return (
+            os.path.exists(self.path)
+            or os.path.exists(os.path.join(self.conversation_dir, JSON_VIEW_FILE))
+        )
+
+    def append(self, items: Iterable[Dict[str, Any]]) -> None:
+        """
+        追加条目
+
+        Args:
+            items: 新增的会话条目
+        """
+        items = list(items)
+        if not items:
+            return
+
+        with self._lock:
+            os.makedirs(self.conversation_dir, exist_ok=True)
+            is_new = not os.path.exists(self.path)
+            if is_new:
+                # 旧格式会话：先把已有记录转入日志，之后只追加
+                items = read_conversation_items(self.conversation_dir) + items
+            items = [offload_item(item) for item in items]
+            lines = [json.dumps(item, ensure_ascii=False) + "\n" for item in items]
+            if self._ends_with_partial_line():
+                # 上次写入中断留下的半行单独成行，不与新条目拼接
+                lines.insert(0, "\n")
+
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                f.flush()
+                self._dirty = True
+                if time.monotonic() - self._last_sync >= self.fsync_interval:
+                    os.fsync(f.fileno())
+                    self._last_sync = time.monotonic()
+                    self._dirty = False
+                elif self._sync_timer is None:
+                    # 间隔内的追加暂不fsync，到期后由定时器补做，避免之后没有新追加时一直不落盘
+                    self._sync_timer = threading.Timer(self.fsync_interval, self._deferred_sync)
+                    self._sync_timer.daemon = True
+                    self._sync_timer.start()
+
+        try:
+            get_conversation_catalog(os.path.dirname(os.path.abspath(self.conversation_dir))).record(
+                self.conversation_id, items, replace=is_new
+            )
+        except Exception as e:
+            # 目录索引只影响会话列表，不影响记录本身
+            logger.warning(f"更新会话目录失败: {self.conversation_id}, 错误: {str(e)}")
+
+    def _ends_with_partial_line(self) -> bool:
+        """日志是否以不完整的行结尾"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def sync(self) -> None:
+        """立即fsync尚未落盘的追加内容"""
+        with self._lock:
+            if not self._dirty or not os.path.exists(self.path):
+                return
+            fd = os.open(self.path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._last_sync = time.monotonic()
+            self._dirty = False
+
+    def _deferred_sync(self) -> None:
+        """定时器回调：补做间隔内未执行的fsync"""
+        with self._lock:
+            self._sync_timer = None
+        try:
+            self.sync()
+        except OSError as e:
+            logger.warning(f"会话日志落盘失败: {self.conversation_id}, 错误: {str(e)}")
+
+    def close(self) -> None:
+        """取消待执行的定时fsync并立即落盘"""
+        with self._lock:
+            timer, self._sync_timer = self._sync_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.sync()
+
+    def read(self, resolve_blobs: bool = False) -> List[Dict[str, Any]]:
+        """读取全部条目"""
+        return read_conversation_items(self.conversation_dir, resolve_blobs)
@@ -144,6 +144,11 @@ class CacheError(ExternalServiceError):
     pass
 
 
+class CircuitOpenError(ExternalServiceError):
+    """上游服务熔断中"""
+    pass
+
+
 # 限流异常
 class RateLimitExceededError(StockAgentException):
     """超出限流"""
@@ -0,0 +1,54 @@
+"""
+会话ID生成
+格式: YYYYMMdd-HHmmss-<毫秒3位><16位随机串>，例如 "20260119-143052-2071K8ZQ3M4XW9TN6PB"
+
+参考ULID：时间在前，按字符串排序即按创建时间排序（文件存储的会话列表、导入时解析创建时间都依赖这个前缀）；
+随机部分为80位（Crockford Base32编码），同一毫秒内在进程内单调递增，不会重复
+"""
+import secrets
+import threading
+import time
+from datetime import datetime
+
+# Crockford Base32（去掉易混淆的 I L O U）
+ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+RANDOM_BITS = 80
+RANDOM_LENGTH = 16
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(ENCODING[index])
+    return "".join(reversed(chars))
+
+
+def generate_conversation_id() -> str:
+    """
+    生成按时间有序、不会冲突的会话ID
+
+    Returns:
+        会话ID
+    """
+    global _last_ms, _last_random
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms:
+            # 同一毫秒内（或时钟回拨）：沿用上一个时间戳，随机部分加1
+            now_ms = _last_ms
+            random_part = _last_random + 1
+            if random_part >> RANDOM_BITS:
+                now_ms += 1
+                random_part = secrets.randbits(RANDOM_BITS)
+        else:
+            random_part = secrets.randbits(RANDOM_BITS)
+        _last_ms, _last_random = now_ms, random_part
+
+    time_part = datetime.fromtimestamp(now_ms // 1000).strftime("%Y%m%d-%H%M%S")
+    return f"{time_part}-{now_ms % 1000:03d}{_encode(random_part, RANDOM_LENGTH)}"
@@ -0,0 +1,68 @@
+"""
+共享LLM客户端
+所有智能体复用同一个OpenAI客户端和底层连接池，避免每个会话重新建立TLS连接
+"""
+import logging
+import threading
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+_client: Optional["OpenAI"] = None
+_http_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+def get_llm_client() -> "OpenAI":
+    """
+    获取共享的OpenAI客户端（使用配置中的API地址和密钥）
+
+    Returns:
+        OpenAI客户端
+    """
+    global _client, _http_client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                # openai导入较慢，首次使用时再加载（启动预热会提前完成）
+                from openai import OpenAI
+
+                _http_client = httpx.Client(
+                    timeout=httpx.Timeout(settings.AI_TIMEOUT, connect=10.0),
+                    limits=httpx.Limits(
+                        max_connections=settings.LLM_MAX_CONCURRENT_STREAMS * 2,
+                        max_keepalive_connections=settings.LLM_MAX_CONCURRENT_STREAMS,
+                    ),
+                )
+                _client = OpenAI(
+                    base_url=settings.AI_BASE_URL,
+                    api_key=settings.effective_ai_api_key,
+                    http_client=_http_client,
+                )
+    return _client
+
+
+def preconnect() -> None:
+    """
+    预先建立到LLM服务的TLS连接并放入连接池（响应状态码不影响连接复用）
+    """
+    get_llm_client()
+    response = _http_client.head(settings.AI_BASE_URL)
+    logger.info(f"LLM服务连接已建立: {settings.AI_BASE_URL} (HTTP {response.status_code})")
+
+
+def close_llm_client() -> None:
+    """关闭共享连接池"""
+    global _client, _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client = None
+        _http_client = None
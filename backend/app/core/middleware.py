@@ -1,14 +1,19 @@
 """
 中间件
 """
+import math
 import time
 import logging
-from typing import Callable
+from typing import Callable, Optional
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.config import settings
 from app.core.exceptions import StockAgentException
+from app.core.rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -126,7 +131,9 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
             AuthorizationError,
             ResourceNotFoundError,
             ResourceAlreadyExistsError,
+            ResourceLimitExceededError,
             ValidationError,
+            BusinessLogicError,
             RateLimitExceededError
         )
 
@@ -138,9 +145,90 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
             return status.HTTP_404_NOT_FOUND
         elif isinstance(exception, ResourceAlreadyExistsError):
             return status.HTTP_409_CONFLICT
+        elif isinstance(exception, BusinessLogicError):
+            return status.HTTP_409_CONFLICT
         elif isinstance(exception, ValidationError):
             return status.HTTP_422_UNPROCESSABLE_ENTITY
-        elif isinstance(exception, RateLimitExceededError):
+        elif isinstance(exception, (RateLimitExceededError, ResourceLimitExceededError)):
             return status.HTTP_429_TOO_MANY_REQUESTS
         else:
             return status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class RateLimitMiddleware:
+    """
+    限流中间件（纯ASGI实现，不缓冲流式响应）
+
+    已登录用户按用户ID限流，匿名请求按客户端IP限流，另可配置全局限流
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in settings.rate_limit_exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        client_key = self._get_client_key(scope, headers)
+        retry_after = await self.limiter.check(client_key)
+
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after_seconds = max(1, math.ceil(retry_after))
+        logger.warning(f"请求被限流: {client_key} {scope['method']} {scope['path']}, {retry_after_seconds}s 后重试")
+
+        response = JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={
+                "error_code": "RateLimitExceededError",
+                "message": "请求过于频繁，请稍后再试",
+                "details": {"retry_after": retry_after_seconds}
+            },
+            headers={"Retry-After": str(retry_after_seconds)}
+        )
+        await response(scope, receive, send)
+
+    @staticmethod
+    def _get_client_key(scope: Scope, headers: Headers) -> str:
+        """
+        获取限流键
+
+        Args:
+            scope: ASGI scope
+            headers: 请求头
+
+        Returns:
+            user:<用户ID> 或 ip:<客户端IP>
+        """
+        authorization = headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            from app.core.security import TokenHandler
+
+            try:
+                payload = TokenHandler.decode_token(authorization[7:].strip())
+                if payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            except StockAgentException:
+                # 无效token按IP限流，由后续认证逻辑返回401
+                pass
+
+        if settings.RATE_LIMIT_TRUST_PROXY_HEADERS:
+            real_ip = headers.get("x-real-ip")
+            if real_ip:
+                return f"ip:{real_ip.strip()}"
+            forwarded_for = headers.get("x-forwarded-for")
+            if forwarded_for:
+                return f"ip:{forwarded_for.split(',')[0].strip()}"
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
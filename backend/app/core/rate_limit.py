@@ -0,0 +1,180 @@
+"""
+请求限流
+基于GCRA（通用信元速率算法）的按用户/全局限流，每次请求只需O(1)的状态读写，过期状态增量清理
+
+存储后端：
+- memory: 进程内字典（默认，多worker时各进程独立计数）
+- redis: 启用REDIS_ENABLED时使用，多worker/多实例共享计数（需要安装redis包）
+"""
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 全局限流使用的键
+GLOBAL_KEY = "__global__"
+
+# 内存存储每次请求最多清理的过期条目数（增量清理，保证单次请求O(log n)）
+MEMORY_STORE_SWEEP_BATCH = 8
+
+# Redis GCRA脚本：返回需要等待的秒数（"0"表示放行）
+REDIS_GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local allow_at = tat - tolerance
+if now < allow_at then
+    return tostring(allow_at - now)
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return '0'
+"""
+
+
+class MemoryRateLimitStore:
+    """进程内GCRA存储"""
+
+    def __init__(self):
+        self._tat: Dict[str, float] = {}  # {key: 理论到达时间}
+        self._expiry: List[Tuple[float, str]] = []  # 按过期时间排序的堆 [(理论到达时间, key)]
+
+    async def hit(self, key: str, interval: float, tolerance: float) -> float:
+        """
+        记录一次请求
+
+        Args:
+            key: 限流键
+            interval: 两次请求的平均间隔（秒）
+            tolerance: 允许的突发容差（秒）
+
+        Returns:
+            需要等待的秒数，0表示放行
+        """
+        now = time.monotonic()
+        tat = max(self._tat.get(key, now), now)
+
+        allow_at = tat - tolerance
+        if now < allow_at:
+            return allow_at - now
+
+        new_tat = tat + interval
+        self._tat[key] = new_tat
+        heapq.heappush(self._expiry, (new_tat, key))
+
+        self._sweep(now)
+
+        return 0.0
+
+    def _sweep(self, now: float) -> None:
+        """
+        增量清理已过期的条目（过期条目等价于全新状态）
+
+        每次最多处理MEMORY_STORE_SWEEP_BATCH个堆顶条目；每次放行只入堆一条，
+        因此堆和字典的大小都不会无限增长
+        """
+        for _ in range(MEMORY_STORE_SWEEP_BATCH):
+            if not self._expiry or self._expiry[0][0] > now:
+                return
+            _, key = heapq.heappop(self._expiry)
+            # 堆中可能是该键的旧记录，只有当前状态也已过期时才删除
+            if self._tat.get(key, now) <= now:
+                self._tat.pop(key, None)
+
+
+class RedisRateLimitStore:
+    """Redis GCRA存储"""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url)
+        self._script = self._redis.register_script(REDIS_GCRA_SCRIPT)
+
+    async def hit(self, key: str, interval: float, tolerance: float) -> float:
+        """
+        记录一次请求
+
+        Args:
+            key: 限流键
+            interval: 两次请求的平均间隔（秒）
+            tolerance: 允许的突发容差（秒）
+
+        Returns:
+            需要等待的秒数，0表示放行
+        """
+        result = await self._script(
+            keys=[f"rate_limit:{key}"],
+            args=[time.time(), interval, tolerance]
+        )
+        return float(result)
+
+
+class RateLimiter:
+    """请求限流器（按用户 + 全局）"""
+
+    def __init__(self, store=None):
+        """
+        初始化限流器
+
+        Args:
+            store: 存储后端（None则根据配置自动选择）
+        """
+        self.store = store or self._create_store()
+
+    @staticmethod
+    def _create_store():
+        """根据配置创建存储后端"""
+        if settings.REDIS_ENABLED and settings.REDIS_URL:
+            try:
+                store = RedisRateLimitStore(settings.REDIS_URL)
+                logger.info("限流使用Redis存储")
+                return store
+            except ImportError:
+                logger.warning("未安装redis包，限流回退到进程内存储")
+        return MemoryRateLimitStore()
+
+    @staticmethod
+    def _gcra_params(per_minute: int, burst: int) -> tuple:
+        """将每分钟请求数和突发数转换为GCRA参数"""
+        interval = 60.0 / per_minute
+        tolerance = interval * max(burst - 1, 0)
+        return interval, tolerance
+
+    async def check(self, client_key: str) -> Optional[float]:
+        """
+        检查请求是否放行
+
+        Args:
+            client_key: 客户端标识（user:<id> 或 ip:<address>）
+
+        Returns:
+            None表示放行，否则为建议的重试等待秒数
+        """
+        try:
+            interval, tolerance = self._gcra_params(settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_BURST)
+            wait = await self.store.hit(client_key, interval, tolerance)
+            if wait > 0:
+                return wait
+
+            if settings.RATE_LIMIT_GLOBAL_PER_MINUTE > 0:
+                interval, tolerance = self._gcra_params(
+                    settings.RATE_LIMIT_GLOBAL_PER_MINUTE,
+                    settings.RATE_LIMIT_GLOBAL_BURST
+                )
+                wait = await self.store.hit(GLOBAL_KEY, interval, tolerance)
+                if wait > 0:
+                    return wait
+        except Exception as e:
+            # 限流存储故障时放行，避免影响正常服务
+            logger.error(f"限流检查失败，放行请求: {str(e)}")
+
+        return None
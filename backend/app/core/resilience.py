@@ -0,0 +1,156 @@
+"""
+上游调用保护
+提供令牌桶限流器和熔断器，用于保护对外部数据源的调用
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from app.core.exceptions import CircuitOpenError, ExternalServiceError
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """令牌桶限流器（线程安全，可跨事件循环共享）"""
+
+    def __init__(self, name: str, rate: float, capacity: int):
+        """
+        初始化令牌桶
+
+        Args:
+            name: 名称（用于日志）
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发请求数）
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """按经过的时间补充令牌（调用方需持有锁）"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, max_wait: float) -> None:
+        """
+        获取一个令牌，令牌不足时等待
+
+        Args:
+            max_wait: 最长等待时间（秒），超过则立即失败
+
+        Raises:
+            ExternalServiceError: 预计等待时间超过max_wait
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            wait = (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                raise ExternalServiceError(
+                    f"上游接口本地限流: {self.name}",
+                    details={"expected_wait": round(wait, 3), "max_wait": max_wait}
+                )
+            # 预占令牌，后续请求排在其后
+            self._tokens -= 1
+
+        await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """熔断器（关闭 -> 打开 -> 半开探测 -> 关闭）"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        """
+        初始化熔断器
+
+        Args:
+            name: 名称（用于日志）
+            failure_threshold: 连续失败多少次后打开
+            recovery_timeout: 打开后多久允许半开探测（秒）
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前状态（打开状态超过恢复时间时视为半开）"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于拒绝请求的打开状态"""
+        return self.state == self.OPEN
+
+    def before_call(self) -> None:
+        """
+        调用前检查，半开状态只放行一个探测请求
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    raise CircuitOpenError(
+                        f"上游服务熔断中: {self.name}",
+                        details={"retry_after": round(self.recovery_timeout - (time.monotonic() - self._opened_at), 1)}
+                    )
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"熔断器进入半开状态: {self.name}")
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(f"上游服务熔断探测中: {self.name}")
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """记录成功调用"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"熔断器关闭，上游服务已恢复: {self.name}")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """记录失败调用"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(
+                        f"熔断器打开: {self.name}, 连续失败 {self._failures} 次, "
+                        f"{self.recovery_timeout}s 后探测"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def reset(self) -> None:
+        """重置为关闭状态"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
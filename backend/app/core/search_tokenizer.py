@@ -0,0 +1,64 @@
+"""
+全文搜索分词
+SQLite FTS5 内置的分词器不能切分中文（整段汉字会成为一个词），这里在写入索引前先做预分词：
+- 连续的中日韩文字切分为重叠的二元组（"贵州茅台" -> "贵州 州茅 茅台"），单字保留为一个词
+- 其他文字按字母/数字连续段切分（"600519"、"roe"）
+- 统一做NFKC规范化并转小写（全角字母数字转半角）
+
+查询使用同样的规则，每一段连续文字作为一个短语匹配，多段之间为AND关系（同一条消息中）
+"""
+import re
+import unicodedata
+from typing import List, Optional
+
+# 中日韩文字（含日文假名、韩文音节）
+CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+TOKEN_PATTERN = re.compile(f"([{CJK_CHARS}]+)|([^\\W_{CJK_CHARS}]+)")
+
+
+def _segments(text: str) -> List[List[str]]:
+    """切分为连续文字段，每段是一组词"""
+    segments = []
+    for cjk, word in TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if cjk:
+            segments.append([cjk] if len(cjk) == 1 else [cjk[i:i + 2] for i in range(len(cjk) - 1)])
+        else:
+            segments.append([word])
+    return segments
+
+
+def tokenize(text: Optional[str]) -> str:
+    """
+    将文本转换为写入索引的词序列
+
+    Args:
+        text: 原文
+
+    Returns:
+        空格分隔的词
+    """
+    if not text:
+        return ""
+    return " ".join(token for segment in _segments(text) for token in segment)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    将用户输入转换为FTS5 MATCH表达式
+
+    单个汉字按前缀匹配（只能匹配以该字开头的二元组，例如"茅"能匹配"茅台"但不能匹配"白茅"）
+
+    Args:
+        query: 用户输入
+
+    Returns:
+        MATCH表达式，没有可搜索的内容时返回None
+    """
+    phrases = []
+    for segment in _segments(query):
+        # 词只包含字母数字和中日韩文字，不需要转义引号
+        phrase = f'"{" ".join(segment)}"'
+        if len(segment) == 1 and len(segment[0]) == 1 and TOKEN_PATTERN.match(segment[0]).group(1):
+            phrase += "*"
+        phrases.append(f"tokens : {phrase}")
+    return " AND ".join(phrases) if phrases else None
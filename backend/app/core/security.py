@@ -363,6 +363,24 @@ async def get_current_user_id_or_default(
         except HTTPException:
             pass  # 如果token无效，继续使用默认用户
     
+    return get_or_create_guest_user_id()
+
+
+# 默认用户ID缓存（默认用户创建后不会变化）
+_guest_user_id: Optional[str] = None
+
+
+def get_or_create_guest_user_id() -> str:
+    """
+    获取默认用户ID，不存在则创建（结果缓存在进程内）
+
+    Returns:
+        默认用户ID（字符串）
+    """
+    global _guest_user_id
+    if _guest_user_id is not None:
+        return _guest_user_id
+
     # 获取或创建默认用户（延迟导入避免循环依赖）
     from app.db.session import SessionLocal
     from app.services.user_service import UserService
@@ -387,7 +405,8 @@ async def get_current_user_id_or_default(
                 )
             )
         
-        return str(default_user.id)
+        _guest_user_id = str(default_user.id)
+        return _guest_user_id
     finally:
         db.close()
 
@@ -0,0 +1,213 @@
+"""
+股票数据快照存储
+按股票代码将雪球各接口的原始返回持久化到本地磁盘，进程重启和多个worker之间共享
+
+文件格式（每只股票一个文件 {SYMBOL}.snap，小端序）：
+- 文件头: magic(4) | 版本(u16) | 条目数(u16)
+- 索引区: 每个接口一条定长记录
+  接口名(24字节) | 报告期(i64，毫秒时间戳，无则为0) | 获取时间(f64) | 数据偏移(u32) | 数据长度(u32)
+- 数据区: 各接口的zlib压缩JSON，按列连续存放
+
+读取时通过mmap只解压所需接口的数据块；写入先写临时文件再原子替换，读者不会看到半写的文件
+"""
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"XQS1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH")
+INDEX_ENTRY = struct.Struct("<24sqdII")
+ENDPOINT_NAME_SIZE = 24
+
+_SYMBOL_PATTERN = re.compile(r"^[A-Z0-9]{1,16}$")
+
+
+def normalize_symbol(symbol: str) -> str:
+    """
+    规范化股票代码（SZ:002384 / sz：002384 -> SZ002384）
+
+    Args:
+        symbol: 股票代码
+
+    Returns:
+        去除空白和冒号并大写后的代码
+    """
+    return symbol.strip().replace(":", "").replace("：", "").upper()
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    """单个接口的快照"""
+    endpoint: str
+    report_period: int
+    fetched_at: float
+    data: Any
+
+
+def report_period_of(data: Any) -> int:
+    """
+    从接口返回中提取报告期（财报类接口的 report_date）
+
+    Args:
+        data: 接口原始返回
+
+    Returns:
+        报告期毫秒时间戳，无则为0
+    """
+    try:
+        items = data["data"].get("list") or data["data"].get("items") or []
+        return int(items[0].get("report_date") or 0)
+    except (KeyError, IndexError, TypeError, AttributeError, ValueError):
+        return 0
+
+
+class SnapshotStore:
+    """磁盘快照存储"""
+
+    def __init__(self, base_dir: str):
+        """
+        初始化快照存储
+
+        Args:
+            base_dir: 存储目录
+        """
+        self.base_dir = base_dir
+        self._write_lock = threading.Lock()
+
+    def _path(self, symbol: str) -> Optional[str]:
+        """股票代码对应的文件路径（非法代码返回None，避免路径穿越）"""
+        symbol = normalize_symbol(symbol)
+        if not _SYMBOL_PATTERN.match(symbol):
+            return None
+        return os.path.join(self.base_dir, f"{symbol}.snap")
+
+    def _read_index(self, buf) -> Dict[str, tuple]:
+        """解析文件头和索引区"""
+        magic, version, count = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("快照文件格式不匹配")
+
+        index = {}
+        for i in range(count):
+            raw_name, report_period, fetched_at, offset, length = INDEX_ENTRY.unpack_from(
+                buf, HEADER.size + i * INDEX_ENTRY.size
+            )
+            endpoint = raw_name.rstrip(b"\0").decode("ascii")
+            index[endpoint] = (report_period, fetched_at, offset, length)
+        return index
+
+    def get_all(self, symbol: str, max_age: Optional[float] = None) -> Dict[str, SnapshotEntry]:
+        """
+        读取股票的全部接口快照
+
+        Args:
+            symbol: 股票代码
+            max_age: 最大数据年龄（秒），None表示不限制
+
+        Returns:
+            {接口名: 快照}，文件不存在或损坏时返回空字典
+        """
+        path = self._path(symbol)
+        if path is None or not os.path.exists(path):
+            return {}
+
+        now = time.time()
+        entries = {}
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                for endpoint, (report_period, fetched_at, offset, length) in self._read_index(buf).items():
+                    if max_age is not None and now - fetched_at > max_age:
+                        continue
+                    data = json.loads(zlib.decompress(buf[offset:offset + length]))
+                    entries[endpoint] = SnapshotEntry(endpoint, report_period, fetched_at, data)
+        except (OSError, ValueError, struct.error, zlib.error) as e:
+            logger.warning(f"读取快照失败: {symbol}, 错误: {e}")
+            return {}
+        return entries
+
+    def get(self, symbol: str, endpoint: str, max_age: Optional[float] = None) -> Optional[SnapshotEntry]:
+        """
+        读取单个接口的快照
+
+        Args:
+            symbol: 股票代码
+            endpoint: 接口名
+            max_age: 最大数据年龄（秒），None表示不限制
+
+        Returns:
+            快照，不存在或已过期返回None
+        """
+        return self.get_all(symbol, max_age).get(endpoint)
+
+    def is_fresh(self, symbol: str, endpoints, max_age: float) -> bool:
+        """所有接口都存在未过期的快照"""
+        fresh = self.get_all(symbol, max_age)
+        return all(endpoint in fresh for endpoint in endpoints)
+
+    def put_many(self, symbol: str, data_by_endpoint: Dict[str, Any]) -> None:
+        """
+        写入多个接口的快照（与已有快照合并）
+
+        Args:
+            symbol: 股票代码
+            data_by_endpoint: {接口名: 接口原始返回}
+        """
+        path = self._path(symbol)
+        if path is None or not data_by_endpoint:
+            return
+
+        now = time.time()
+        with self._write_lock:
+            entries = self.get_all(symbol)
+            for endpoint, data in data_by_endpoint.items():
+                entries[endpoint] = SnapshotEntry(endpoint, report_period_of(data), now, data)
+
+            try:
+                os.makedirs(self.base_dir, exist_ok=True)
+                self._write(path, entries)
+            except OSError as e:
+                logger.warning(f"写入快照失败: {symbol}, 错误: {e}")
+
+    def _write(self, path: str, entries: Dict[str, SnapshotEntry]) -> None:
+        """原子写入快照文件"""
+        blocks = []
+        index = []
+        offset = HEADER.size + INDEX_ENTRY.size * len(entries)
+        for endpoint, entry in entries.items():
+            block = zlib.compress(
+                json.dumps(entry.data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            )
+            name = endpoint.encode("ascii")[:ENDPOINT_NAME_SIZE]
+            index.append(INDEX_ENTRY.pack(name, entry.report_period, entry.fetched_at, offset, len(block)))
+            blocks.append(block)
+            offset += len(block)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(entries)))
+                f.writelines(index)
+                f.writelines(blocks)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+# 创建全局快照存储实例
+snapshot_store = SnapshotStore(settings.SNAPSHOT_STORE_DIR)
@@ -0,0 +1,118 @@
+"""
+启动预热
+在应用启动阶段并发完成模块导入、密码哈希自检、默认用户创建、LLM连接建立和数据库页面预读，
+预热完成前 /health/ready 返回503，负载均衡器不会转发流量
+"""
+import asyncio
+import importlib
+import logging
+import time
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import text
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 预先导入的模块（首个请求不再承担导入耗时）
+PRELOAD_MODULES = (
+    "openai",
+    "app.agents.manager",
+    "app.agents.stock_agent",
+    "app.agents.tools.stock_tool",
+    "app.services.chat_service",
+)
+
+# 预读的数据表
+WARM_TABLES = ("users", "conversations", "messages")
+
+
+class WarmupState:
+    """预热状态"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: float = 0.0
+        self.duration: float = 0.0
+        self.steps: Dict[str, str] = {}  # {步骤名: ok / failed: 原因}
+
+    def to_dict(self) -> Dict:
+        """状态摘要"""
+        return {
+            "ready": self.ready,
+            "duration": round(self.duration, 3),
+            "steps": dict(self.steps),
+        }
+
+
+warmup_state = WarmupState()
+
+
+def _preload_modules() -> None:
+    """导入重量级模块"""
+    for module_name in PRELOAD_MODULES:
+        importlib.import_module(module_name)
+
+
+def _warm_password_hashing() -> None:
+    """完成密码哈希后端初始化"""
+    from app.core.security import PasswordHandler
+
+    PasswordHandler.verify_password("warmup", PasswordHandler.hash_password("warmup"))
+
+
+def _ensure_guest_user() -> None:
+    """创建并缓存默认用户"""
+    from app.core.security import get_or_create_guest_user_id
+
+    get_or_create_guest_user_id()
+
+
+def _preconnect_llm() -> None:
+    """建立到LLM服务的连接"""
+    from app.core.llm_client import preconnect
+
+    preconnect()
+
+
+def _warm_database() -> None:
+    """读取各数据表，将页面加载到缓存"""
+    from app.db.session import engine
+
+    with engine.connect() as conn:
+        for table in WARM_TABLES:
+            conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("preload_modules", _preload_modules),
+    ("password_hashing", _warm_password_hashing),
+    ("guest_user", _ensure_guest_user),
+    ("llm_connection", _preconnect_llm),
+    ("database", _warm_database),
+]
+
+
+async def _run_step(name: str, func: Callable[[], None]) -> None:
+    """执行单个预热步骤（失败只记录，不阻止服务就绪）"""
+    start = time.monotonic()
+    try:
+        await asyncio.wait_for(asyncio.to_thread(func), timeout=settings.WARMUP_TIMEOUT_SECONDS)
+        warmup_state.steps[name] = "ok"
+        logger.info(f"预热完成: {name}, 耗时 {time.monotonic() - start:.3f}s")
+    except Exception as e:
+        warmup_state.steps[name] = f"failed: {type(e).__name__}: {e}"
+        logger.warning(f"预热失败: {name}, 错误: {type(e).__name__}: {e}")
+
+
+async def run_warmup() -> None:
+    """并发执行所有预热步骤，完成后标记为就绪"""
+    warmup_state.started_at = time.monotonic()
+
+    if settings.WARMUP_ENABLED:
+        await asyncio.gather(*(_run_step(name, func) for name, func in WARMUP_STEPS))
+
+    warmup_state.duration = time.monotonic() - warmup_state.started_at
+    warmup_state.ready = True
+    logger.info(f"预热结束，服务就绪，耗时 {warmup_state.duration:.3f}s")
@@ -0,0 +1,288 @@
+"""
+雪球数据异步客户端
+替代 pysnowball 的同步 requests 调用，提供共享长连接池、连接数限制、带抖动的重试和token管理
+"""
+import asyncio
+import logging
+import random
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.core.exceptions import ExternalServiceError
+from app.core.resilience import CircuitBreaker, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# 雪球接口路径（与 pysnowball.api_ref 保持一致）
+CASH_FLOW_PATH = "/v5/stock/finance/cn/cash_flow.json"
+INCOME_PATH = "/v5/stock/finance/cn/income.json"
+BUSINESS_PATH = "/v5/stock/finance/cn/business.json"
+TOP_HOLDERS_PATH = "/v5/stock/f10/cn/top_holders.json"
+MAIN_INDICATOR_PATH = "/v5/stock/f10/cn/indicator.json"
+ORG_HOLDING_CHANGE_PATH = "/v5/stock/f10/cn/org_holding/change.json"
+INDUSTRY_COMPARE_PATH = "/v5/stock/f10/cn/industry/compare.json"
+
+# 获取游客token的页面（响应会设置 xq_a_token cookie）
+GUEST_TOKEN_URL = "https://xueqiu.com/"
+
+# 雪球返回的token失效错误码
+TOKEN_INVALID_ERROR_CODES = {"400016"}
+
+# 需要重试的HTTP状态码
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "Xueqiu iPhone 14.15.1",
+    "Accept-Language": "zh-Hans-CN;q=1, ja-JP;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+class XueqiuClient:
+    """雪球数据客户端（单例模式）"""
+
+    _instance: Optional["XueqiuClient"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            # httpx.AsyncClient绑定事件循环，按循环分别创建
+            cls._instance._clients = weakref.WeakKeyDictionary()  # {loop: AsyncClient}
+            cls._instance._token: Optional[str] = None
+            # asyncio.Lock同样绑定事件循环，每个循环一把锁
+            cls._instance._token_locks = weakref.WeakKeyDictionary()  # {loop: Lock}
+            # 每个接口一个令牌桶，整个雪球上游共用一个熔断器
+            cls._instance._buckets: Dict[str, TokenBucket] = {}
+            cls._instance.breaker = CircuitBreaker(
+                name="xueqiu",
+                failure_threshold=settings.XUEQIU_CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=settings.XUEQIU_CIRCUIT_RECOVERY_SECONDS,
+            )
+        return cls._instance
+
+    def _get_bucket(self, path: str) -> TokenBucket:
+        """获取接口对应的令牌桶"""
+        bucket = self._buckets.get(path)
+        if bucket is None:
+            bucket = self._buckets.setdefault(
+                path,
+                TokenBucket(
+                    name=f"xueqiu:{path}",
+                    rate=settings.XUEQIU_RATE_LIMIT_PER_SECOND,
+                    capacity=settings.XUEQIU_RATE_LIMIT_BURST,
+                )
+            )
+        return bucket
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取当前事件循环的HTTP客户端（共享连接池）"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=settings.XUEQIU_BASE_URL,
+                headers=DEFAULT_HEADERS,
+                timeout=httpx.Timeout(settings.XUEQIU_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.XUEQIU_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.XUEQIU_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def _refresh_token(self, stale_token: Optional[str]) -> str:
+        """
+        刷新游客token
+
+        Args:
+            stale_token: 调用方持有的失效token（已被其他协程刷新则直接返回新token）
+
+        Returns:
+            新token
+        """
+        loop = asyncio.get_running_loop()
+        token_lock = self._token_locks.get(loop)
+        if token_lock is None:
+            token_lock = self._token_locks[loop] = asyncio.Lock()
+
+        async with token_lock:
+            if self._token and self._token != stale_token:
+                return self._token
+
+            response = await self._get_client().get(GUEST_TOKEN_URL, headers={"User-Agent": "Mozilla/5.0"})
+            token = response.cookies.get("xq_a_token")
+            if not token:
+                raise ExternalServiceError(
+                    "获取雪球游客token失败",
+                    details={"status_code": response.status_code}
+                )
+
+            self._token = token
+            logger.info("雪球游客token已刷新")
+            return token
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        发送GET请求（经过令牌桶和熔断器保护）
+
+        Args:
+            path: 接口路径
+            params: 查询参数
+
+        Returns:
+            解析后的JSON数据
+
+        Raises:
+            CircuitOpenError: 熔断器打开，请求未发出
+            ExternalServiceError: 本地限流或请求失败
+        """
+        # 熔断时直接失败，不占用令牌
+        if self.breaker.is_open:
+            self.breaker.before_call()
+
+        await self._get_bucket(path).acquire(settings.XUEQIU_RATE_LIMIT_MAX_WAIT)
+
+        self.breaker.before_call()
+        upstream_ok = False
+        try:
+            response = await self._request_with_retry(path, params)
+            upstream_ok = True
+        finally:
+            # 被取消的调用同样按失败处理，避免半开探测名额被永久占用
+            if upstream_ok:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+        if response.status_code != 200:
+            # 业务错误（如股票代码无效）说明上游本身可用，不计入熔断
+            raise ExternalServiceError(
+                f"雪球接口返回错误: HTTP {response.status_code}",
+                details={"path": path, "params": params, "error_code": self._error_code(response)}
+            )
+
+        return response.json()
+
+    async def _request_with_retry(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """
+        发送GET请求（带重试和token刷新）
+
+        Args:
+            path: 接口路径
+            params: 查询参数
+
+        Returns:
+            上游响应（成功或不可重试的业务错误）
+
+        Raises:
+            ExternalServiceError: 重试耗尽仍失败
+        """
+        if self._token is None:
+            self._token = settings.effective_xueqiu_token
+        token = self._token or await self._refresh_token(None)
+        token_refreshed = False
+        last_error: Optional[str] = None
+
+        for attempt in range(settings.XUEQIU_MAX_RETRIES + 1):
+            if attempt > 0:
+                # 指数退避 + 全抖动，避免大量请求同时重试
+                delay = random.uniform(0, settings.XUEQIU_RETRY_BACKOFF * (2 ** (attempt - 1)))
+                await asyncio.sleep(delay)
+
+            try:
+                response = await self._get_client().get(
+                    path,
+                    params=params,
+                    headers={"Cookie": f"xq_a_token={token};"}
+                )
+            except httpx.TransportError as e:
+                last_error = f"{type(e).__name__}: {e}"
+                logger.warning(f"雪球请求失败，准备重试: path={path}, attempt={attempt + 1}, error={last_error}")
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                last_error = f"HTTP {response.status_code}"
+                logger.warning(f"雪球请求失败，准备重试: path={path}, attempt={attempt + 1}, error={last_error}")
+                continue
+
+            if (
+                response.status_code != 200
+                and not token_refreshed
+                and self._error_code(response) in TOKEN_INVALID_ERROR_CODES
+            ):
+                token = await self._refresh_token(token)
+                token_refreshed = True
+                continue
+
+            return response
+
+        raise ExternalServiceError(
+            f"雪球接口请求失败: {last_error}",
+            details={"path": path, "params": params, "retries": settings.XUEQIU_MAX_RETRIES}
+        )
+
+    @staticmethod
+    def _error_code(response: httpx.Response) -> Optional[str]:
+        """从错误响应中提取雪球错误码"""
+        try:
+            return str(response.json().get("error_code"))
+        except Exception:
+            return None
+
+    async def cash_flow(self, symbol: str, is_annals: int = 0, count: int = 10) -> Dict[str, Any]:
+        """现金流量表"""
+        params = {"symbol": symbol, "count": count}
+        if is_annals == 1:
+            params["type"] = "Q4"
+        return await self._get(CASH_FLOW_PATH, params)
+
+    async def income(self, symbol: str, is_annals: int = 0, count: int = 10) -> Dict[str, Any]:
+        """利润表"""
+        params = {"symbol": symbol, "count": count}
+        if is_annals == 1:
+            params["type"] = "Q4"
+        return await self._get(INCOME_PATH, params)
+
+    async def business(self, symbol: str, is_annals: int = 0, count: int = 10) -> Dict[str, Any]:
+        """主营业务构成"""
+        params = {"symbol": symbol, "count": count}
+        if is_annals == 1:
+            params["type"] = "Q4"
+        return await self._get(BUSINESS_PATH, params)
+
+    async def top_holders(self, symbol: str, circula: int = 1) -> Dict[str, Any]:
+        """十大股东"""
+        return await self._get(TOP_HOLDERS_PATH, {"symbol": symbol, "circula": circula})
+
+    async def main_indicator(self, symbol: str) -> Dict[str, Any]:
+        """主要指标"""
+        return await self._get(MAIN_INDICATOR_PATH, {"symbol": symbol})
+
+    async def org_holding_change(self, symbol: str) -> Dict[str, Any]:
+        """机构持仓变化"""
+        return await self._get(ORG_HOLDING_CHANGE_PATH, {"symbol": symbol})
+
+    async def industry_compare(self, symbol: str) -> Dict[str, Any]:
+        """行业对比"""
+        return await self._get(INDUSTRY_COMPARE_PATH, {"type": "single", "symbol": symbol})
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环的HTTP客户端"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        client = self._clients.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+            logger.info("雪球HTTP客户端已关闭")
+
+
+# 创建全局客户端实例
+xueqiu_client = XueqiuClient()
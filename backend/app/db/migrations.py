@@ -0,0 +1,49 @@
+"""
+数据库迁移
+应用启动时把数据库升级到最新版本（alembic upgrade head）
+"""
+import logging
+import os
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+
+# 引入迁移之前由 Base.metadata.create_all 创建的表结构对应的版本
+BASELINE_REVISION = "0001"
+
+
+def _alembic_config(connection):
+    """构造复用指定连接的Alembic配置"""
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """
+    升级数据库到指定版本
+
+    没有版本记录但已有表的数据库（此前由create_all创建）先标记为基线版本再升级
+
+    Args:
+        engine: 数据库引擎
+        revision: 目标版本
+    """
+    from alembic import command
+
+    with engine.begin() as connection:
+        config = _alembic_config(connection)
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "users" in tables:
+            logger.info(f"检测到未纳入迁移管理的数据库，标记为基线版本 {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+
+        command.upgrade(config, revision)
@@ -10,22 +10,68 @@ from sqlalchemy.pool import StaticPool
 from app.config import settings
 
 
-# 创建数据库引擎
-if settings.DATABASE_URL.startswith("sqlite"):
-    # SQLite特殊配置
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=settings.DATABASE_ECHO
-    )
+def _is_memory_sqlite(url: str) -> bool:
+    """是否为SQLite内存数据库（内存库只存在于单个连接中，必须共享连接）"""
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def create_sqlite_engine(url: str, echo: bool = False):
+    """
+    创建SQLite引擎
+
+    文件数据库使用连接池（每个线程独立连接，读操作可并发），并启用WAL：
+    读不阻塞写、写不阻塞读；写入由SQLite的写锁串行化，busy_timeout内排队等待而不是立即报错
 
-    # SQLite启用外键约束
-    @event.listens_for(engine, "connect")
+    Args:
+        url: 数据库URL
+        echo: 是否打印SQL
+
+    Returns:
+        数据库引擎
+    """
+    if _is_memory_sqlite(url):
+        sqlite_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=echo
+        )
+    else:
+        sqlite_engine = create_engine(
+            url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                # sqlite3模块只在第一条写语句前开启事务，读语句始终读取最新提交；
+                # 写事务以 BEGIN IMMEDIATE 开始，直接获取写锁并在忙时等待，避免读事务升级为写事务时的锁冲突
+                "isolation_level": "IMMEDIATE",
+            },
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            echo=echo
+        )
+
+    @event.listens_for(sqlite_engine, "connect")
     def set_sqlite_pragma(dbapi_conn, connection_record):
         cursor = dbapi_conn.cursor()
+        # SQLite启用外键约束
         cursor.execute("PRAGMA foreign_keys=ON")
+        if not _is_memory_sqlite(url):
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+            # 负数表示以KiB为单位
+            cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+            cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
+
+    return sqlite_engine
+
+
+# 创建数据库引擎
+if settings.DATABASE_URL.startswith("sqlite"):
+    engine = create_sqlite_engine(settings.DATABASE_URL, echo=settings.DATABASE_ECHO)
 else:
     # PostgreSQL/MySQL配置
     engine = create_engine(
@@ -57,8 +103,10 @@ def get_db() -> Generator[Session, None, None]:
 
 
 def init_db() -> None:
-    """初始化数据库（创建所有表）"""
-    Base.metadata.create_all(bind=engine)
+    """初始化数据库（执行迁移到最新版本）"""
+    from app.db.migrations import upgrade_database
+
+    upgrade_database(engine)
 
 
 def drop_db() -> None:
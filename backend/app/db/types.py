@@ -0,0 +1,92 @@
+"""
+自定义列类型
+CompressedText / CompressedJSON：超过阈值的值zlib压缩后存储，读取时透明解压
+
+存储格式（二进制列）：
+- 压缩值: COMPRESSED_MAGIC + zlib数据
+- 未压缩值: UTF-8原文（不加前缀，迁移前写入的文本可直接读取）
+
+读取时兼容迁移前的文本值（SQLite中仍为TEXT存储类型，按字符串返回）
+"""
+import json
+import zlib
+from typing import Any, Optional, Union
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.config import settings
+
+# UTF-8文本不会以NUL开头，可以安全区分压缩值和原文
+COMPRESSED_MAGIC = b"\x00ZL1"
+
+
+def compress_text(value: Optional[str], min_size: Optional[int] = None) -> Optional[bytes]:
+    """
+    编码文本（达到阈值且压缩后更小时压缩）
+
+    Args:
+        value: 文本
+        min_size: 压缩阈值（字节），为None时读取配置
+
+    Returns:
+        存储值
+    """
+    if value is None:
+        return None
+    raw = value.encode("utf-8")
+    if len(raw) < (settings.DB_COMPRESSION_MIN_SIZE_BYTES if min_size is None else min_size):
+        return raw
+    compressed = COMPRESSED_MAGIC + zlib.compress(raw, settings.DB_COMPRESSION_LEVEL)
+    return compressed if len(compressed) < len(raw) else raw
+
+
+def decompress_text(value: Union[bytes, memoryview, str, None]) -> Optional[str]:
+    """
+    解码存储值
+
+    Args:
+        value: 存储值（迁移前的文本值为str）
+
+    Returns:
+        文本
+    """
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value.startswith(COMPRESSED_MAGIC):
+        return zlib.decompress(value[len(COMPRESSED_MAGIC):]).decode("utf-8")
+    return value.decode("utf-8")
+
+
+def is_compressed(value: Union[bytes, memoryview, str, None]) -> bool:
+    """存储值是否已压缩"""
+    return isinstance(value, (bytes, memoryview)) and bytes(value[:len(COMPRESSED_MAGIC)]) == COMPRESSED_MAGIC
+
+
+class CompressedText(TypeDecorator):
+    """透明压缩的文本列"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        return decompress_text(value)
+
+
+class CompressedJSON(TypeDecorator):
+    """透明压缩的JSON列"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return compress_text(json.dumps(value, ensure_ascii=False))
+
+    def process_result_value(self, value, dialect) -> Any:
+        text = decompress_text(value)
+        return None if text is None else json.loads(text)
@@ -2,16 +2,19 @@
 Stock Agent Pro - 主应用入口
 生产级别的股票分析智能体系统
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.core.logging import setup_logging
-from app.core.middleware import LoggingMiddleware, ExceptionHandlerMiddleware
+from app.core.middleware import LoggingMiddleware, ExceptionHandlerMiddleware, RateLimitMiddleware
 from app.db.session import init_db
 from app.api.v1.router import api_router
+from app.core.warmup import run_warmup, warmup_state
 
 # 初始化日志
 setup_logging()
@@ -48,10 +51,26 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"工具注册失败: {str(e)}")
 
+    # 后台预热，完成前 /health/ready 返回503
+    warmup_task = asyncio.create_task(run_warmup())
+
+    # 后台预热关注列表的股票数据快照（不影响就绪状态）
+    from app.services.stock_data_service import warm_up_watchlist, stock_refresh_scheduler
+    watchlist_task = asyncio.create_task(warm_up_watchlist())
+
+    # 后台周期性刷新关注列表和热门股票
+    stock_refresh_scheduler.start()
+
     logger.info(f"=== {settings.APP_NAME} 启动完成 ===")
 
     yield
 
+    for task in (warmup_task, watchlist_task):
+        if not task.done():
+            task.cancel()
+
+    await stock_refresh_scheduler.stop()
+
     # 关闭时执行
     logger.info(f"=== {settings.APP_NAME} 关闭中 ===")
 
@@ -64,6 +83,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"清理智能体失败: {str(e)}")
 
+    # 关闭雪球HTTP客户端连接池
+    try:
+        from app.core.xueqiu_client import xueqiu_client
+        await xueqiu_client.aclose()
+    except Exception as e:
+        logger.error(f"关闭雪球客户端失败: {str(e)}")
+
+    # 关闭LLM连接池
+    try:
+        from app.core.llm_client import close_llm_client
+        close_llm_client()
+    except Exception as e:
+        logger.error(f"关闭LLM客户端失败: {str(e)}")
+
     logger.info(f"=== {settings.APP_NAME} 已关闭 ===")
 
 
@@ -77,6 +110,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 添加限流中间件（位于CORS内层，429响应同样带CORS头）
+app.add_middleware(RateLimitMiddleware)
+
 # 添加CORS中间件
 app.add_middleware(
     CORSMiddleware,
@@ -119,17 +155,38 @@ def root():
 
 @app.get("/health")
 def health_check():
-    """健康检查"""
+    """健康检查（存活状态 + 就绪状态）"""
     from app.agents.manager import agent_manager
+    from app.core.admission import llm_admission
 
     return {
         "status": "healthy",
+        "ready": warmup_state.ready,
         "version": settings.APP_VERSION,
         "database": "connected",
-        "active_agents": agent_manager.get_total_agent_count()
+        "active_agents": agent_manager.get_total_agent_count(),
+        "llm_streams": llm_admission.stats(),
+        "warmup": warmup_state.to_dict()
     }
 
 
+@app.get("/health/live")
+def liveness_check():
+    """存活检查（进程可响应即返回200）"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+def readiness_check():
+    """就绪检查（预热完成前返回503）"""
+    if not warmup_state.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up", "warmup": warmup_state.to_dict()}
+        )
+    return {"status": "ready", "warmup": warmup_state.to_dict()}
+
+
 if __name__ == "__main__":
     import uvicorn
 
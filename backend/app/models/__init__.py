@@ -4,5 +4,7 @@
 from app.models.user import User
 from app.models.conversation import Conversation
 from app.models.message import Message
+from app.models.message_search import MessageSearch
+from app.models.report_job import ReportJob
 
-__all__ = ["User", "Conversation", "Message"]
+__all__ = ["User", "Conversation", "Message", "MessageSearch", "ReportJob"]
@@ -1,7 +1,7 @@
 """
 对话数据模型
 """
-from sqlalchemy import Column, String, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -19,11 +19,17 @@ class Conversation(Base, BaseModel):
     summary = Column(Text, nullable=True)
 
     # 用户关联
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # 统计信息
     message_count = Column(Integer, default=0, nullable=False)
 
+    # 归档信息（冷对话的消息移入归档段文件，对话行保留为墓碑，打开时自动恢复）
+    archived_at = Column(DateTime, nullable=True)
+    archive_segment = Column(String(50), nullable=True)
+    archive_offset = Column(BigInteger, nullable=True)
+    archive_length = Column(Integer, nullable=True)
+
     # 关系
     user = relationship("User", back_populates="conversations")
     messages = relationship(
@@ -35,3 +41,7 @@ class Conversation(Base, BaseModel):
 
     def __repr__(self):
         return f"<Conversation(id={self.id}, conversation_id={self.conversation_id}, user_id={self.user_id})>"
+
+
+# 用户对话列表（按更新时间倒序）和按用户计数
+Index("ix_conversations_user_id_updated_at", Conversation.user_id, Conversation.updated_at.desc())
@@ -1,10 +1,11 @@
 """
 消息数据模型
 """
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, JSON
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
+from app.db.types import CompressedText, CompressedJSON
 from app.models.base import BaseModel
 
 
@@ -12,25 +13,28 @@ class Message(Base, BaseModel):
     """消息模型"""
 
     __tablename__ = "messages"
+    __table_args__ = (
+        # 按对话读取历史（created_at, id 键集分页）
+        Index("ix_messages_conversation_id_created_at_id", "conversation_id", "created_at", "id"),
+    )
 
     # 对话关联
     conversation_id = Column(
         Integer,
         ForeignKey("conversations.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
 
-    # 消息内容
+    # 消息内容（较长的内容压缩存储，读写透明）
     role = Column(String(20), nullable=False)  # user, assistant, system, function
-    content = Column(Text, nullable=True)
+    content = Column(CompressedText, nullable=True)
 
     # 功能调用相关（可选）
-    function_call = Column(JSON, nullable=True)
-    tool_calls = Column(JSON, nullable=True)
+    function_call = Column(CompressedJSON, nullable=True)
+    tool_calls = Column(CompressedJSON, nullable=True)
 
     # 元数据（注意：不能使用 metadata 作为属性名，因为它是 SQLAlchemy 的保留字）
-    message_metadata = Column("metadata", JSON, nullable=True)
+    message_metadata = Column("metadata", CompressedJSON, nullable=True)
 
     # 关系
     conversation = relationship("Conversation", back_populates="messages")
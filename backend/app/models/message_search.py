@@ -0,0 +1,33 @@
+"""
+消息全文索引数据模型
+message_search 保存预分词后的消息文本（app.core.search_tokenizer），作为SQLite FTS5虚拟表的外部内容表；
+FTS5表和同步触发器由迁移创建，不在模型元数据中
+
+索引行与消息行独立：对话归档时消息从热表删除，索引行保留，归档对话仍可被搜索到
+"""
+from sqlalchemy import Column, ForeignKey, Integer, Text
+
+from app.db.session import Base
+
+# FTS5虚拟表名（及其影子表的前缀）
+MESSAGE_SEARCH_FTS_TABLE = "message_search_fts"
+
+
+class MessageSearch(Base):
+    """消息全文索引行"""
+
+    __tablename__ = "message_search"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    conversation_id = Column(
+        Integer,
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    # 作为FTS5的一列建立索引，搜索时按用户过滤不需要回表
+    user_id = Column(Integer, nullable=False)
+    tokens = Column(Text, nullable=False)
+
+    def __repr__(self):
+        return f"<MessageSearch(id={self.id}, conversation_id={self.conversation_id})>"
@@ -0,0 +1,46 @@
+"""
+报告任务数据模型
+"""
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Index
+
+from app.db.session import Base
+from app.models.base import BaseModel
+
+
+# 任务状态
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+JOB_STATUS_CANCELLED = "cancelled"
+
+JOB_FINAL_STATUSES = (JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED, JOB_STATUS_CANCELLED)
+
+
+class ReportJob(Base, BaseModel):
+    """报告任务模型（由独立的worker进程领取执行）"""
+
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        # worker按创建顺序领取待执行任务
+        Index("ix_report_jobs_status_created_at", "status", "created_at"),
+    )
+
+    # 基本信息
+    job_id = Column(String(50), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    agent_type = Column(String(50), nullable=False, default="stock_analysis")
+    message = Column(Text, nullable=False)
+
+    # 执行状态
+    status = Column(String(20), nullable=False, default=JOB_STATUS_PENDING)
+    result = Column(Text, nullable=True)  # 执行中为已生成的部分内容
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(100), nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ReportJob(id={self.id}, job_id={self.job_id}, status={self.status})>"
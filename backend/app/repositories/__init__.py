@@ -4,5 +4,7 @@ Repository包
 from app.repositories.user_repository import UserRepository
 from app.repositories.conversation_repository import ConversationRepository
 from app.repositories.message_repository import MessageRepository
+from app.repositories.message_search_repository import MessageSearchRepository
+from app.repositories.report_job_repository import ReportJobRepository
 
-__all__ = ["UserRepository", "ConversationRepository", "MessageRepository"]
+__all__ = ["UserRepository", "ConversationRepository", "MessageRepository", "MessageSearchRepository", "ReportJobRepository"]
@@ -1,14 +1,23 @@
 """
 对话Repository
 """
+from datetime import datetime
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, update
+from sqlalchemy.dialects import postgresql, sqlite
 
 from app.models.conversation import Conversation
 from app.repositories.base import BaseRepository
 
 
+# 支持 INSERT ... ON CONFLICT ... RETURNING 的数据库
+UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
 class ConversationRepository(BaseRepository[Conversation]):
     """对话Repository"""
 
@@ -57,6 +66,20 @@ class ConversationRepository(BaseRepository[Conversation]):
             .all()
         )
 
+    def get_by_ids(self, ids: List[int]) -> List[Conversation]:
+        """
+        根据数据库ID批量获取对话（不保证顺序）
+
+        Args:
+            ids: 对话数据库ID列表
+
+        Returns:
+            对话列表
+        """
+        if not ids:
+            return []
+        return self.db.query(Conversation).filter(Conversation.id.in_(ids)).all()
+
     def count_by_user_id(self, user_id: int) -> int:
         """
         统计用户的对话数量
@@ -101,6 +124,41 @@ class ConversationRepository(BaseRepository[Conversation]):
             conversation.message_count += 1
             self.db.commit()
 
+    def supports_upsert(self) -> bool:
+        """当前数据库是否支持 upsert_for_message"""
+        return self.db.get_bind().dialect.name in UPSERT_INSERTS
+
+    def upsert_for_message(self, user_id: int, conversation_id: str, title: Optional[str] = None):
+        """
+        为新消息创建或更新对话（单条 INSERT ... ON CONFLICT DO UPDATE ... RETURNING，不提交）
+
+        对话不存在时创建（消息计数为1），已存在时消息计数加1并刷新更新时间；
+        并发写入同一新对话的第一条消息时不会冲突
+
+        Args:
+            user_id: 用户ID
+            conversation_id: 会话ID
+            title: 新建对话时的标题（已存在的对话不修改标题）
+
+        Returns:
+            (id, archived_at) 行；对话属于其他用户时返回None
+        """
+        now = datetime.utcnow()
+        statement = UPSERT_INSERTS[self.db.get_bind().dialect.name](Conversation.__table__).values(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            title=title,
+            message_count=1,
+            created_at=now,
+            updated_at=now
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[Conversation.conversation_id],
+            set_={"message_count": Conversation.message_count + 1, "updated_at": now},
+            where=Conversation.user_id == statement.excluded.user_id
+        ).returning(Conversation.id, Conversation.archived_at)
+        return self.db.execute(statement).first()
+
     def update_title_and_summary(
         self,
         conversation_id: int,
@@ -127,3 +185,84 @@ class ConversationRepository(BaseRepository[Conversation]):
             self.db.commit()
             self.db.refresh(conversation)
         return conversation
+
+    def get_idle(self, idle_before: datetime, limit: int) -> List[Conversation]:
+        """
+        获取空闲（最后更新早于指定时间）且未归档的对话，最久未更新的在前
+
+        Args:
+            idle_before: 空闲截止时间
+            limit: 返回的最大记录数
+
+        Returns:
+            对话列表
+        """
+        return (
+            self.db.query(Conversation)
+            .filter(Conversation.archived_at.is_(None), Conversation.updated_at < idle_before)
+            .order_by(Conversation.updated_at)
+            .limit(limit)
+            .all()
+        )
+
+    def mark_archived(
+        self,
+        conversation_id: int,
+        updated_at: datetime,
+        segment: str,
+        offset: int,
+        length: int
+    ) -> bool:
+        """
+        标记对话已归档（不提交，由调用方在同一事务中删除消息后提交）
+
+        仅当对话未归档且读取后没有新的更新时生效，避免归档期间写入的消息丢失
+
+        Args:
+            conversation_id: 对话数据库ID
+            updated_at: 读取归档数据时对话的更新时间
+            segment: 归档段名
+            offset: 段内偏移
+            length: 数据长度
+
+        Returns:
+            是否标记成功
+        """
+        result = self.db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.archived_at.is_(None),
+                Conversation.updated_at == updated_at
+            )
+            .values(
+                archived_at=datetime.utcnow(),
+                archive_segment=segment,
+                archive_offset=offset,
+                archive_length=length,
+                # 归档不算更新，保持对话列表顺序
+                updated_at=Conversation.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def mark_restored(self, conversation_id: int) -> bool:
+        """
+        清除对话的归档标记并刷新更新时间（不提交，由调用方在同一事务中写回消息后提交）
+
+        并发恢复同一对话时只有一个请求会成功
+
+        Args:
+            conversation_id: 对话数据库ID
+
+        Returns:
+            是否标记成功
+        """
+        result = self.db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id, Conversation.archived_at.is_not(None))
+            .values(archived_at=None, archive_segment=None, archive_offset=None, archive_length=None)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
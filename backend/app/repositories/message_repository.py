@@ -1,13 +1,23 @@
 """
 消息Repository
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import asc
+from sqlalchemy import asc, insert, select, tuple_
 
 from app.models.message import Message
 from app.repositories.base import BaseRepository
 
+# 可按需投影的消息字段（id和created_at始终返回，用作游标）
+MESSAGE_FIELDS = {
+    "role": Message.role,
+    "content": Message.content,
+    "function_call": Message.function_call,
+    "tool_calls": Message.tool_calls,
+    "metadata": Message.message_metadata,
+}
+
 
 class MessageRepository(BaseRepository[Message]):
     """消息Repository"""
@@ -44,6 +54,45 @@ class MessageRepository(BaseRepository[Message]):
 
         return query.all()
 
+    def get_page_by_conversation_id(
+        self,
+        conversation_id: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Iterable[str]] = None
+    ) -> list:
+        """
+        按 (created_at, id) 键集分页获取对话的消息，只读取需要的列
+
+        Args:
+            conversation_id: 对话数据库ID
+            after: 上一页最后一条消息的 (created_at, id)，None表示从头开始
+            limit: 返回的最大记录数
+            skip: 跳过的记录数（兼容旧的OFFSET分页，新代码应使用after）
+            fields: 需要返回的字段（MESSAGE_FIELDS的键），None表示全部；
+                未请求的列（例如content）不会被读取和解压
+
+        Returns:
+            行列表（可按字段名访问）
+        """
+        columns = [Message.id, Message.created_at]
+        for name in (fields if fields is not None else MESSAGE_FIELDS):
+            columns.append(MESSAGE_FIELDS[name].label(name))
+
+        query = self.db.query(*columns).filter(Message.conversation_id == conversation_id)
+        if after is not None:
+            # 行值比较，可直接在 (conversation_id, created_at, id) 索引上定位起点
+            query = query.filter(tuple_(Message.created_at, Message.id) > tuple_(*after))
+        query = query.order_by(asc(Message.created_at), asc(Message.id))
+
+        if skip:
+            query = query.offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return query.all()
+
     def count_by_conversation_id(self, conversation_id: int) -> int:
         """
         统计对话的消息数量
@@ -60,12 +109,13 @@ class MessageRepository(BaseRepository[Message]):
             .count()
         )
 
-    def delete_by_conversation_id(self, conversation_id: int) -> int:
+    def delete_by_conversation_id(self, conversation_id: int, commit: bool = True) -> int:
         """
         删除对话的所有消息
 
         Args:
             conversation_id: 对话数据库ID
+            commit: 是否立即提交（为False时由调用方提交）
 
         Returns:
             删除的消息数量
@@ -73,11 +123,42 @@ class MessageRepository(BaseRepository[Message]):
         count = (
             self.db.query(Message)
             .filter(Message.conversation_id == conversation_id)
-            .delete()
+            .delete(synchronize_session=False)
         )
-        self.db.commit()
+        if commit:
+            self.db.commit()
         return count
 
+    def export_by_conversation_id(self, conversation_id: int) -> List[Dict[str, Any]]:
+        """
+        导出对话的所有消息（按时间顺序，不构造ORM对象）
+
+        Args:
+            conversation_id: 对话数据库ID
+
+        Returns:
+            消息列（不含主键和对话ID）的字典列表
+        """
+        table = Message.__table__
+        columns = [column for column in table.c if column.name not in ("id", "conversation_id")]
+        rows = self.db.execute(
+            select(*columns)
+            .where(table.c.conversation_id == conversation_id)
+            .order_by(table.c.created_at, table.c.id)
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+    def bulk_insert(self, conversation_id: int, rows: List[Dict[str, Any]]) -> None:
+        """
+        批量写入消息（一次executemany，不提交）
+
+        Args:
+            conversation_id: 对话数据库ID
+            rows: export_by_conversation_id 导出的消息字典
+        """
+        if rows:
+            self.db.execute(insert(Message.__table__), [{**row, "conversation_id": conversation_id} for row in rows])
+
     def get_recent_messages(
         self,
         conversation_id: int,
@@ -0,0 +1,83 @@
+"""
+消息全文索引Repository
+"""
+from typing import Iterable, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, text
+
+from app.core.search_tokenizer import tokenize
+from app.models.message_search import MessageSearch, MESSAGE_SEARCH_FTS_TABLE
+from app.repositories.base import BaseRepository
+
+# 建立全文索引的消息角色（工具输出和系统提示不参与搜索）
+SEARCHABLE_ROLES = ("user", "assistant")
+
+
+class MessageSearchRepository(BaseRepository[MessageSearch]):
+    """消息全文索引Repository"""
+
+    def __init__(self, db: Session):
+        super().__init__(MessageSearch, db)
+
+    def add(self, conversation_id: int, user_id: int, contents: Iterable[Optional[str]]) -> None:
+        """
+        为消息内容建立索引（FTS5表由触发器同步，不提交）
+
+        Args:
+            conversation_id: 对话数据库ID
+            user_id: 对话所属用户ID
+            contents: 消息内容
+        """
+        rows = [
+            {"conversation_id": conversation_id, "user_id": user_id, "tokens": tokens}
+            for tokens in map(tokenize, contents)
+            if tokens
+        ]
+        if rows:
+            self.db.execute(insert(MessageSearch.__table__), rows)
+
+    def delete_by_conversation_id(self, conversation_id: int) -> int:
+        """
+        删除对话的索引（不提交）
+
+        Args:
+            conversation_id: 对话数据库ID
+
+        Returns:
+            删除的索引行数
+        """
+        return (
+            self.db.query(MessageSearch)
+            .filter(MessageSearch.conversation_id == conversation_id)
+            .delete(synchronize_session=False)
+        )
+
+    def search(self, user_id: int, match: str, limit: int, skip: int = 0) -> list:
+        """
+        全文搜索用户的对话（仅SQLite），按最相关消息的BM25得分排序
+
+        用户过滤是MATCH表达式的一部分，只读取该用户的倒排列表，不扫描消息表
+
+        Args:
+            user_id: 用户ID
+            match: search_tokenizer.build_match_query 生成的MATCH表达式
+            limit: 返回的最大记录数
+            skip: 跳过的记录数
+
+        Returns:
+            行列表：conversation_id（对话数据库ID）、hits（命中消息数）、score（越小越相关）
+        """
+        return self.db.execute(
+            text(
+                # bm25()不能直接用在聚合函数中，先在物化的CTE中计算每条命中消息的得分
+                f"WITH matched AS MATERIALIZED ("
+                f"SELECT rowid AS id, bm25({MESSAGE_SEARCH_FTS_TABLE}, 0.0, 1.0) AS score "
+                f"FROM {MESSAGE_SEARCH_FTS_TABLE} WHERE {MESSAGE_SEARCH_FTS_TABLE} MATCH :match) "
+                f"SELECT s.conversation_id AS conversation_id, COUNT(*) AS hits, MIN(matched.score) AS score "
+                f"FROM matched JOIN message_search AS s ON s.id = matched.id "
+                f"GROUP BY s.conversation_id "
+                f"ORDER BY score, s.conversation_id DESC "
+                f"LIMIT :limit OFFSET :skip"
+            ),
+            {"match": f'user_id : "{int(user_id)}" AND ({match})', "limit": limit, "skip": skip}
+        ).all()
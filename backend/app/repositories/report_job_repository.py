@@ -0,0 +1,260 @@
+"""
+报告任务Repository
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import asc, desc
+
+from app.models.report_job import (
+    ReportJob,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_CANCELLED,
+)
+from app.repositories.base import BaseRepository
+
+# 领取任务时与其他worker竞争失败后的重试次数
+CLAIM_RETRIES = 5
+
+
+class ReportJobRepository(BaseRepository[ReportJob]):
+    """报告任务Repository"""
+
+    def __init__(self, db: Session):
+        super().__init__(ReportJob, db)
+
+    def get_by_job_id(self, job_id: str) -> Optional[ReportJob]:
+        """
+        根据任务ID获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            任务对象或None
+        """
+        return self.db.query(ReportJob).filter(ReportJob.job_id == job_id).first()
+
+    def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 100) -> List[ReportJob]:
+        """
+        获取用户的任务列表（最新的在前）
+
+        Args:
+            user_id: 用户ID
+            skip: 跳过的记录数
+            limit: 返回的最大记录数
+
+        Returns:
+            任务列表
+        """
+        return (
+            self.db.query(ReportJob)
+            .filter(ReportJob.user_id == user_id)
+            .order_by(desc(ReportJob.created_at), desc(ReportJob.id))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def count_pending_by_user_id(self, user_id: int) -> int:
+        """
+        统计用户未完成（待执行或执行中）的任务数量
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            任务数量
+        """
+        return (
+            self.db.query(ReportJob)
+            .filter(
+                ReportJob.user_id == user_id,
+                ReportJob.status.in_((JOB_STATUS_PENDING, JOB_STATUS_RUNNING))
+            )
+            .count()
+        )
+
+    def count_ahead(self, job: ReportJob) -> int:
+        """
+        统计排在该任务之前的待执行任务数量
+
+        Args:
+            job: 任务对象
+
+        Returns:
+            任务数量
+        """
+        return (
+            self.db.query(ReportJob)
+            .filter(ReportJob.status == JOB_STATUS_PENDING, ReportJob.id < job.id)
+            .count()
+        )
+
+    def claim_next(self, worker_id: str) -> Optional[ReportJob]:
+        """
+        领取最早的待执行任务
+
+        通过带状态条件的UPDATE抢占，多个worker进程同时领取时只有一个成功
+
+        Args:
+            worker_id: worker标识
+
+        Returns:
+            领取到的任务，没有待执行任务返回None
+        """
+        for _ in range(CLAIM_RETRIES):
+            candidate = (
+                self.db.query(ReportJob.id)
+                .filter(ReportJob.status == JOB_STATUS_PENDING)
+                .order_by(asc(ReportJob.created_at), asc(ReportJob.id))
+                .first()
+            )
+            if candidate is None:
+                return None
+
+            now = datetime.utcnow()
+            claimed = (
+                self.db.query(ReportJob)
+                .filter(ReportJob.id == candidate.id, ReportJob.status == JOB_STATUS_PENDING)
+                .update(
+                    {
+                        ReportJob.status: JOB_STATUS_RUNNING,
+                        ReportJob.worker_id: worker_id,
+                        ReportJob.attempts: ReportJob.attempts + 1,
+                        ReportJob.result: None,
+                        ReportJob.error: None,
+                        ReportJob.started_at: now,
+                        ReportJob.heartbeat_at: now,
+                        ReportJob.updated_at: now,
+                    },
+                    synchronize_session=False
+                )
+            )
+            self.db.commit()
+            if claimed == 1:
+                return self.get(candidate.id)
+        return None
+
+    def update_progress(self, id: int, result: str) -> bool:
+        """
+        写入已生成的部分内容并刷新心跳
+
+        Args:
+            id: 任务数据库ID
+            result: 已生成的内容
+
+        Returns:
+            任务是否仍在执行（已被取消或被回收时返回False）
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.db.query(ReportJob)
+            .filter(ReportJob.id == id, ReportJob.status == JOB_STATUS_RUNNING)
+            .update(
+                {ReportJob.result: result, ReportJob.heartbeat_at: now, ReportJob.updated_at: now},
+                synchronize_session=False
+            )
+        )
+        self.db.commit()
+        return updated == 1
+
+    def finish(self, id: int, status: str, result: Optional[str] = None, error: Optional[str] = None) -> bool:
+        """
+        结束执行中的任务
+
+        Args:
+            id: 任务数据库ID
+            status: 最终状态
+            result: 结果
+            error: 错误信息
+
+        Returns:
+            是否更新成功（任务已被取消时返回False）
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.db.query(ReportJob)
+            .filter(ReportJob.id == id, ReportJob.status == JOB_STATUS_RUNNING)
+            .update(
+                {
+                    ReportJob.status: status,
+                    ReportJob.result: result,
+                    ReportJob.error: error,
+                    ReportJob.finished_at: now,
+                    ReportJob.updated_at: now,
+                },
+                synchronize_session=False
+            )
+        )
+        self.db.commit()
+        return updated == 1
+
+    def cancel(self, id: int) -> bool:
+        """
+        取消待执行或执行中的任务（执行中的任务由worker在下次写入进度时停止）
+
+        Args:
+            id: 任务数据库ID
+
+        Returns:
+            是否取消成功
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.db.query(ReportJob)
+            .filter(
+                ReportJob.id == id,
+                ReportJob.status.in_((JOB_STATUS_PENDING, JOB_STATUS_RUNNING))
+            )
+            .update(
+                {ReportJob.status: JOB_STATUS_CANCELLED, ReportJob.finished_at: now, ReportJob.updated_at: now},
+                synchronize_session=False
+            )
+        )
+        self.db.commit()
+        return updated == 1
+
+    def requeue_stale(self, stale_before: datetime, max_attempts: int) -> int:
+        """
+        回收心跳超时的执行中任务（worker进程崩溃或被杀死）
+
+        未超过最大尝试次数的任务重新排队，其余标记为失败
+
+        Args:
+            stale_before: 心跳早于该时间视为超时
+            max_attempts: 最大尝试次数
+
+        Returns:
+            回收的任务数量
+        """
+        now = datetime.utcnow()
+        stale = (
+            ReportJob.status == JOB_STATUS_RUNNING,
+            ReportJob.heartbeat_at < stale_before,
+        )
+        requeued = (
+            self.db.query(ReportJob)
+            .filter(*stale, ReportJob.attempts < max_attempts)
+            .update(
+                {ReportJob.status: JOB_STATUS_PENDING, ReportJob.worker_id: None, ReportJob.updated_at: now},
+                synchronize_session=False
+            )
+        )
+        failed = (
+            self.db.query(ReportJob)
+            .filter(*stale)
+            .update(
+                {
+                    ReportJob.status: JOB_STATUS_FAILED,
+                    ReportJob.error: "worker执行超时",
+                    ReportJob.finished_at: now,
+                    ReportJob.updated_at: now,
+                },
+                synchronize_session=False
+            )
+        )
+        self.db.commit()
+        return requeued + failed
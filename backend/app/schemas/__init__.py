@@ -23,6 +23,7 @@ from app.schemas.conversation import (
     ConversationUpdate,
     ConversationResponse,
     ConversationDetail,
+    ConversationSearchResult,
     ConversationSummary
 )
 from app.schemas.chat import (
@@ -30,6 +31,15 @@ from app.schemas.chat import (
     ChatChunkResponse,
     ChatResponse
 )
+from app.schemas.batch import (
+    BatchAnalysisRequest,
+    BatchEvent
+)
+from app.schemas.report_job import (
+    ReportJobCreate,
+    ReportJobResponse,
+    ReportJobDetail
+)
 
 __all__ = [
     # Auth
@@ -52,9 +62,17 @@ __all__ = [
     "ConversationUpdate",
     "ConversationResponse",
     "ConversationDetail",
+    "ConversationSearchResult",
     "ConversationSummary",
     # Chat
     "ChatRequest",
     "ChatChunkResponse",
     "ChatResponse",
+    # Batch
+    "BatchAnalysisRequest",
+    "BatchEvent",
+    # Report Job
+    "ReportJobCreate",
+    "ReportJobResponse",
+    "ReportJobDetail",
 ]
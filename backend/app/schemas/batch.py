@@ -0,0 +1,34 @@
+"""
+批量分析相关Schemas
+"""
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
+
+
+class BatchAnalysisRequest(BaseModel):
+    """批量分析请求Schema"""
+    symbols: List[str] = Field(..., min_length=1, description="股票代码列表，例如 [\"SH600519\", \"SZ000001\"]")
+    question: Optional[str] = Field(
+        None,
+        description="分析问题模板，{symbol} 会替换为股票代码，不提供则使用默认模板"
+    )
+    batch_id: Optional[str] = Field(None, description="续跑已有批次时提供，已完成的股票不会重复分析")
+
+    @field_validator("symbols")
+    @classmethod
+    def normalize_symbols(cls, v: List[str]) -> List[str]:
+        """去除空白、统一大写并去重（保持顺序）"""
+        return list(dict.fromkeys(symbol.strip().upper() for symbol in v if symbol.strip()))
+
+
+class BatchEvent(BaseModel):
+    """批量分析事件Schema（NDJSON每行一个）"""
+    type: Literal["batch", "progress", "result", "error", "done"] = Field(..., description="事件类型")
+    batch_id: str = Field(..., description="批次ID")
+    symbol: Optional[str] = Field(None, description="股票代码（result/error类型）")
+    content: Optional[str] = Field(None, description="分析结果（result类型）")
+    error: Optional[str] = Field(None, description="错误信息（error类型）")
+    phase: Optional[Literal["prefetch", "analysis"]] = Field(None, description="阶段（progress类型）")
+    completed: Optional[int] = Field(None, description="已完成数量")
+    total: Optional[int] = Field(None, description="总数量")
+    details: Optional[Dict[str, Any]] = Field(None, description="附加信息")
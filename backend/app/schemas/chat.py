@@ -14,10 +14,11 @@ class ChatRequest(BaseModel):
 
 class ChatChunkResponse(BaseModel):
     """聊天响应片段Schema（流式输出）"""
-    type: Literal["chunk", "done", "error"] = Field(..., description="响应类型")
+    type: Literal["queued", "chunk", "done", "error"] = Field(..., description="响应类型")
     content: Optional[str] = Field(None, description="内容片段")
     conversation_id: Optional[str] = Field(None, description="会话ID")
     error: Optional[str] = Field(None, description="错误信息")
+    position: Optional[int] = Field(None, description="排队位置（仅queued类型）")
 
 
 class ChatResponse(BaseModel):
@@ -25,9 +25,10 @@ class MessageResponse(BaseModel):
     """消息响应Schema"""
     id: int
     role: str
-    content: Optional[str]
-    function_call: Optional[dict]
-    tool_calls: Optional[list]
+    content: Optional[str] = None
+    content_length: Optional[int] = Field(None, description="内容原始长度（仅在截断内容时返回）")
+    function_call: Optional[dict] = None
+    tool_calls: Optional[list] = None
     message_metadata: Optional[dict] = Field(None, serialization_alias="metadata")
     created_at: datetime
 
@@ -57,14 +58,22 @@ class ConversationResponse(BaseModel):
     message_count: int
     created_at: datetime
     updated_at: datetime
+    archived_at: Optional[datetime] = Field(None, description="归档时间（已归档的对话打开时自动恢复）")
 
     class Config:
         from_attributes = True
 
 
+class ConversationSearchResult(ConversationResponse):
+    """对话搜索结果Schema"""
+    hits: int = Field(0, description="命中的消息数")
+    score: float = Field(0.0, description="相关度（越大越相关）")
+
+
 class ConversationDetail(ConversationResponse):
     """对话详情Schema（包含消息）"""
     messages: List[MessageResponse] = []
+    next_cursor: Optional[str] = Field(None, description="还有更多消息时，用于获取下一页消息的游标")
 
 
 class ConversationSummary(BaseModel):
@@ -0,0 +1,33 @@
+"""
+报告任务相关Schemas
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class ReportJobCreate(BaseModel):
+    """报告任务创建Schema"""
+    message: str = Field(..., min_length=1, description="报告请求，例如：生成贵州茅台详细的股票分析报告")
+    agent_type: str = Field(default="stock_analysis", description="智能体类型")
+
+
+class ReportJobResponse(BaseModel):
+    """报告任务响应Schema"""
+    job_id: str
+    agent_type: str
+    message: str
+    status: str = Field(..., description="状态: pending/running/succeeded/failed/cancelled")
+    error: Optional[str]
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class ReportJobDetail(ReportJobResponse):
+    """报告任务详情Schema（包含结果，执行中为已生成的部分内容）"""
+    result: Optional[str]
@@ -5,10 +5,14 @@ from app.services.user_service import UserService
 from app.services.auth_service import AuthService
 from app.services.conversation_service import ConversationService
 from app.services.chat_service import ChatService
+from app.services.report_job_service import ReportJobService
+from app.services.archive_service import ArchiveService
 
 __all__ = [
     "UserService",
     "AuthService",
     "ConversationService",
     "ChatService",
+    "ReportJobService",
+    "ArchiveService",
 ]
@@ -0,0 +1,208 @@
+"""
+冷对话归档服务
+长期未更新的对话：消息（以及files/下的会话日志）写入按用户分段的归档文件后从热表删除，对话行保留为墓碑；
+用户再次打开对话时自动从归档恢复
+
+归档由独立进程定期执行（python -m app.workers.conversation_archiver），恢复在API进程中按需进行
+"""
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.conversation_archive import archive_store
+from app.core.conversation_catalog import get_conversation_catalog
+from app.core.conversation_journal import (
+    JOURNAL_FILE,
+    JSON_VIEW_FILE,
+    MARKDOWN_VIEW_FILE,
+    read_conversation_items,
+)
+from app.models.conversation import Conversation
+from app.repositories.conversation_repository import ConversationRepository
+from app.repositories.message_repository import MessageRepository
+
+logger = logging.getLogger(__name__)
+
+# 会话目录中需要归档的文件（没有日志时旧格式的conversation.json是唯一记录）
+ARCHIVED_FILES = (JOURNAL_FILE, JSON_VIEW_FILE)
+# 可从日志重新生成的视图文件，归档时直接删除
+DERIVED_FILES = (JSON_VIEW_FILE, MARKDOWN_VIEW_FILE)
+
+
+def _conversation_dir(conversation_id: str):
+    """会话文件目录（会话ID不是合法目录名时返回None）"""
+    if not conversation_id or os.path.basename(conversation_id) != conversation_id or conversation_id in (".", ".."):
+        return None
+    return os.path.join(settings.FILES_DIR, conversation_id)
+
+
+def _collect_files(conversation_id: str) -> Dict[str, str]:
+    """读取会话目录中需要归档的文件"""
+    conversation_dir = _conversation_dir(conversation_id)
+    if conversation_dir is None or not os.path.isdir(conversation_dir):
+        return {}
+
+    files = {}
+    for name in ARCHIVED_FILES:
+        if name == JSON_VIEW_FILE and JOURNAL_FILE in files:
+            continue
+        path = os.path.join(conversation_dir, name)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                files[name] = f.read()
+    return files
+
+
+def _remove_files(conversation_id: str, names: List[str]) -> None:
+    """删除已归档的文件和派生视图，目录为空时一并删除；同时从会话目录索引中移除"""
+    conversation_dir = _conversation_dir(conversation_id)
+    if conversation_dir is None or not os.path.isdir(conversation_dir):
+        return
+    if names:
+        try:
+            get_conversation_catalog(settings.FILES_DIR).remove(conversation_id)
+        except Exception as e:
+            # 目录索引只影响旧版会话列表，不影响归档本身
+            logger.warning(f"从会话目录移除已归档会话失败: {conversation_id}, 错误: {str(e)}")
+    for name in set(names) | set(DERIVED_FILES):
+        path = os.path.join(conversation_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+    if not os.listdir(conversation_dir):
+        os.rmdir(conversation_dir)
+
+
+def _restore_files(conversation_id: str, files: Dict[str, str]) -> None:
+    """写回归档的文件（归档后又产生了新日志时，归档内容放在前面），并重新加入会话目录索引"""
+    conversation_dir = _conversation_dir(conversation_id)
+    if conversation_dir is None or not files:
+        return
+    os.makedirs(conversation_dir, exist_ok=True)
+    for name, content in files.items():
+        path = os.path.join(conversation_dir, name)
+        if os.path.exists(path) and name == JOURNAL_FILE:
+            with open(path, "r", encoding="utf-8") as f:
+                content += f.read()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    try:
+        get_conversation_catalog(settings.FILES_DIR).record(
+            conversation_id, read_conversation_items(conversation_dir), replace=True
+        )
+    except Exception as e:
+        logger.warning(f"恢复会话目录索引失败: {conversation_id}, 错误: {str(e)}")
+
+
+class ArchiveService:
+    """冷对话归档服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.conversation_repo = ConversationRepository(db)
+        self.message_repo = MessageRepository(db)
+
+    def archive_conversation(self, conversation: Conversation) -> bool:
+        """
+        归档单个对话
+
+        先把数据写入归档段并落盘，再在一个事务中标记墓碑、删除消息；
+        期间对话有新的更新时放弃本次归档（已写入段中的数据成为无引用的垃圾，不影响正确性）
+
+        Args:
+            conversation: 对话对象
+
+        Returns:
+            是否归档成功
+        """
+        files = _collect_files(conversation.conversation_id)
+        payload = {
+            "conversation_id": conversation.conversation_id,
+            "messages": [
+                {
+                    key: value.isoformat() if isinstance(value, datetime) else value
+                    for key, value in row.items()
+                }
+                for row in self.message_repo.export_by_conversation_id(conversation.id)
+            ],
+            "files": files,
+        }
+        segment, offset, length = archive_store.append(conversation.user_id, payload)
+
+        if not self.conversation_repo.mark_archived(
+            conversation.id, conversation.updated_at, segment, offset, length
+        ):
+            self.db.rollback()
+            logger.info(f"对话在归档期间有更新，跳过: {conversation.conversation_id}")
+            return False
+
+        self.message_repo.delete_by_conversation_id(conversation.id, commit=False)
+        self.db.commit()
+        _remove_files(conversation.conversation_id, list(files))
+        return True
+
+    def archive_idle(self, idle_before: datetime, limit: int) -> int:
+        """
+        归档一批空闲对话
+
+        Args:
+            idle_before: 最后更新早于该时间的对话视为空闲
+            limit: 本批最多处理的对话数
+
+        Returns:
+            归档成功的对话数
+        """
+        archived = 0
+        for conversation in self.conversation_repo.get_idle(idle_before, limit):
+            try:
+                if self.archive_conversation(conversation):
+                    archived += 1
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"归档对话失败: {conversation.conversation_id}, 错误: {str(e)}", exc_info=True)
+        return archived
+
+    def restore_conversation(self, conversation: Conversation) -> None:
+        """
+        从归档恢复对话（写回消息和会话日志，清除墓碑标记）
+
+        恢复视为一次访问，会刷新对话的更新时间，避免刚恢复的对话立即被再次归档
+
+        Args:
+            conversation: 已归档的对话对象
+        """
+        if conversation.archived_at is None:
+            return
+
+        payload = archive_store.read(
+            conversation.user_id,
+            conversation.archive_segment,
+            conversation.archive_offset,
+            conversation.archive_length
+        )
+        if not self.conversation_repo.mark_restored(conversation.id):
+            # 其他请求已经恢复
+            self.db.rollback()
+            self.db.refresh(conversation)
+            return
+
+        self.message_repo.bulk_insert(conversation.id, [
+            {
+                **message,
+                "created_at": datetime.fromisoformat(message["created_at"]),
+                "updated_at": datetime.fromisoformat(message["updated_at"]),
+            }
+            for message in payload["messages"]
+        ])
+        self.db.commit()
+        self.db.refresh(conversation)
+        _restore_files(conversation.conversation_id, payload.get("files") or {})
+        logger.info(
+            f"从归档恢复对话: conversation_id={conversation.conversation_id}, 消息 {len(payload['messages'])} 条"
+        )
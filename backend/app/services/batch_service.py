@@ -0,0 +1,288 @@
+"""
+批量分析服务
+对一批股票先并发预取基本面数据（共享连接池和快照缓存），再以有限并发调用模型生成分析
+
+结果逐条追加到批次文件（NDJSON），服务重启或客户端断开后可用 batch_id 续跑，已完成的股票不会重复分析
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Tuple
+
+from app.config import settings
+from app.core.admission import llm_admission
+from app.core.exceptions import AuthorizationError, ResourceNotFoundError, ValidationError
+from app.schemas.batch import BatchAnalysisRequest, BatchEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_QUESTION = "分析一下{symbol}这只股票，给出简要的股票分析报告。"
+
+BATCH_ANALYSIS_PROMPT_TEMPLATE = """{question}
+
+以下是该股票的最新数据：
+{stock_info}"""
+
+_BATCH_ID_PATTERN = re.compile(r"^batch-[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$")
+
+
+class BatchResultStore:
+    """批次结果存储（每个批次一个NDJSON文件，首行为批次元数据）"""
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+
+    def _path(self, batch_id: str) -> str:
+        """批次文件路径"""
+        if not _BATCH_ID_PATTERN.match(batch_id):
+            raise ResourceNotFoundError(f"批次不存在: {batch_id}")
+        return os.path.join(self.base_dir, f"{batch_id}.ndjson")
+
+    def create(self, batch_id: str, user_id: int, symbols: List[str], question: str) -> Dict[str, Any]:
+        """
+        创建批次
+
+        Returns:
+            批次元数据
+        """
+        meta = {
+            "type": "batch",
+            "batch_id": batch_id,
+            "user_id": user_id,
+            "symbols": symbols,
+            "question": question,
+            "created_at": datetime.now().isoformat(),
+        }
+        os.makedirs(self.base_dir, exist_ok=True)
+        with open(self._path(batch_id), "x", encoding="utf-8") as f:
+            f.write(json.dumps(meta, ensure_ascii=False) + "\n")
+        return meta
+
+    def append(self, batch_id: str, event: BatchEvent) -> None:
+        """追加一条事件"""
+        line = event.model_dump_json(exclude_none=True) + "\n"
+        with self._lock, open(self._path(batch_id), "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def iter_lines(self, batch_id: str) -> Iterator[str]:
+        """逐行读取批次文件（跳过写入中断产生的不完整行）"""
+        path = self._path(batch_id)
+        if not os.path.exists(path):
+            raise ResourceNotFoundError(f"批次不存在: {batch_id}")
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield line
+
+    def load(self, batch_id: str, user_id: int) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        读取批次元数据和已完成的结果
+
+        Returns:
+            (批次元数据, {股票代码: result事件})
+
+        Raises:
+            ResourceNotFoundError: 批次不存在
+            AuthorizationError: 批次不属于该用户
+        """
+        meta = None
+        results = {}
+        for line in self.iter_lines(batch_id):
+            event = json.loads(line)
+            if event["type"] == "batch":
+                meta = event
+            elif event["type"] == "result":
+                results[event["symbol"]] = event
+
+        if meta is None:
+            raise ResourceNotFoundError(f"批次不存在: {batch_id}")
+        if meta["user_id"] != user_id:
+            raise AuthorizationError("无权访问该批次")
+        return meta, results
+
+
+batch_result_store = BatchResultStore(settings.BATCH_RESULTS_DIR)
+
+
+class BatchAnalysisService:
+    """批量分析服务"""
+
+    def __init__(self, store: BatchResultStore = batch_result_store):
+        self.store = store
+
+    @staticmethod
+    def _generate_batch_id() -> str:
+        """生成批次ID（格式: batch-YYYYMMdd-HHmmss-xxxxxxxx）"""
+        return f"batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    def _prepare(self, user_id: int, request: BatchAnalysisRequest) -> Tuple[str, List[str], str, int]:
+        """
+        创建新批次或加载待续跑的批次
+
+        Returns:
+            (批次ID, 待分析的股票, 问题模板, 已完成数量)
+        """
+        if request.batch_id:
+            meta, results = self.store.load(request.batch_id, user_id)
+            remaining = [symbol for symbol in meta["symbols"] if symbol not in results]
+            return request.batch_id, remaining, meta["question"], len(results)
+
+        if len(request.symbols) > settings.BATCH_MAX_SYMBOLS:
+            raise ValidationError(
+                f"单个批次最多 {settings.BATCH_MAX_SYMBOLS} 只股票",
+                details={"count": len(request.symbols)}
+            )
+
+        question = request.question or DEFAULT_BATCH_QUESTION
+        batch_id = self._generate_batch_id()
+        self.store.create(batch_id, user_id, request.symbols, question)
+        return batch_id, list(request.symbols), question, 0
+
+    async def run(self, user_id: int, request: BatchAnalysisRequest) -> AsyncGenerator[BatchEvent, None]:
+        """
+        执行批量分析，按完成顺序产出事件
+
+        Args:
+            user_id: 用户ID
+            request: 批量分析请求
+
+        Yields:
+            批量分析事件
+        """
+        batch_id, symbols, question, already_done = self._prepare(user_id, request)
+        total = already_done + len(symbols)
+        logger.info(f"批量分析开始: batch_id={batch_id}, 待分析 {len(symbols)}/{total}")
+
+        yield BatchEvent(
+            type="batch",
+            batch_id=batch_id,
+            completed=already_done,
+            total=total,
+            details={"resumed": request.batch_id is not None}
+        )
+
+        # 阶段一：并发预取基本面数据
+        stock_infos: Dict[str, str] = {}
+        async for event in self._prefetch(batch_id, symbols, stock_infos):
+            yield event
+
+        # 阶段二：以有限并发调用模型
+        completed = already_done
+        async for event in self._analyze_all(batch_id, user_id, question, stock_infos):
+            if event.type == "result":
+                completed += 1
+            yield event
+            yield BatchEvent(type="progress", batch_id=batch_id, phase="analysis", completed=completed, total=total)
+
+        logger.info(f"批量分析结束: batch_id={batch_id}, 完成 {completed}/{total}")
+        yield BatchEvent(type="done", batch_id=batch_id, completed=completed, total=total)
+
+    async def _prefetch(
+        self,
+        batch_id: str,
+        symbols: List[str],
+        stock_infos: Dict[str, str]
+    ) -> AsyncGenerator[BatchEvent, None]:
+        """预取股票数据（结果写入stock_infos，失败的股票记录错误并跳过分析）"""
+        from app.agents.tools.registry import tool_registry
+
+        tool = tool_registry.get_tool("get_stock_info")
+        semaphore = asyncio.Semaphore(settings.BATCH_PREFETCH_CONCURRENCY)
+
+        async def _fetch(symbol: str) -> Tuple[str, Any]:
+            async with semaphore:
+                try:
+                    return symbol, await tool.fetch_async(symbol, max_age=settings.SNAPSHOT_MAX_AGE_SECONDS)
+                except Exception as e:
+                    return symbol, e
+
+        async for symbol, result in self._as_completed([_fetch(symbol) for symbol in symbols]):
+            if isinstance(result, Exception):
+                event = BatchEvent(type="error", batch_id=batch_id, symbol=symbol, error=f"获取数据失败: {result}")
+                self.store.append(batch_id, event)
+                yield event
+            else:
+                stock_infos[symbol] = result
+            yield BatchEvent(
+                type="progress",
+                batch_id=batch_id,
+                phase="prefetch",
+                completed=len(stock_infos),
+                total=len(symbols)
+            )
+
+    async def _analyze_all(
+        self,
+        batch_id: str,
+        user_id: int,
+        question: str,
+        stock_infos: Dict[str, str]
+    ) -> AsyncGenerator[BatchEvent, None]:
+        """并发分析所有已取得数据的股票"""
+        semaphore = asyncio.Semaphore(settings.BATCH_LLM_CONCURRENCY)
+
+        async def _analyze(symbol: str, stock_info: str) -> BatchEvent:
+            async with semaphore:
+                try:
+                    content = await self._analyze_one(user_id, symbol, stock_info, question)
+                    return BatchEvent(type="result", batch_id=batch_id, symbol=symbol, content=content)
+                except Exception as e:
+                    logger.warning(f"批量分析失败: batch_id={batch_id}, symbol={symbol}, 错误: {str(e)}")
+                    return BatchEvent(type="error", batch_id=batch_id, symbol=symbol, error=str(e))
+
+        async for event in self._as_completed(
+            [_analyze(symbol, stock_info) for symbol, stock_info in stock_infos.items()]
+        ):
+            self.store.append(batch_id, event)
+            yield event
+
+    @staticmethod
+    async def _analyze_one(user_id: int, symbol: str, stock_info: str, question: str) -> str:
+        """
+        分析单只股票（经过全局LLM准入控制，批量任务权重低于交互请求）
+
+        Returns:
+            分析结果
+        """
+        from app.agents.stock_agent import STOCK_AGENT_PROMPT
+        from app.core.llm_client import get_llm_client
+
+        ticket = llm_admission.enqueue(f"batch:{user_id}", weight=settings.BATCH_LLM_WEIGHT)
+        try:
+            async for _ in llm_admission.wait_turn(ticket, settings.BATCH_LLM_QUEUE_TIMEOUT_SECONDS):
+                pass
+
+            prompt = BATCH_ANALYSIS_PROMPT_TEMPLATE.format(
+                question=question.replace("{symbol}", symbol),
+                stock_info=stock_info
+            )
+            response = await asyncio.to_thread(
+                get_llm_client().chat.completions.create,
+                model=settings.AI_MODEL,
+                messages=[
+                    {"role": "system", "content": STOCK_AGENT_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                extra_body={"thinking": {"type": "disabled"}},
+            )
+            return response.choices[0].message.content or ""
+        finally:
+            llm_admission.release(ticket)
+
+    @staticmethod
+    async def _as_completed(coros: List) -> AsyncGenerator[Any, None]:
+        """按完成顺序产出结果，消费方中途退出时取消剩余任务"""
+        tasks = [asyncio.create_task(coro) for coro in coros]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -6,14 +6,17 @@ import logging
 import asyncio
 import time
 from typing import Generator, Optional, AsyncGenerator
-from datetime import datetime
 from sqlalchemy.orm import Session
 from concurrent.futures import ThreadPoolExecutor
 
 from app.agents.manager import agent_manager
 from app.services.conversation_service import ConversationService
 from app.core.exceptions import AgentExecutionError
-from app.schemas.conversation import ConversationCreate, MessageCreate
+from app.core.answer_cache import answer_cache
+from app.core.admission import llm_admission
+from app.core.ids import generate_conversation_id
+from app.config import settings
+from app.schemas.conversation import MessageCreate
 from app.schemas.chat import ChatChunkResponse
 
 logger = logging.getLogger(__name__)
@@ -21,6 +24,9 @@ logger = logging.getLogger(__name__)
 # 创建线程池用于执行数据库操作
 _db_executor = ThreadPoolExecutor(max_workers=5)
 
+# 缓存回答回放时每个片段的字符数
+CACHED_ANSWER_CHUNK_SIZE = 64
+
 
 class ChatService:
     """聊天服务"""
@@ -110,6 +116,16 @@ class ChatService:
         perf_timestamps['agent_obtained'] = time.time()
         logger.info(f"[PERF] 获取智能体耗时: {(perf_timestamps['agent_obtained'] - perf_timestamps['conversation_id_generated']) * 1000:.2f}ms")
 
+        # 回答缓存：仅对新会话的首轮问题生效（后续轮次依赖上下文）
+        is_first_turn = self._is_first_turn(agent)
+        cached_answer = answer_cache.get(message) if is_first_turn else None
+        if cached_answer is not None:
+            async for response in self._stream_cached_answer(
+                agent, user_id, conversation_id, message, cached_answer
+            ):
+                yield response
+            return
+
         # 立即开始流式输出，不等待数据库操作
         assistant_response = ""
         first_chunk_sent = False
@@ -117,7 +133,17 @@ class ChatService:
         perf_timestamps['before_agent_chat'] = time.time()
         logger.info(f"[PERF] 准备调用agent.chat_async，总耗时: {(perf_timestamps['before_agent_chat'] - perf_timestamps['service_start']) * 1000:.2f}ms")
 
+        ticket = None
         try:
+            # 准入控制：模型并发已满时排队，并推送排队位置
+            ticket = llm_admission.enqueue(str(user_id))
+            async for position in llm_admission.wait_turn(ticket, settings.LLM_QUEUE_TIMEOUT_SECONDS):
+                yield ChatChunkResponse(
+                    type="queued",
+                    position=position,
+                    conversation_id=conversation_id
+                )
+
             # 流式生成回复 - 立即开始，不等待数据库操作
             async for chunk in agent.chat_async(message):
                 if not first_chunk_sent:
@@ -147,6 +173,10 @@ class ChatService:
                 except Exception as db_error:
                     logger.warning(f"数据库操作失败（不影响流式输出）: {db_error}")
 
+            # 首轮回答写入缓存
+            if is_first_turn:
+                answer_cache.set(message, assistant_response)
+
             # 流式输出完成后，在后台保存助手回复到数据库
             asyncio.create_task(
                 self._save_assistant_message(
@@ -172,6 +202,80 @@ class ChatService:
                 conversation_id=conversation_id
             )
 
+        finally:
+            if ticket is not None:
+                llm_admission.release(ticket)
+
+    @staticmethod
+    def _is_first_turn(agent) -> bool:
+        """
+        判断智能体是否处于会话首轮（对话记录中只有系统提示词）
+
+        Args:
+            agent: 智能体实例
+
+        Returns:
+            是否为首轮
+        """
+        history = getattr(agent, "conversations", None)
+        if history is None:
+            history = getattr(agent, "conversation_history", [])
+        return all(msg.get("role") == "system" for msg in history)
+
+    async def _stream_cached_answer(
+        self,
+        agent,
+        user_id: int,
+        conversation_id: str,
+        message: str,
+        answer: str
+    ) -> AsyncGenerator[ChatChunkResponse, None]:
+        """
+        通过正常的流式路径回放缓存的回答
+
+        Args:
+            agent: 智能体实例
+            user_id: 用户ID
+            conversation_id: 会话ID
+            message: 用户消息
+            answer: 缓存的回答
+
+        Yields:
+            聊天响应片段
+        """
+        # 同步到智能体的对话记录，保证后续轮次的上下文完整
+        history = getattr(agent, "conversations", None)
+        if history is not None:
+            history.append({"type": "message", "role": "user", "content": message})
+            history.append({"role": "assistant", "content": answer})
+            # 与agent.chat()一致，把本轮写入会话记录（files/）
+            save_conversation = getattr(agent, "_save_conversation", None)
+            if save_conversation is not None:
+                await asyncio.to_thread(save_conversation)
+
+        for start in range(0, len(answer), CACHED_ANSWER_CHUNK_SIZE):
+            yield ChatChunkResponse(
+                type="chunk",
+                content=answer[start:start + CACHED_ANSWER_CHUNK_SIZE],
+                conversation_id=conversation_id
+            )
+
+        try:
+            await self._save_conversation_and_user_message(user_id, conversation_id, message)
+        except Exception as db_error:
+            logger.warning(f"数据库操作失败（不影响流式输出）: {db_error}")
+
+        asyncio.create_task(
+            self._save_assistant_message(user_id, conversation_id, answer)
+        )
+
+        yield ChatChunkResponse(
+            type="done",
+            conversation_id=conversation_id
+        )
+
+        logger.info(f"聊天完成（命中回答缓存）: conversation_id={conversation_id}")
+
     async def _save_conversation_and_user_message(
         self,
         user_id: int,
@@ -190,30 +294,12 @@ class ChatService:
         
         def _db_operation():
             try:
-                # 快速检查会话是否存在，如果不存在则创建
-                try:
-                    self.conversation_service.get_conversation(conversation_id, user_id)
-                except Exception:
-                    # 会话不存在，创建新会话
-                    conversation_data = ConversationCreate(
-                        conversation_id=conversation_id,
-                        title=message[:50] if len(message) <= 50 else message[:47] + "..."
-                    )
-                    self.conversation_service.create_conversation(
-                        user_id=user_id,
-                        conversation_data=conversation_data
-                    )
-                    logger.info(f"创建新会话: {conversation_id}")
-
-                # 保存用户消息
-                user_message = MessageCreate(
-                    role="user",
-                    content=message
-                )
-                self.conversation_service.add_message(
+                # 会话不存在时创建，与用户消息在同一个事务中写入
+                self.conversation_service.append_message(
                     conversation_id=conversation_id,
                     user_id=user_id,
-                    message_data=user_message
+                    message_data=MessageCreate(role="user", content=message),
+                    title=message[:50] if len(message) <= 50 else message[:47] + "..."
                 )
             except Exception as e:
                 logger.warning(f"保存会话和用户消息失败: {e}")
@@ -239,14 +325,10 @@ class ChatService:
         
         def _db_operation():
             try:
-                assistant_message = MessageCreate(
-                    role="assistant",
-                    content=content
-                )
-                self.conversation_service.add_message(
+                self.conversation_service.append_message(
                     conversation_id=conversation_id,
                     user_id=user_id,
-                    message_data=assistant_message
+                    message_data=MessageCreate(role="assistant", content=content)
                 )
             except Exception as e:
                 logger.warning(f"保存助手回复失败: {e}")
@@ -260,12 +342,6 @@ class ChatService:
         生成会话ID
 
         Returns:
-            会话ID（格式: YYYYMMdd-HHmmss-XXXXX）
+            会话ID（格式: YYYYMMdd-HHmmss-<毫秒><随机串>，见 app.core.ids）
         """
-        import random
-
-        now = datetime.now()
-        date_part = now.strftime("%Y%m%d-%H%M%S")
-        random_part = f"{random.randint(10000, 99999)}"
-
-        return f"{date_part}-{random_part}"
+        return generate_conversation_id()
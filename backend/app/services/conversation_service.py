@@ -1,27 +1,120 @@
 """
 对话服务
 """
+import base64
+import json
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
+from app.db.session import SessionLocal
 from app.models.conversation import Conversation
 from app.models.message import Message
 from app.repositories.conversation_repository import ConversationRepository
-from app.repositories.message_repository import MessageRepository
+from app.repositories.message_repository import MessageRepository, MESSAGE_FIELDS
+from app.repositories.message_search_repository import MessageSearchRepository, SEARCHABLE_ROLES
+from app.services.archive_service import ArchiveService
 from app.core.exceptions import (
     ResourceNotFoundError,
     ResourceLimitExceededError,
-    AuthorizationError
+    AuthorizationError,
+    BusinessLogicError,
+    ValidationError
 )
+from app.core.search_tokenizer import build_match_query
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationUpdate,
-    MessageCreate
+    MessageCreate,
+    MessageResponse,
+    ConversationSearchResult
 )
 
 logger = logging.getLogger(__name__)
 
+# NDJSON流式导出时每次从数据库读取的消息数
+MESSAGE_STREAM_PAGE_SIZE = 200
+
+
+def encode_message_cursor(created_at: datetime, id: int) -> str:
+    """
+    生成消息分页游标（不透明字符串）
+
+    Args:
+        created_at: 消息创建时间
+        id: 消息ID
+
+    Returns:
+        游标
+    """
+    raw = json.dumps([created_at.isoformat(), id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_message_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解析消息分页游标
+
+    Args:
+        cursor: 游标
+
+    Returns:
+        (created_at, id)
+
+    Raises:
+        ValidationError: 游标无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError) as e:
+        raise ValidationError("无效的分页游标", details={"cursor": cursor}) from e
+
+
+def parse_message_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    解析逗号分隔的消息字段投影
+
+    Args:
+        fields: 例如 "role,content"，None表示全部字段
+
+    Returns:
+        字段列表
+
+    Raises:
+        ValidationError: 包含未知字段
+    """
+    if not fields:
+        return None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in MESSAGE_FIELDS and name not in ("id", "created_at")]
+    if unknown:
+        raise ValidationError(
+            f"未知的消息字段: {', '.join(unknown)}",
+            details={"available_fields": ["id", "created_at", *MESSAGE_FIELDS]}
+        )
+    # role始终返回
+    return list(dict.fromkeys(["role", *(name for name in names if name in MESSAGE_FIELDS)]))
+
+
+def _to_message_response(row, max_content_length: Optional[int] = None) -> MessageResponse:
+    """
+    将查询行转换为消息响应（未查询的字段保持未设置）
+
+    内容可能压缩存储，截断在解压后进行，同时返回原始长度
+    """
+    data = row._asdict()
+    if "metadata" in data:
+        data["message_metadata"] = data.pop("metadata")
+    if max_content_length is not None and "content" in data:
+        content = data["content"] or ""
+        data["content"] = content[:max_content_length]
+        data["content_length"] = len(content)
+    return MessageResponse(**data)
+
 
 class ConversationService:
     """对话服务"""
@@ -30,6 +123,7 @@ class ConversationService:
         self.db = db
         self.conversation_repo = ConversationRepository(db)
         self.message_repo = MessageRepository(db)
+        self.search_repo = MessageSearchRepository(db)
 
     def create_conversation(
         self,
@@ -70,14 +164,16 @@ class ConversationService:
     def get_conversation(
         self,
         conversation_id: str,
-        user_id: int
+        user_id: int,
+        restore: bool = True
     ) -> Conversation:
         """
-        获取对话
+        获取对话（已归档的对话自动从归档恢复）
 
         Args:
             conversation_id: 会话ID
             user_id: 用户ID
+            restore: 是否恢复已归档的对话
 
         Returns:
             对话对象
@@ -95,8 +191,53 @@ class ConversationService:
         if conversation.user_id != user_id:
             raise AuthorizationError("无权访问此会话")
 
+        if restore and conversation.archived_at is not None:
+            ArchiveService(self.db).restore_conversation(conversation)
+
         return conversation
 
+    def search_conversations(
+        self,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        skip: int = 0
+    ) -> List[ConversationSearchResult]:
+        """
+        全文搜索用户的对话（包括已归档的对话），按相关度排序
+
+        Args:
+            user_id: 用户ID
+            query: 搜索词
+            limit: 返回的最大记录数
+            skip: 跳过的记录数
+
+        Returns:
+            搜索结果列表
+
+        Raises:
+            ValidationError: 搜索词中没有可搜索的文字
+            BusinessLogicError: 当前数据库不支持全文搜索
+        """
+        match = build_match_query(query)
+        if match is None:
+            raise ValidationError("搜索词中没有可搜索的文字", details={"q": query})
+        if self.db.get_bind().dialect.name != "sqlite":
+            raise BusinessLogicError("全文搜索目前只支持SQLite数据库")
+
+        rows = self.search_repo.search(user_id, match, limit, skip)
+        conversations = {
+            conversation.id: conversation
+            for conversation in self.conversation_repo.get_by_ids([row.conversation_id for row in rows])
+        }
+        return [
+            ConversationSearchResult.model_validate(conversations[row.conversation_id]).model_copy(
+                update={"hits": row.hits, "score": -row.score}
+            )
+            for row in rows
+            if row.conversation_id in conversations
+        ]
+
     def get_user_conversations(
         self,
         user_id: int,
@@ -166,8 +307,10 @@ class ConversationService:
             ResourceNotFoundError: 对话不存在
             AuthorizationError: 无权访问
         """
-        conversation = self.get_conversation(conversation_id, user_id)
+        conversation = self.get_conversation(conversation_id, user_id, restore=False)
 
+        # 索引行不随消息删除（归档时需要保留），与对话在同一事务中删除
+        self.search_repo.delete_by_conversation_id(conversation.id)
         self.conversation_repo.delete(conversation.id)
 
         logger.info(f"删除对话: conversation_id={conversation_id}")
@@ -207,11 +350,60 @@ class ConversationService:
 
         message = self.message_repo.create(message_dict)
 
+        # 建立全文索引，与消息计数一起提交
+        if message.role in SEARCHABLE_ROLES:
+            self.search_repo.add(conversation.id, conversation.user_id, [message.content])
+
         # 更新消息计数
         self.conversation_repo.increment_message_count(conversation.id)
 
         return message
 
+    def append_message(
+        self,
+        conversation_id: str,
+        user_id: int,
+        message_data: MessageCreate,
+        title: Optional[str] = None
+    ) -> None:
+        """
+        追加消息，对话不存在时一并创建（聊天接口保存每轮消息使用）
+
+        对话的创建/计数更新是一条upsert语句，与消息和索引的写入在同一个事务中提交；
+        不支持upsert的数据库退回到先查询再创建的方式
+
+        Args:
+            conversation_id: 会话ID
+            user_id: 用户ID
+            message_data: 消息数据
+            title: 新建对话时的标题
+
+        Raises:
+            AuthorizationError: 对话属于其他用户
+        """
+        if not self.conversation_repo.supports_upsert():
+            if not self.conversation_repo.exists_by_conversation_id(conversation_id):
+                self.create_conversation(user_id, ConversationCreate(conversation_id=conversation_id, title=title))
+            self.add_message(conversation_id, user_id, message_data)
+            return
+
+        try:
+            row = self.conversation_repo.upsert_for_message(user_id, conversation_id, title)
+            if row is None:
+                raise AuthorizationError("无权访问此会话")
+
+            self.message_repo.bulk_insert(row.id, [message_data.model_dump()])
+            if message_data.role in SEARCHABLE_ROLES:
+                self.search_repo.add(row.id, user_id, [message_data.content])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        # 向已归档的对话追加消息时恢复归档，避免下次归档覆盖原有的归档数据
+        if row.archived_at is not None:
+            ArchiveService(self.db).restore_conversation(self.conversation_repo.get(row.id))
+
     def get_messages(
         self,
         conversation_id: str,
@@ -243,6 +435,108 @@ class ConversationService:
             limit
         )
 
+    def get_message_page(
+        self,
+        conversation_id: str,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = 100,
+        skip: int = 0,
+        fields: Optional[List[str]] = None,
+        max_content_length: Optional[int] = None,
+        conversation: Optional[Conversation] = None
+    ) -> Tuple[List[MessageResponse], Optional[str]]:
+        """
+        按游标分页获取消息（按创建时间升序）
+
+        Args:
+            conversation_id: 会话ID
+            user_id: 用户ID
+            cursor: 上一页返回的游标，None表示从第一条开始
+            limit: 返回的最大记录数，None表示不限制
+            skip: 跳过的记录数（仅在未提供游标时使用）
+            fields: 需要返回的字段，None表示全部
+            max_content_length: 内容截断长度，None表示不截断
+            conversation: 调用方已通过get_conversation加载的对话（提供时不再重复查询和校验权限）
+
+        Returns:
+            (消息列表, 下一页游标)，没有更多消息时游标为None
+
+        Raises:
+            ResourceNotFoundError: 对话不存在
+            AuthorizationError: 无权访问
+            ValidationError: 游标无效
+        """
+        if conversation is None:
+            conversation = self.get_conversation(conversation_id, user_id)
+        after = decode_message_cursor(cursor) if cursor else None
+
+        # 多取一条判断是否还有下一页
+        rows = self.message_repo.get_page_by_conversation_id(
+            conversation.id,
+            after=after,
+            limit=limit + 1 if limit is not None else None,
+            skip=0 if after else skip,
+            fields=fields
+        )
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_message_cursor(rows[-1].created_at, rows[-1].id)
+
+        return [_to_message_response(row, max_content_length) for row in rows], next_cursor
+
+    def iter_messages(
+        self,
+        conversation_id: str,
+        user_id: int,
+        fields: Optional[List[str]] = None,
+        max_content_length: Optional[int] = None
+    ) -> Iterator[MessageResponse]:
+        """
+        逐页遍历对话的全部消息，内存占用与对话长度无关
+
+        权限在调用时立即检查；遍历时每页使用独立的短会话，可在请求会话关闭后继续
+
+        Args:
+            conversation_id: 会话ID
+            user_id: 用户ID
+            fields: 需要返回的字段，None表示全部
+            max_content_length: 内容截断长度，None表示不截断
+
+        Returns:
+            消息迭代器
+
+        Raises:
+            ResourceNotFoundError: 对话不存在
+            AuthorizationError: 无权访问
+        """
+        conversation_pk = self.get_conversation(conversation_id, user_id).id
+
+        def _iterate() -> Iterator[MessageResponse]:
+            after = None
+            while True:
+                db = SessionLocal()
+                try:
+                    rows = MessageRepository(db).get_page_by_conversation_id(
+                        conversation_pk,
+                        after=after,
+                        limit=MESSAGE_STREAM_PAGE_SIZE,
+                        fields=fields
+                    )
+                finally:
+                    db.close()
+
+                for row in rows:
+                    yield _to_message_response(row, max_content_length)
+
+                if len(rows) < MESSAGE_STREAM_PAGE_SIZE:
+                    return
+                after = (rows[-1].created_at, rows[-1].id)
+
+        return _iterate()
+
     def get_conversation_count(self, user_id: int) -> int:
         """
         获取用户的对话数量
@@ -0,0 +1,197 @@
+"""
+报告任务服务
+耗时较长的报告请求提交为任务，由独立的worker进程（python -m app.workers.report_worker）执行，
+API进程只负责入队和查询/推送进度
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import AsyncGenerator, List
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.models.report_job import (
+    ReportJob,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_SUCCEEDED,
+    JOB_STATUS_CANCELLED,
+    JOB_FINAL_STATUSES,
+)
+from app.repositories.report_job_repository import ReportJobRepository
+from app.core.exceptions import (
+    AgentNotFoundError,
+    AuthorizationError,
+    BusinessLogicError,
+    ResourceLimitExceededError,
+    ResourceNotFoundError,
+)
+from app.schemas.chat import ChatChunkResponse
+from app.schemas.report_job import ReportJobCreate
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobService:
+    """报告任务服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.job_repo = ReportJobRepository(db)
+
+    @staticmethod
+    def _generate_job_id() -> str:
+        """生成任务ID（格式: job-YYYYMMdd-HHmmss-xxxxxxxx）"""
+        return f"job-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    def create_job(self, user_id: int, job_data: ReportJobCreate) -> ReportJob:
+        """
+        提交报告任务
+
+        Args:
+            user_id: 用户ID
+            job_data: 任务数据
+
+        Returns:
+            创建的任务
+
+        Raises:
+            AgentNotFoundError: 智能体类型不存在
+            ResourceLimitExceededError: 未完成的任务过多
+        """
+        from app.agents.manager import AgentManager
+
+        if job_data.agent_type not in AgentManager.AGENT_TYPES:
+            raise AgentNotFoundError(
+                f"未知的智能体类型: {job_data.agent_type}",
+                details={"available_types": list(AgentManager.AGENT_TYPES.keys())}
+            )
+
+        pending = self.job_repo.count_pending_by_user_id(user_id)
+        if pending >= settings.REPORT_JOB_MAX_PENDING_PER_USER:
+            raise ResourceLimitExceededError(
+                f"未完成的报告任务过多（上限 {settings.REPORT_JOB_MAX_PENDING_PER_USER}）",
+                details={"pending": pending}
+            )
+
+        job = self.job_repo.create({
+            "job_id": self._generate_job_id(),
+            "user_id": user_id,
+            "agent_type": job_data.agent_type,
+            "message": job_data.message,
+            "status": JOB_STATUS_PENDING,
+        })
+        logger.info(f"提交报告任务: user_id={user_id}, job_id={job.job_id}")
+        return job
+
+    def get_job(self, job_id: str, user_id: int) -> ReportJob:
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+            user_id: 用户ID
+
+        Returns:
+            任务对象
+
+        Raises:
+            ResourceNotFoundError: 任务不存在
+            AuthorizationError: 无权访问
+        """
+        job = self.job_repo.get_by_job_id(job_id)
+        if not job:
+            raise ResourceNotFoundError(f"任务不存在: {job_id}")
+        if job.user_id != user_id:
+            raise AuthorizationError("无权访问该任务")
+        return job
+
+    def get_user_jobs(self, user_id: int, skip: int = 0, limit: int = 100) -> List[ReportJob]:
+        """
+        获取用户的任务列表
+
+        Args:
+            user_id: 用户ID
+            skip: 跳过的记录数
+            limit: 返回的最大记录数
+
+        Returns:
+            任务列表
+        """
+        return self.job_repo.get_by_user_id(user_id, skip, limit)
+
+    def cancel_job(self, job_id: str, user_id: int) -> ReportJob:
+        """
+        取消任务
+
+        Args:
+            job_id: 任务ID
+            user_id: 用户ID
+
+        Returns:
+            取消后的任务
+
+        Raises:
+            BusinessLogicError: 任务已结束
+        """
+        job = self.get_job(job_id, user_id)
+        if not self.job_repo.cancel(job.id):
+            raise BusinessLogicError(f"任务已结束，无法取消: {job_id}", details={"status": job.status})
+
+        self.db.refresh(job)
+        logger.info(f"取消报告任务: user_id={user_id}, job_id={job_id}")
+        return job
+
+    @staticmethod
+    def _poll(job_id: str):
+        """读取任务当前状态（每次使用独立的短会话，避免长时间占用连接）"""
+        db = SessionLocal()
+        try:
+            repo = ReportJobRepository(db)
+            job = repo.get_by_job_id(job_id)
+            position = repo.count_ahead(job) + 1 if job.status == JOB_STATUS_PENDING else None
+            return job.status, job.result or "", job.error, position
+        finally:
+            db.close()
+
+    async def stream_job(self, job_id: str, user_id: int) -> AsyncGenerator[ChatChunkResponse, None]:
+        """
+        推送任务进度（排队位置、新生成的内容片段、最终状态）
+
+        可以在任务执行前、执行中或结束后调用，已生成的内容会先完整推送一次
+
+        Args:
+            job_id: 任务ID
+            user_id: 用户ID
+
+        Yields:
+            响应片段
+        """
+        self.get_job(job_id, user_id)
+
+        sent = 0
+        last_position = None
+        while True:
+            status, result, error, position = await asyncio.to_thread(self._poll, job_id)
+
+            if position is not None and position != last_position:
+                last_position = position
+                yield ChatChunkResponse(type="queued", position=position)
+
+            # 任务被回收重新执行时结果会从头生成
+            if len(result) < sent:
+                sent = 0
+            if len(result) > sent:
+                yield ChatChunkResponse(type="chunk", content=result[sent:])
+                sent = len(result)
+
+            if status in JOB_FINAL_STATUSES:
+                if status == JOB_STATUS_SUCCEEDED:
+                    yield ChatChunkResponse(type="done")
+                else:
+                    default_error = "任务已取消" if status == JOB_STATUS_CANCELLED else "任务执行失败"
+                    yield ChatChunkResponse(type="error", error=error or default_error)
+                return
+
+            await asyncio.sleep(settings.REPORT_JOB_POLL_INTERVAL_SECONDS)
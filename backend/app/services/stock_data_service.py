@@ -0,0 +1,253 @@
+"""
+股票数据服务
+负责在用户请求之外预先获取股票数据，写入磁盘快照存储
+
+- 启动预热：为关注列表填充缺失或过期的快照
+- 后台刷新：周期性刷新关注列表和最近查询热度最高的股票，使交互请求几乎总能命中快照
+"""
+import asyncio
+import logging
+import math
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.core.snapshot_store import normalize_symbol, snapshot_store
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 多个worker之间互斥执行预热的锁文件
+WARMUP_LOCK_FILE = ".warmup.lock"
+
+
+# 热度统计的半衰期（秒）和最多跟踪的股票数
+POPULARITY_HALF_LIFE_SECONDS = 3600
+POPULARITY_MAX_SYMBOLS = 1000
+
+
+class SymbolPopularity:
+    """股票查询热度（指数衰减计数）"""
+
+    def __init__(self, half_life: float, max_symbols: int):
+        """
+        初始化热度统计
+
+        Args:
+            half_life: 半衰期（秒）
+            max_symbols: 最多跟踪的股票数
+        """
+        self.half_life = half_life
+        self.max_symbols = max_symbols
+        self._scores: Dict[str, tuple] = {}  # {symbol: (分数, 更新时间)}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * math.pow(0.5, (now - updated_at) / self.half_life)
+
+    def record(self, symbol: str) -> None:
+        """记录一次查询"""
+        symbol = normalize_symbol(symbol)
+        now = time.time()
+        with self._lock:
+            score, updated_at = self._scores.get(symbol, (0.0, now))
+            self._scores[symbol] = (self._decayed(score, updated_at, now) + 1.0, now)
+
+            if len(self._scores) > self.max_symbols:
+                coldest = min(self._scores, key=lambda key: self._decayed(*self._scores[key], now))
+                del self._scores[coldest]
+
+    def top(self, n: int) -> List[str]:
+        """热度最高的n只股票"""
+        now = time.time()
+        with self._lock:
+            ranked = sorted(
+                self._scores.items(),
+                key=lambda item: self._decayed(item[1][0], item[1][1], now),
+                reverse=True
+            )
+        return [symbol for symbol, _ in ranked[:n]]
+
+
+symbol_popularity = SymbolPopularity(POPULARITY_HALF_LIFE_SECONDS, POPULARITY_MAX_SYMBOLS)
+
+
+async def refresh_symbol(symbol: str, max_age: float) -> bool:
+    """
+    获取一只股票的数据并写入快照
+
+    Args:
+        symbol: 股票代码
+        max_age: 快照年龄不超过该值的接口不重复请求（秒）
+
+    Returns:
+        是否成功
+    """
+    from app.agents.tools.registry import tool_registry
+
+    try:
+        await tool_registry.get_tool("get_stock_info").fetch_async(symbol, max_age=max_age)
+        return True
+    except Exception as e:
+        logger.warning(f"刷新股票数据失败: {symbol}, 错误: {str(e)}")
+        return False
+
+
+async def refresh_symbols(symbols: Iterable[str], concurrency: int, max_age: float) -> int:
+    """
+    以有限并发和随机间隔刷新一批股票
+
+    Args:
+        symbols: 股票代码
+        concurrency: 最大并发数
+        max_age: 快照年龄不超过该值的接口不重复请求（秒）
+
+    Returns:
+        成功刷新的数量
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _refresh(symbol: str) -> bool:
+        async with semaphore:
+            # 随机抖动，避免请求同时打到上游
+            await asyncio.sleep(random.uniform(0, 0.5))
+            return await refresh_symbol(symbol, max_age)
+
+    results = await asyncio.gather(*(_refresh(symbol) for symbol in symbols))
+    return sum(1 for ok in results if ok)
+
+
+def _stale_symbols(symbols: Iterable[str], max_age: float) -> List[str]:
+    """筛选出快照缺失或年龄超过max_age的股票"""
+    from app.agents.tools.stock_tool import STOCK_DATA_ENDPOINTS
+
+    endpoints = [section for section, _, _ in STOCK_DATA_ENDPOINTS]
+    return [
+        symbol for symbol in symbols
+        if not snapshot_store.is_fresh(symbol, endpoints, max_age)
+    ]
+
+
+async def warm_up_watchlist() -> None:
+    """
+    启动时为关注列表预先填充快照
+
+    多个worker同时启动时只有获得文件锁的一个执行，其余跳过，避免重启时集中请求上游
+    """
+    symbols = settings.snapshot_watchlist
+    if not symbols:
+        return
+
+    os.makedirs(settings.SNAPSHOT_STORE_DIR, exist_ok=True)
+    lock_file = open(os.path.join(settings.SNAPSHOT_STORE_DIR, WARMUP_LOCK_FILE), "w")
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info("其他worker正在预热关注列表，跳过")
+                return
+
+        stale = await asyncio.to_thread(_stale_symbols, symbols, settings.SNAPSHOT_MAX_AGE_SECONDS)
+        if not stale:
+            logger.info(f"关注列表快照均未过期，无需预热: {len(symbols)} 只")
+            return
+
+        logger.info(f"开始预热关注列表: {len(stale)}/{len(symbols)} 只需要刷新")
+        refreshed = await refresh_symbols(
+            stale, settings.SNAPSHOT_WARMUP_CONCURRENCY, settings.SNAPSHOT_MAX_AGE_SECONDS
+        )
+        logger.info(f"关注列表预热完成: 成功 {refreshed}/{len(stale)}")
+    finally:
+        lock_file.close()
+
+
+class StockRefreshScheduler:
+    """后台刷新调度器"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _refresh_before() -> float:
+        """
+        快照年龄超过该值即刷新，保证在下一轮刷新前不会过期
+
+        Returns:
+            刷新阈值（秒）
+        """
+        interval = settings.SNAPSHOT_REFRESH_INTERVAL_SECONDS
+        return max(settings.SNAPSHOT_MAX_AGE_SECONDS - interval * 1.5, interval / 2)
+
+    async def run_once(self) -> int:
+        """
+        执行一轮刷新
+
+        Returns:
+            成功刷新的数量
+        """
+        candidates = list(dict.fromkeys(
+            settings.snapshot_watchlist + symbol_popularity.top(settings.SNAPSHOT_REFRESH_TOP_N)
+        ))
+        if not candidates:
+            return 0
+
+        refresh_before = self._refresh_before()
+        # 快照在多个worker间共享，其他worker刚刷新过的股票会在这里被跳过
+        stale = await asyncio.to_thread(_stale_symbols, candidates, refresh_before)
+        if not stale:
+            return 0
+
+        start = time.monotonic()
+        refreshed = await refresh_symbols(stale, settings.SNAPSHOT_REFRESH_CONCURRENCY, refresh_before)
+        logger.info(
+            f"后台刷新完成: 成功 {refreshed}/{len(stale)}, 候选 {len(candidates)}, "
+            f"耗时 {time.monotonic() - start:.1f}s"
+        )
+        return refreshed
+
+    async def _loop(self) -> None:
+        """调度循环（带抖动的固定间隔）"""
+        interval = settings.SNAPSHOT_REFRESH_INTERVAL_SECONDS
+        # 首轮随机延迟，错开多个worker和启动预热
+        await asyncio.sleep(random.uniform(interval * 0.5, interval))
+
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"后台刷新失败: {str(e)}", exc_info=True)
+
+            await asyncio.sleep(interval * random.uniform(0.9, 1.1))
+
+    def start(self) -> None:
+        """启动调度器"""
+        if not settings.SNAPSHOT_REFRESH_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"后台刷新调度器已启动，间隔 {settings.SNAPSHOT_REFRESH_INTERVAL_SECONDS}s")
+
+    async def stop(self) -> None:
+        """停止调度器"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("后台刷新调度器已停止")
+
+
+# 创建全局调度器实例
+stock_refresh_scheduler = StockRefreshScheduler()
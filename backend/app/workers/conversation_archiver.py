@@ -0,0 +1,77 @@
+"""
+冷对话归档worker
+定期把超过 ARCHIVE_IDLE_HOURS 未更新的对话移出热表，写入按用户分段的归档文件（只需运行一个实例）
+
+用法:
+    python -m app.workers.conversation_archiver [--once]
+"""
+import argparse
+import logging
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.core.logging import setup_logging
+from app.db.session import SessionLocal, init_db
+from app.services.archive_service import ArchiveService
+
+logger = logging.getLogger(__name__)
+
+
+def run_once() -> int:
+    """
+    执行一轮归档（分批处理，直到没有更多空闲对话）
+
+    Returns:
+        归档的对话数
+    """
+    idle_before = datetime.utcnow() - timedelta(hours=settings.ARCHIVE_IDLE_HOURS)
+    start = time.monotonic()
+    total = 0
+    while True:
+        db = SessionLocal()
+        try:
+            archived = ArchiveService(db).archive_idle(idle_before, settings.ARCHIVE_BATCH_SIZE)
+        finally:
+            db.close()
+        total += archived
+        # 本批有失败或跳过的对话时结束本轮，避免反复处理同一批
+        if archived < settings.ARCHIVE_BATCH_SIZE:
+            break
+
+    if total:
+        logger.info(f"归档完成: {total} 个对话，耗时 {time.monotonic() - start:.1f}s")
+    return total
+
+
+def main() -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="冷对话归档")
+    parser.add_argument("--once", action="store_true", help="只执行一轮")
+    args = parser.parse_args()
+
+    setup_logging()
+    init_db()
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+
+    logger.info(
+        f"归档worker已启动: 空闲 {settings.ARCHIVE_IDLE_HOURS} 小时的对话将被归档，"
+        f"间隔 {settings.ARCHIVE_INTERVAL_SECONDS}s"
+    )
+    while not stopping.is_set():
+        try:
+            run_once()
+        except Exception as e:
+            logger.error(f"归档失败: {str(e)}", exc_info=True)
+        if args.once:
+            break
+        stopping.wait(settings.ARCHIVE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+会话批量导入
+把文件存储（files/<会话ID>/conversation.jsonl 或旧格式 conversation.json）中的会话导入 conversations/messages 表
+
+用法:
+    python -m app.workers.conversation_importer [--files-dir ./files] [--username guest]
+                                                [--processes 4] [--batch-size 500]
+
+- 会话文件在进程池中解析，主进程只负责写库；写入下一批的同时解析再下一批
+- 绕过ORM，每批会话和消息各一次 executemany，一个事务提交
+- 每批提交后把已处理的会话ID追加到检查点文件，中断后重新执行会跳过已处理的会话（解析失败的会话会重试）；
+  数据库中已存在的会话ID同样跳过，重复执行不会产生重复数据
+- 只导入用户和助手消息（与聊天接口保存的内容一致），工具输出和系统提示词不导入
+- 同时写入全文索引（message_search），分词在解析进程中完成
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from sqlalchemy import insert, select
+
+from app.core.conversation_journal import read_conversation_items
+from app.core.search_tokenizer import tokenize
+from app.core.logging import setup_logging
+from app.db.session import SessionLocal, engine, init_db
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.models.message_search import MessageSearch
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "import_checkpoint.txt"
+
+# 与聊天接口创建会话时的标题规则一致
+TITLE_MAX_LENGTH = 50
+
+
+def _title_of(message: str) -> str:
+    return message if len(message) <= TITLE_MAX_LENGTH else message[:TITLE_MAX_LENGTH - 3] + "..."
+
+
+def _created_at_of(conversation_id: str, fallback: datetime) -> datetime:
+    """从会话ID（YYYYMMDD-HHMMSS...）解析创建时间，格式不符时使用fallback"""
+    try:
+        return datetime.strptime(conversation_id[:15], "%Y%m%d-%H%M%S")
+    except ValueError:
+        return fallback
+
+
+def parse_conversation(conversation_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    解析单个会话目录（在子进程中执行）
+
+    Args:
+        conversation_dir: 会话目录
+
+    Returns:
+        会话和消息的行数据，没有可导入的消息时返回None
+    """
+    items = read_conversation_items(conversation_dir)
+    messages = [
+        item for item in items
+        if item.get("role") in ("user", "assistant") and item.get("content")
+    ]
+    if not messages:
+        return None
+
+    conversation_id = os.path.basename(conversation_dir)
+    updated_at = datetime.fromtimestamp(os.path.getmtime(conversation_dir))
+    created_at = min(_created_at_of(conversation_id, updated_at), updated_at)
+    first_user = next((m["content"] for m in messages if m["role"] == "user"), None)
+
+    return {
+        "conversation": {
+            "conversation_id": conversation_id,
+            "title": _title_of(first_user) if first_user else None,
+            "message_count": len(messages),
+            "created_at": created_at,
+            "updated_at": updated_at,
+        },
+        # 原始记录没有逐条时间，按顺序递增1毫秒，保证按created_at排序时顺序不变
+        "messages": [
+            {
+                "role": message["role"],
+                "content": message["content"],
+                "created_at": created_at + timedelta(milliseconds=index),
+                "updated_at": created_at + timedelta(milliseconds=index),
+            }
+            for index, message in enumerate(messages)
+        ],
+        "search_tokens": [tokens for tokens in (tokenize(message["content"]) for message in messages) if tokens],
+    }
+
+
+class ConversationImporter:
+    """会话批量导入器"""
+
+    def __init__(self, files_dir: str, user_id: int, checkpoint_path: Optional[str] = None):
+        """
+        初始化导入器
+
+        Args:
+            files_dir: 会话文件根目录
+            user_id: 导入会话归属的用户ID
+            checkpoint_path: 检查点文件路径，默认为 files_dir 下的 import_checkpoint.txt
+        """
+        self.files_dir = files_dir
+        self.user_id = user_id
+        self.checkpoint_path = checkpoint_path or os.path.join(files_dir, CHECKPOINT_FILE)
+
+    def _load_checkpoint(self) -> Set[str]:
+        """读取已处理的会话ID"""
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _save_checkpoint(self, conversation_ids: List[str]) -> None:
+        """追加已处理的会话ID"""
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{conversation_id}\n" for conversation_id in conversation_ids))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _pending_dirs(self, done: Set[str]) -> Iterator[str]:
+        """流式列出尚未处理的会话目录"""
+        with os.scandir(self.files_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name not in done:
+                    yield entry.path
+
+    @staticmethod
+    def _batches(iterable: Iterator[str], size: int) -> Iterator[List[str]]:
+        batch = []
+        for item in iterable:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _write_batch(self, parsed: List[Dict[str, Any]]) -> int:
+        """
+        写入一批会话（单个事务，会话、消息和索引各一次executemany）
+
+        Args:
+            parsed: 解析结果
+
+        Returns:
+            实际导入的会话数
+        """
+        if not parsed:
+            return 0
+
+        conversation_table = Conversation.__table__
+        with engine.begin() as conn:
+            ids = [row["conversation"]["conversation_id"] for row in parsed]
+            existing = set(conn.scalars(
+                select(conversation_table.c.conversation_id).where(conversation_table.c.conversation_id.in_(ids))
+            ))
+            parsed = [row for row in parsed if row["conversation"]["conversation_id"] not in existing]
+            if not parsed:
+                return 0
+
+            conn.execute(
+                insert(conversation_table),
+                [{**row["conversation"], "user_id": self.user_id} for row in parsed]
+            )
+            pk_by_id = dict(conn.execute(
+                select(conversation_table.c.conversation_id, conversation_table.c.id)
+                .where(conversation_table.c.conversation_id.in_([row["conversation"]["conversation_id"] for row in parsed]))
+            ).all())
+            conn.execute(
+                insert(Message.__table__),
+                [
+                    {**message, "conversation_id": pk_by_id[row["conversation"]["conversation_id"]]}
+                    for row in parsed
+                    for message in row["messages"]
+                ]
+            )
+            search_rows = [
+                {
+                    "conversation_id": pk_by_id[row["conversation"]["conversation_id"]],
+                    "user_id": self.user_id,
+                    "tokens": tokens,
+                }
+                for row in parsed
+                for tokens in row["search_tokens"]
+            ]
+            if search_rows:
+                conn.execute(insert(MessageSearch.__table__), search_rows)
+        return len(parsed)
+
+    def run(self, processes: int = 4, batch_size: int = 500) -> Dict[str, int]:
+        """
+        执行导入
+
+        Args:
+            processes: 解析进程数
+            batch_size: 每批（每个事务）的会话数
+
+        Returns:
+            统计信息：scanned（本次处理的目录数）、imported（导入的会话数）、failed（解析失败数）
+        """
+        done = self._load_checkpoint()
+        if done:
+            logger.info(f"从检查点恢复: 已处理 {len(done)} 个会话")
+
+        stats = {"scanned": 0, "imported": 0, "failed": 0}
+        start = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            chunksize = max(1, batch_size // (processes * 4))
+
+            def _submit(batch):
+                return batch, executor.map(_safe_parse, batch, chunksize=chunksize)
+
+            batches = self._batches(self._pending_dirs(done), batch_size)
+            pending = _submit(next(batches, []))
+            while pending[0]:
+                batch, results = pending
+                results = list(results)
+                # 先提交下一批的解析，再写入当前批
+                pending = _submit(next(batches, []))
+
+                parsed, processed = [], []
+                for conversation_dir, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        # 不记入检查点，下次执行时重试
+                        stats["failed"] += 1
+                        logger.warning(f"解析会话失败，已跳过: {conversation_dir}, 错误: {str(result)}")
+                        continue
+                    processed.append(os.path.basename(conversation_dir))
+                    if result is not None:
+                        parsed.append(result)
+
+                stats["imported"] += self._write_batch(parsed)
+                stats["scanned"] += len(batch)
+                self._save_checkpoint(processed)
+
+                elapsed = time.monotonic() - start
+                logger.info(
+                    f"已处理 {stats['scanned']} 个会话目录，导入 {stats['imported']} 个，"
+                    f"失败 {stats['failed']} 个（{stats['scanned'] / elapsed:.0f} 个/秒）"
+                )
+
+        return stats
+
+
+def _safe_parse(conversation_dir: str):
+    """解析会话，异常作为结果返回，不中断整批"""
+    try:
+        return parse_conversation(conversation_dir)
+    except Exception as e:
+        return e
+
+
+def _resolve_user_id(username: str) -> int:
+    """导入会话归属的用户（默认用户不存在时自动创建）"""
+    if username == "guest":
+        from app.core.security import get_or_create_guest_user_id
+
+        return int(get_or_create_guest_user_id())
+
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).get_by_username(username)
+        if user is None:
+            raise SystemExit(f"用户不存在: {username}")
+        return user.id
+    finally:
+        db.close()
+
+
+def main() -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="把文件存储中的会话批量导入数据库")
+    parser.add_argument("--files-dir", default="files", help="会话文件根目录")
+    parser.add_argument("--username", default="guest", help="导入会话归属的用户名")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 4, help="解析进程数")
+    parser.add_argument("--batch-size", type=int, default=500, help="每个事务的会话数")
+    parser.add_argument("--checkpoint", default=None, help="检查点文件路径")
+    args = parser.parse_args()
+
+    setup_logging()
+    init_db()
+
+    importer = ConversationImporter(args.files_dir, _resolve_user_id(args.username), args.checkpoint)
+    start = time.monotonic()
+    stats = importer.run(processes=args.processes, batch_size=args.batch_size)
+    logger.info(
+        f"导入完成: 处理 {stats['scanned']} 个会话目录，导入 {stats['imported']} 个，"
+        f"失败 {stats['failed']} 个，耗时 {time.monotonic() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
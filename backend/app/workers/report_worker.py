@@ -0,0 +1,230 @@
+"""
+报告任务worker
+从数据库领取报告任务并执行智能体，独立于API进程运行，可按报告吞吐量单独扩容
+
+用法:
+    python -m app.workers.report_worker [--processes 2]
+
+每个worker进程同一时间执行一个任务；执行中按固定间隔把已生成的内容写回数据库（同时作为心跳，
+与是否有新输出无关），API进程据此推送进度。进程崩溃导致心跳超时的任务会被其他worker重新排队或标记失败。
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from app.config import settings
+from app.core.logging import setup_logging
+from app.db.session import SessionLocal, engine, init_db
+from app.models.report_job import ReportJob, JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED
+from app.repositories.report_job_repository import ReportJobRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ReportWorker:
+    """报告任务worker（单进程）"""
+
+    def __init__(self, worker_id: str):
+        """
+        初始化worker
+
+        Args:
+            worker_id: worker标识
+        """
+        self.worker_id = worker_id
+        self._stopping = False
+
+    def stop(self) -> None:
+        """当前任务结束后停止"""
+        self._stopping = True
+
+    @staticmethod
+    def _with_repo(func, *args):
+        """在独立的短会话中执行Repository操作"""
+        db = SessionLocal()
+        try:
+            return func(ReportJobRepository(db), *args)
+        finally:
+            db.close()
+
+    def _claim(self):
+        """回收超时任务并领取下一个任务"""
+        def _claim_next(repo: ReportJobRepository):
+            stale_before = datetime.utcnow() - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+            recovered = repo.requeue_stale(stale_before, settings.REPORT_JOB_MAX_ATTEMPTS)
+            if recovered:
+                logger.warning(f"回收心跳超时的报告任务: {recovered} 个")
+
+            job = repo.claim_next(self.worker_id)
+            if job is not None:
+                repo.db.expunge(job)
+            return job
+
+        return self._with_repo(_claim_next)
+
+    async def run(self) -> None:
+        """领取并执行任务，直到被停止"""
+        logger.info(f"报告worker已启动: {self.worker_id}")
+        try:
+            while not self._stopping:
+                try:
+                    job = await asyncio.to_thread(self._claim)
+                except Exception as e:
+                    logger.error(f"领取报告任务失败: {str(e)}", exc_info=True)
+                    job = None
+
+                if job is None:
+                    await asyncio.sleep(settings.REPORT_JOB_POLL_INTERVAL_SECONDS)
+                    continue
+
+                await self._execute(job)
+        finally:
+            from app.core.xueqiu_client import xueqiu_client
+            from app.core.llm_client import close_llm_client
+
+            await xueqiu_client.aclose()
+            close_llm_client()
+            logger.info(f"报告worker已停止: {self.worker_id}")
+
+    @staticmethod
+    async def _generate(agent, message: str, parts: List[str]) -> None:
+        """运行智能体，把生成的片段追加到parts"""
+        async with contextlib.aclosing(agent.chat_async(message)) as chunks:
+            async for chunk in chunks:
+                parts.append(chunk)
+
+    async def _execute(self, job: ReportJob) -> None:
+        """
+        执行单个任务
+
+        生成在独立的任务中运行；本协程按固定间隔写回已生成的内容（兼作心跳），
+        因此工具调用或模型长时间无输出时心跳也不会中断，任务不会被误判为超时而重复执行
+
+        Args:
+            job: 已领取的任务
+        """
+        from app.agents.manager import AgentManager
+
+        logger.info(f"开始执行报告任务: job_id={job.job_id}, 第 {job.attempts} 次")
+        start = time.monotonic()
+        parts: List[str] = []
+        agent = None
+        generation = None
+
+        try:
+            agent = AgentManager.AGENT_TYPES[job.agent_type](
+                user_id=str(job.user_id),
+                conversation_id=job.job_id,
+                files_dir=settings.REPORT_JOB_FILES_DIR
+            )
+            generation = asyncio.create_task(self._generate(agent, job.message, parts))
+
+            while True:
+                done, _ = await asyncio.wait({generation}, timeout=settings.REPORT_JOB_FLUSH_INTERVAL_SECONDS)
+                if done:
+                    break
+                running = await asyncio.to_thread(
+                    self._with_repo, ReportJobRepository.update_progress, job.id, "".join(parts)
+                )
+                if not running:
+                    # 任务已被取消（或超时后被回收），停止生成
+                    logger.info(f"报告任务已取消，停止执行: job_id={job.job_id}")
+                    return
+
+            # 生成过程中的异常在这里抛出
+            generation.result()
+            result = "".join(parts)
+            finished = await asyncio.to_thread(
+                self._with_repo, ReportJobRepository.finish, job.id, JOB_STATUS_SUCCEEDED, result
+            )
+            logger.info(
+                f"报告任务完成: job_id={job.job_id}, 长度 {len(result)}, "
+                f"耗时 {time.monotonic() - start:.1f}s, 已写入={finished}"
+            )
+
+        except Exception as e:
+            logger.error(f"报告任务执行失败: job_id={job.job_id}, 错误: {str(e)}", exc_info=True)
+            await asyncio.to_thread(
+                self._with_repo, ReportJobRepository.finish, job.id, JOB_STATUS_FAILED, "".join(parts) or None, str(e)
+            )
+        finally:
+            if generation is not None and not generation.done():
+                generation.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await generation
+            if agent is not None:
+                # 立即落盘会话日志中尚未fsync的内容
+                await asyncio.to_thread(agent.close)
+
+
+def run_worker(index: int) -> None:
+    """
+    worker子进程入口
+
+    Args:
+        index: 进程序号
+    """
+    setup_logging()
+    # 不复用从父进程继承的数据库连接
+    engine.dispose(close=False)
+    worker = ReportWorker(f"{socket.gethostname()}:{os.getpid()}:{index}")
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(_main())
+
+
+def main() -> None:
+    """启动多个worker进程，异常退出的进程会被重新拉起"""
+    parser = argparse.ArgumentParser(description="报告任务worker")
+    parser.add_argument("--processes", type=int, default=settings.REPORT_WORKER_PROCESSES)
+    args = parser.parse_args()
+
+    setup_logging()
+    init_db()
+
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    processes: List[multiprocessing.Process] = [None] * args.processes
+    logger.info(f"启动报告worker: {args.processes} 个进程")
+
+    while not stopping:
+        for index, process in enumerate(processes):
+            if process is None or not process.is_alive():
+                if process is not None:
+                    logger.warning(f"报告worker进程退出（退出码 {process.exitcode}），重新启动: #{index}")
+                process = multiprocessing.Process(target=run_worker, args=(index,), daemon=False)
+                process.start()
+                processes[index] = process
+        time.sleep(1)
+
+    logger.info("正在停止报告worker...")
+    for process in processes:
+        if process is not None and process.is_alive():
+            process.terminate()
+    for process in processes:
+        if process is not None:
+            process.join(timeout=settings.REPORT_JOB_STALE_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
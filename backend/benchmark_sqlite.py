@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+SQLite并发基准：对比旧配置（StaticPool共享单连接、默认日志模式）和调优配置（连接池 + WAL + pragma）
+
+用法:
+    python benchmark_sqlite.py [--threads 8] [--seconds 5] [--write-ratio 0.1]
+
+每个线程循环执行：按键集分页读取一页消息，或（按write-ratio的概率）插入一条消息并提交。
+输出每种配置的吞吐量、读写延迟分位数和错误数。
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+# 导入配置时不应依赖真实密钥
+os.environ.setdefault("DOUBAO_API_KEY", "benchmark")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.session import Base, create_sqlite_engine  # noqa: E402
+from app.models import User, Conversation, Message  # noqa: E402
+from app.repositories.message_repository import MessageRepository  # noqa: E402
+
+SEED_MESSAGES = 2000
+PAGE_SIZE = 50
+
+
+def create_legacy_engine(url: str):
+    """旧配置：所有线程共享一个连接"""
+    legacy_engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(legacy_engine, "connect")
+    def set_sqlite_pragma(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    return legacy_engine
+
+
+def seed(session_factory) -> int:
+    """创建测试数据，返回对话数据库ID"""
+    db = session_factory()
+    try:
+        user = User(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        conversation = Conversation(conversation_id="bench", user_id=user.id, message_count=SEED_MESSAGES)
+        db.add(conversation)
+        db.commit()
+
+        start = datetime(2026, 1, 1)
+        db.add_all([
+            Message(
+                conversation_id=conversation.id,
+                role="user" if i % 2 == 0 else "assistant",
+                content="股票分析" * 200,
+                created_at=start + timedelta(seconds=i)
+            )
+            for i in range(SEED_MESSAGES)
+        ])
+        db.commit()
+        return conversation.id
+    finally:
+        db.close()
+
+
+def run_profile(name: str, make_engine, threads: int, seconds: float, write_ratio: float) -> None:
+    """运行单个配置的基准"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        url = f"sqlite:///{os.path.join(temp_dir, 'bench.db')}"
+        bench_engine = make_engine(url)
+        Base.metadata.create_all(bind=bench_engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=bench_engine)
+        conversation_pk = seed(session_factory)
+
+        read_latencies, write_latencies = [], []
+        errors = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def worker():
+            rng = random.Random()
+            local_reads, local_writes = [], []
+            while time.monotonic() < deadline:
+                is_write = rng.random() < write_ratio
+                start = time.perf_counter()
+                db = session_factory()
+                try:
+                    if is_write:
+                        db.add(Message(conversation_id=conversation_pk, role="user", content="新消息"))
+                        db.commit()
+                    else:
+                        offset = rng.randrange(SEED_MESSAGES - PAGE_SIZE)
+                        after = (datetime(2026, 1, 1) + timedelta(seconds=offset), offset)
+                        MessageRepository(db).get_page_by_conversation_id(conversation_pk, after=after, limit=PAGE_SIZE)
+                except Exception as e:
+                    with lock:
+                        errors.append(type(e).__name__)
+                    db.rollback()
+                    continue
+                finally:
+                    db.close()
+                (local_writes if is_write else local_reads).append(time.perf_counter() - start)
+
+            with lock:
+                read_latencies.extend(local_reads)
+                write_latencies.extend(local_writes)
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        bench_engine.dispose()
+
+    def _quantiles(values):
+        if len(values) < 2:
+            return "n/a"
+        cuts = statistics.quantiles(values, n=100)
+        return f"p50 {cuts[49] * 1000:.2f}ms / p99 {cuts[98] * 1000:.2f}ms"
+
+    total = len(read_latencies) + len(write_latencies)
+    print(f"[{name}]")
+    print(f"  吞吐量: {total / seconds:.0f} ops/s（读 {len(read_latencies)}，写 {len(write_latencies)}）")
+    print(f"  读延迟: {_quantiles(read_latencies)}")
+    print(f"  写延迟: {_quantiles(write_latencies)}")
+    if errors:
+        kinds = {kind: errors.count(kind) for kind in set(errors)}
+        print(f"  错误: {len(errors)} {kinds}")
+    else:
+        print("  错误: 0")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SQLite并发基准")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"线程数 {args.threads}，每种配置 {args.seconds:.0f}s，写比例 {args.write_ratio:.0%}\n")
+    run_profile("旧配置: StaticPool + 默认日志模式", create_legacy_engine, args.threads, args.seconds, args.write_ratio)
+    run_profile("调优配置: 连接池 + WAL", create_sqlite_engine, args.threads, args.seconds, args.write_ratio)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+导入耗时检查：用 python -X importtime 测量 app.agents.stock_agent 的冷启动导入耗时
+
+用法:
+    python check_import_time.py [--budget-ms 300] [--module app.agents.stock_agent]
+
+超出预算或加载了不应在股票分析路径上出现的重量级模块时以非0状态码退出
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 只应在论文/代码复现工具首次使用时加载的模块
+FORBIDDEN_MODULES = ("arxiv", "PyPDF2", "write_code_tools", "pysnowball", "app.agents.research_tools")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure(module: str):
+    """
+    在新的解释器中导入模块并解析 -X importtime 输出
+
+    Args:
+        module: 要测量的模块
+
+    Returns:
+        (模块累计耗时微秒, 已导入模块名集合)
+    """
+    env = dict(os.environ)
+    # 模块导入期间不应依赖真实密钥
+    env.setdefault("DOUBAO_API_KEY", "import-time-check")
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"✗ 导入 {module} 失败")
+
+    cumulative_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        imported.add(name)
+        # 顶层（无缩进）的目标模块行给出总的累计耗时
+        if name == module and len(match.group(3)) <= 1:
+            cumulative_us = int(match.group(2))
+
+    return cumulative_us, imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="检查模块冷启动导入耗时")
+    parser.add_argument("--module", default="app.agents.stock_agent")
+    parser.add_argument("--budget-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    cumulative_us, imported = measure(args.module)
+    cumulative_ms = cumulative_us / 1000
+    ok = True
+
+    if cumulative_ms <= args.budget_ms:
+        print(f"✓ {args.module} 导入耗时 {cumulative_ms:.1f}ms（预算 {args.budget_ms:.0f}ms）")
+    else:
+        print(f"✗ {args.module} 导入耗时 {cumulative_ms:.1f}ms，超出预算 {args.budget_ms:.0f}ms")
+        ok = False
+
+    loaded = [name for name in FORBIDDEN_MODULES if name in imported]
+    if loaded:
+        print(f"✗ 导入时加载了应延迟加载的模块: {', '.join(loaded)}")
+        ok = False
+    else:
+        print("✓ 未加载论文/代码复现工具的依赖")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
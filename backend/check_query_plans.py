@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+查询计划检查：在迁移到最新版本的SQLite数据库上，对热点查询执行 EXPLAIN QUERY PLAN，
+确认它们走复合索引（索引查找），没有全表扫描或额外的排序
+
+用法:
+    python check_query_plans.py
+
+SQL取自Repository实际生成的语句，模型或查询改动导致索引失效时以非0状态码退出
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+# 导入配置时不应依赖真实密钥
+os.environ.setdefault("DOUBAO_API_KEY", "query-plan-check")
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.session import create_sqlite_engine  # noqa: E402
+from app.db.migrations import upgrade_database  # noqa: E402
+from app.models import User, Conversation, Message  # noqa: E402
+from app.repositories.conversation_repository import ConversationRepository  # noqa: E402
+from app.repositories.message_repository import MessageRepository  # noqa: E402
+
+MESSAGES_INDEX = "ix_messages_conversation_id_created_at_id"
+CONVERSATIONS_INDEX = "ix_conversations_user_id_updated_at"
+
+# (说明, 执行查询的函数, 期望使用的索引)
+HOT_QUERIES = [
+    (
+        "对话历史（按创建时间）",
+        lambda db, ids: MessageRepository(db).get_by_conversation_id(ids["conversation"]),
+        MESSAGES_INDEX,
+    ),
+    (
+        "对话历史（键集分页）",
+        lambda db, ids: MessageRepository(db).get_page_by_conversation_id(
+            ids["conversation"], after=(datetime(2026, 1, 1), 10), limit=50
+        ),
+        MESSAGES_INDEX,
+    ),
+    (
+        "用户对话列表（按更新时间倒序）",
+        lambda db, ids: ConversationRepository(db).get_by_user_id(ids["user"]),
+        CONVERSATIONS_INDEX,
+    ),
+    (
+        "用户对话计数",
+        lambda db, ids: ConversationRepository(db).count_by_user_id(ids["user"]),
+        CONVERSATIONS_INDEX,
+    ),
+]
+
+
+def seed(db) -> dict:
+    """写入少量数据并收集统计信息，让查询规划器基于真实分布选择索引"""
+    users = [User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(20)]
+    db.add_all(users)
+    db.commit()
+
+    start = datetime(2026, 1, 1)
+    conversations = [
+        Conversation(conversation_id=f"conv-{i}", user_id=users[i % len(users)].id, updated_at=start + timedelta(minutes=i))
+        for i in range(200)
+    ]
+    db.add_all(conversations)
+    db.commit()
+
+    db.add_all([
+        Message(conversation_id=conversations[i % len(conversations)].id, role="user", content="x",
+                created_at=start + timedelta(seconds=i))
+        for i in range(5000)
+    ])
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE")
+    db.commit()
+    return {"user": users[0].id, "conversation": conversations[0].id}
+
+
+def explain(engine, run) -> list:
+    """执行查询并返回其（最后一条SELECT语句的）查询计划"""
+    captured = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    statement, parameters = captured[-1]
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def check(plan: list, index: str) -> list:
+    """检查查询计划，返回发现的问题"""
+    problems = []
+    if not any(f"INDEX {index}" in step for step in plan):
+        problems.append(f"未使用索引 {index}")
+    for step in plan:
+        if step.startswith("SCAN") and "INDEX" not in step:
+            problems.append(f"全表扫描: {step}")
+        if "TEMP B-TREE" in step:
+            problems.append(f"额外排序: {step}")
+    return problems
+
+
+def main() -> int:
+    ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(temp_dir, 'plans.db')}")
+        upgrade_database(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = session_factory()
+        try:
+            ids = seed(db)
+            for description, query, index in HOT_QUERIES:
+                plan = explain(engine, lambda: query(db, ids))
+                problems = check(plan, index)
+                if problems:
+                    ok = False
+                    print(f"✗ {description}: {'; '.join(problems)}")
+                    for step in plan:
+                        print(f"    {step}")
+                else:
+                    print(f"✓ {description}: {' | '.join(plan)}")
+        finally:
+            db.close()
+            engine.dispose()
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+测试脚本：验证会话ID（app.core.ids）的格式和排序
+文件存储的会话列表按ID排序，导入器从ID前缀解析创建时间，都依赖这里的格式
+"""
+import sys
+import os
+import re
+from datetime import datetime
+from unittest import mock
+
+# 添加backend目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core import ids
+
+ID_PATTERN = re.compile(r"^\d{8}-\d{6}-\d{3}[0-9A-HJKMNP-TV-Z]{16}$")
+
+# 2026-01-19 14:30:52.207（本地时间）
+FROZEN_MS = int(datetime(2026, 1, 19, 14, 30, 52).timestamp()) * 1000 + 207
+
+
+def _frozen_time_ns(ms: int):
+    """把time.time_ns固定在指定毫秒"""
+    return mock.patch.object(ids.time, "time_ns", return_value=ms * 1_000_000)
+
+
+def test_format():
+    """测试ID格式"""
+    print("=== 测试1: ID格式 ===")
+    with _frozen_time_ns(FROZEN_MS):
+        conversation_id = ids.generate_conversation_id()
+    print(f"生成的会话ID: {conversation_id}")
+    assert ID_PATTERN.match(conversation_id), f"格式不符: {conversation_id}"
+    assert conversation_id.startswith("20260119-143052-207"), "时间前缀应与生成时间一致"
+    print("✓ ID格式正确")
+
+
+def test_ordered_within_one_millisecond():
+    """测试同一毫秒内生成的ID严格递增"""
+    print("\n=== 测试2: 同一毫秒内有序 ===")
+    with _frozen_time_ns(FROZEN_MS):
+        generated = [ids.generate_conversation_id() for _ in range(1000)]
+    assert len(set(generated)) == len(generated), "ID不应重复"
+    assert generated == sorted(generated), "同一毫秒内的ID应按生成顺序排序"
+    print("✓ 1000个同毫秒ID唯一且有序")
+
+
+def test_ordered_across_random_overflow():
+    """测试随机部分溢出时进位到下一毫秒，仍然有序"""
+    print("\n=== 测试3: 随机部分溢出 ===")
+    # 上一个ID停在某秒的最后一毫秒，且随机部分已是最大值
+    last_ms = FROZEN_MS - 207 + 999
+    with mock.patch.object(ids, "_last_ms", last_ms), \
+            mock.patch.object(ids, "_last_random", (1 << ids.RANDOM_BITS) - 1), \
+            _frozen_time_ns(last_ms):
+        previous = f"20260119-143052-999{ids._encode((1 << ids.RANDOM_BITS) - 1, ids.RANDOM_LENGTH)}"
+        overflowed = ids.generate_conversation_id()
+        following = ids.generate_conversation_id()
+
+    print(f"溢出前: {previous}")
+    print(f"溢出后: {overflowed}")
+    assert ID_PATTERN.match(overflowed), f"格式不符: {overflowed}"
+    assert overflowed.startswith("20260119-143053-000"), "溢出应进位到下一毫秒（跨秒）"
+    assert previous < overflowed < following, "溢出前后的ID应保持有序"
+    print("✓ 溢出进位后仍然有序")
+
+
+def test_created_at_round_trip():
+    """测试导入器能从ID解析出创建时间"""
+    print("\n=== 测试4: 创建时间解析 ===")
+    from app.workers.conversation_importer import _created_at_of
+
+    fallback = datetime(2000, 1, 1)
+    with _frozen_time_ns(FROZEN_MS):
+        conversation_id = ids.generate_conversation_id()
+    assert _created_at_of(conversation_id, fallback) == datetime(2026, 1, 19, 14, 30, 52)
+    assert _created_at_of("job-not-a-date", fallback) == fallback, "格式不符时应使用fallback"
+    print("✓ 创建时间解析正确")
+
+
+if __name__ == "__main__":
+    print("开始测试会话ID...\n")
+    test_format()
+    test_ordered_within_one_millisecond()
+    test_ordered_across_random_overflow()
+    test_created_at_round_trip()
+    print("\n✓ 所有测试通过！")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+测试脚本：验证追加写会话日志（app.core.conversation_journal）
+"""
+import sys
+import os
+import json
+import tempfile
+import time
+
+# 添加backend目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.conversation_journal import JOURNAL_FILE, JSON_VIEW_FILE, ConversationJournal
+
+CONVERSATION_ID = "20260119-143052-2071K8ZQ3M4XW9TN6PB"
+
+
+def _user(content: str):
+    return {"type": "message", "role": "user", "content": content}
+
+
+def _assistant(content: str):
+    return {"role": "assistant", "content": content}
+
+
+def test_append_and_read():
+    """测试追加后按顺序读回全部条目"""
+    print("=== 测试1: 追加与读取 ===")
+    with tempfile.TemporaryDirectory() as files_dir:
+        journal = ConversationJournal(os.path.join(files_dir, CONVERSATION_ID), fsync_interval=0)
+        assert not journal.exists()
+
+        journal.append([_user("分析SH600519")])
+        journal.append([_assistant("好的"), _user("估值呢")])
+        journal.append([])
+
+        assert journal.exists()
+        assert journal.read() == [_user("分析SH600519"), _assistant("好的"), _user("估值呢")]
+    print("✓ 条目按追加顺序读回")
+
+
+def test_recovers_from_truncated_last_line():
+    """测试上次写入中断留下半行时，旧条目和新条目都能读回"""
+    print("\n=== 测试2: 截断的最后一行 ===")
+    with tempfile.TemporaryDirectory() as files_dir:
+        journal = ConversationJournal(os.path.join(files_dir, CONVERSATION_ID), fsync_interval=0)
+        journal.append([_user("第一问"), _assistant("第一答")])
+
+        # 模拟进程在写入第二个条目时崩溃
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(_user("写了一半"), ensure_ascii=False)[:12])
+
+        assert journal.read() == [_user("第一问"), _assistant("第一答")], "半行应被跳过"
+
+        journal.append([_user("第二问")])
+        assert journal.read() == [_user("第一问"), _assistant("第一答"), _user("第二问")], \
+            "新条目不应与半行拼接"
+    print("✓ 跳过半行，新条目完整写入")
+
+
+def test_deferred_fsync():
+    """测试间隔内未fsync的追加由定时器补做，close时立即落盘"""
+    print("\n=== 测试3: 批量fsync ===")
+    with tempfile.TemporaryDirectory() as files_dir:
+        journal = ConversationJournal(os.path.join(files_dir, CONVERSATION_ID), fsync_interval=0.2)
+
+        journal.append([_user("第一问")])
+        assert not journal._dirty, "距上次fsync超过间隔时应立即fsync"
+
+        journal.append([_assistant("第一答")])
+        assert journal._dirty, "间隔内的追加应推迟fsync"
+        assert journal._sync_timer is not None, "推迟的fsync应安排定时器"
+
+        deadline = time.monotonic() + 5
+        while journal._dirty and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not journal._dirty, "定时器到期后应完成fsync"
+        assert journal._sync_timer is None
+
+        journal.append([_user("第二问")])
+        assert journal._dirty
+        journal.close()
+        assert not journal._dirty and journal._sync_timer is None, "close应立即落盘并取消定时器"
+    print("✓ 推迟的fsync按时完成")
+
+
+def test_migrates_legacy_json():
+    """测试旧格式conversation.json在首次追加时转入日志"""
+    print("\n=== 测试4: 旧格式迁移 ===")
+    with tempfile.TemporaryDirectory() as files_dir:
+        conversation_dir = os.path.join(files_dir, CONVERSATION_ID)
+        os.makedirs(conversation_dir)
+        legacy = [{"role": "system", "content": "系统提示词"}, _user("旧问题"), _assistant("旧回答")]
+        with open(os.path.join(conversation_dir, JSON_VIEW_FILE), "w", encoding="utf-8") as f:
+            json.dump(legacy, f, ensure_ascii=False)
+
+        journal = ConversationJournal(conversation_dir, fsync_interval=0)
+        assert journal.exists(), "只有旧格式文件时也应视为已有记录"
+        assert journal.read() == legacy, "没有日志时应读取旧格式文件"
+
+        journal.append([_user("新问题")])
+        assert os.path.exists(os.path.join(conversation_dir, JOURNAL_FILE))
+        assert journal.read() == legacy + [_user("新问题")]
+
+        journal.append([_assistant("新回答")])
+        assert journal.read() == legacy + [_user("新问题"), _assistant("新回答")], "旧记录只应迁移一次"
+    print("✓ 旧记录迁移到日志且只迁移一次")
+
+
+if __name__ == "__main__":
+    print("开始测试会话日志...\n")
+    test_append_and_read()
+    test_recovers_from_truncated_last_line()
+    test_deferred_fsync()
+    test_migrates_legacy_json()
+    print("\n✓ 所有测试通过！")
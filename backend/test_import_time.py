@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+测试脚本：app.agents.stock_agent 的冷启动导入耗时和延迟加载（调用 check_import_time.py 的检查逻辑）
+"""
+import sys
+import os
+
+# 添加backend目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from check_import_time import FORBIDDEN_MODULES, measure
+
+# 与 check_import_time.py 的默认预算一致
+IMPORT_BUDGET_MS = 300.0
+
+STOCK_AGENT_MODULE = "app.agents.stock_agent"
+
+
+def test_stock_agent_import_within_budget():
+    """测试冷启动导入耗时在预算内"""
+    print("=== 测试1: 冷启动导入耗时 ===")
+    cumulative_us, _ = measure(STOCK_AGENT_MODULE)
+    cumulative_ms = cumulative_us / 1000
+    print(f"{STOCK_AGENT_MODULE} 导入耗时 {cumulative_ms:.1f}ms")
+    assert cumulative_ms <= IMPORT_BUDGET_MS, f"导入耗时超出预算 {IMPORT_BUDGET_MS:.0f}ms"
+    print("✓ 导入耗时在预算内")
+
+
+def test_stock_agent_import_is_lazy():
+    """测试导入时不加载论文/代码复现工具、配置和工具注册表"""
+    print("\n=== 测试2: 延迟加载 ===")
+    _, imported = measure(STOCK_AGENT_MODULE)
+    lazy_modules = FORBIDDEN_MODULES + ("app.config", "app.agents.tools", "app.agents.manager", "pydantic")
+    loaded = [name for name in lazy_modules if name in imported]
+    assert not loaded, f"导入时加载了应延迟加载的模块: {', '.join(loaded)}"
+    print("✓ 重量级依赖均为首次使用时加载")
+
+
+if __name__ == "__main__":
+    print("开始测试导入耗时...\n")
+    test_stock_agent_import_within_budget()
+    test_stock_agent_import_is_lazy()
+    print("\n✓ 所有测试通过！")
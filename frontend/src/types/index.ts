@@ -20,10 +20,11 @@ export interface ChatSession {
 }
 
 export interface ChatChunkResponse {
-  type: 'chunk' | 'done' | 'error';
+  type: 'queued' | 'chunk' | 'done' | 'error';
   content?: string;
   conversation_id?: string;
   error?: string;
+  position?: number;
 }
 
 // 后端API返回的消息类型
@@ -42,5 +43,6 @@ export interface ConversationDetail {
   created_at: string;
   updated_at: string;
   messages: ApiMessage[];
+  next_cursor?: string | null;
 }
 